@@ -0,0 +1,140 @@
+"""
+Helpers for the async views served under ASGI (real_estate/asgi.py).
+
+The ORM is synchronous, so async views hand their database work to a thread
+pool of ASYNC_ORM_THREADS threads with ``orm()``. The pool bounds how many
+queries a process runs at once, and each of its threads keeps its own
+database connection for CONN_MAX_AGE seconds. Redis is used through the asyncio client, see
+apps/common/redis.py.
+
+``async_api_view`` gives async function views the parts of DRF they need:
+JSON rendering with ORJSONRenderer, APIException responses and CSRF
+exemption. The views authenticate with ``authenticate()`` and throttle with
+TokenBucketThrottle.aallow_request().
+"""
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+
+from .renderers import ORJSONRenderer
+
+_executor = None
+
+
+def get_orm_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_ORM_THREADS, thread_name_prefix="orm"
+        )
+    return _executor
+
+
+def orm(func):
+    """
+    Wrap a function using the ORM into a coroutine function running it in the
+    ORM thread pool. With ASYNC_ORM_THREADS = 0 it runs in Django's one
+    thread for sync code instead, which is what the tests do so that the
+    calls share the test's transaction.
+    """
+    if not settings.ASYNC_ORM_THREADS:
+        return sync_to_async(func)
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        # What request_started and request_finished do for sync views.
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False, executor=get_orm_executor())
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    response = HttpResponse(
+        ORJSONRenderer().render(data), status=status, content_type="application/json"
+    )
+    for header, value in (headers or {}).items():
+        response[header] = value
+    return response
+
+
+def exception_response(exc):
+    """The response DRF's exception handler gives an APIException"""
+    headers = {}
+    if getattr(exc, "auth_header", None):
+        headers["WWW-Authenticate"] = exc.auth_header
+    if getattr(exc, "wait", None):
+        headers["Retry-After"] = "%d" % exc.wait
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {"detail": exc.detail}
+    return json_response(data, status=exc.status_code, headers=headers)
+
+
+def async_api_view(methods):
+    """Decorate an async function view answering the given HTTP methods"""
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in methods:
+                return exception_response(exceptions.MethodNotAllowed(request.method))
+            try:
+                return await view(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return exception_response(exc)
+
+        # What csrf_exempt does, which would hide that the view is async.
+        wrapped.csrf_exempt = True
+        return wrapped
+
+    return decorator
+
+
+def drf_view(view_class, request, **kwargs):
+    """
+    An instance of the DRF view set up to handle the authenticated request,
+    for async views reusing the query building of a sync one
+    """
+    view = view_class()
+    view.args, view.kwargs = (), kwargs
+    view.format_kwarg = None
+    view.headers = {}
+    view.request = view.initialize_request(request, **kwargs)
+    view.request.user = request.user
+    return view
+
+
+async def authenticate(request, required=True):
+    """
+    Authenticate the request like DRF's DEFAULT_AUTHENTICATION_CLASSES do and
+    set request.user. Raises NotAuthenticated without credentials when they
+    are required.
+    """
+    for authenticator_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        authenticator = authenticator_class()
+        try:
+            result = await orm(authenticator.authenticate)(request)
+        except exceptions.AuthenticationFailed as exc:
+            exc.auth_header = authenticator.authenticate_header(request)
+            raise
+        if result is not None:
+            request.user = result[0]
+            return request.user
+    if required:
+        exc = exceptions.NotAuthenticated()
+        exc.auth_header = authenticator.authenticate_header(request)
+        raise exc
+    request.user = AnonymousUser()
+    return request.user
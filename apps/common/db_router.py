@@ -0,0 +1,195 @@
+"""
+Read replicas with read-your-writes.
+
+PrimaryReplicaRouter sends reads to a replica only inside a request that
+ReplicaMiddleware marked safe: GET, HEAD and OPTIONS requests, and views
+setting ``replica_reads = True`` (POST searches). Everything else, Celery
+tasks, management commands and reads inside a transaction included, stays on
+the primary. Once a request writes, it reads from the primary for the rest
+of the request, and the client gets a cookie pinning its next requests to
+the primary for REPLICA_PIN_SECONDS, until the replicas have caught up.
+
+Replicas lagging behind by more than REPLICA_MAX_LAG seconds, or that cannot
+be reached, are skipped. The lag of each replica is checked at most every
+REPLICA_LAG_CHECK_INTERVAL seconds per process.
+
+Responses shared with other clients are built from the primary, see
+primary_reads(): the property response cache fills its misses there, so a
+replica that has not replayed a write yet cannot outlive it in the cache.
+"""
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = "db_primary"
+
+# A caught up replica reports no lag, however long ago the last write was.
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+_lag_checks = {}
+
+
+class ReadState:
+    """Where the reads of the current request may go"""
+
+    def __init__(self, use_replicas=False, pinned=False):
+        self.use_replicas = use_replicas
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+
+_state = contextvars.ContextVar("db_read_state", default=None)
+
+
+@contextmanager
+def read_state(**kwargs):
+    state = ReadState(**kwargs)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads of the current request made in the block to the primary"""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    use_replicas, state.use_replicas = state.use_replicas, False
+    try:
+        yield
+    finally:
+        state.use_replicas = use_replicas
+
+
+def pinned_to_primary():
+    """Whether the current request reads its own writes from the primary"""
+    state = _state.get()
+    return state is not None and state.pinned
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind the primary, None when unreachable"""
+    now = time.monotonic()
+    checked_at, lag = _lag_checks.get(alias, (None, None))
+    if (
+        checked_at is not None
+        and now - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL
+    ):
+        return lag
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            lag = float(cursor.fetchone()[0])
+    except DatabaseError as error:
+        logger.warning(f"Replica {alias} is unavailable: {error}")
+        lag = None
+    _lag_checks[alias] = (now, lag)
+    return lag
+
+
+def choose_replica():
+    """A random replica within REPLICA_MAX_LAG, None when there is none"""
+    healthy = []
+    for alias in replica_aliases():
+        lag = replica_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG:
+            healthy.append(alias)
+    return random.choice(healthy) if healthy else None
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is None
+            or not state.use_replicas
+            or state.pinned
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        # One replica per request, so its reads see a single snapshot.
+        if state.replica is None:
+            state.replica = choose_replica() or DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaMiddleware:
+    """Scope replica reads and read-your-writes pinning to each request"""
+
+    sync_capable = True
+    async_capable = True
+
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks the instance as a coroutine function, like MiddlewareMixin.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with read_state(pinned=PIN_COOKIE in request.COOKIES) as state:
+            response = self.get_response(request)
+        return self.pin_client(state, response)
+
+    async def __acall__(self, request):
+        with read_state(pinned=PIN_COOKIE in request.COOKIES) as state:
+            response = await self.get_response(request)
+        return self.pin_client(state, response)
+
+    def pin_client(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        # DRF views carry their class, async function views the attribute.
+        view_class = getattr(view_func, "cls", view_func)
+        state.use_replicas = request.method in self.safe_methods or getattr(
+            view_class, "replica_reads", False
+        )
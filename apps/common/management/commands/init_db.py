@@ -1,7 +1,12 @@
+import os
+import time
+
 from django.core.management.base import BaseCommand, CommandParser
 import requests
 import faker, random
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from apps.common.synthetic import SyntheticDataGenerator
 from apps.properties.models import Property
 from apps.enquiries.models import Enquiry
 from apps.profiles.models import Profile
@@ -18,6 +23,41 @@ class Command(BaseCommand):
             type=int,
             help="Provide the amount of fake data for each model you want to generate",
         )
+        parser.add_argument(
+            "--scale",
+            action="store_true",
+            help="Bulk generate a realistic dataset, the amount is the number of properties",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            help="Number of users in scale mode, a tenth of the properties by default",
+        )
+        parser.add_argument(
+            "--enquiries",
+            type=int,
+            help="Number of enquiries in scale mode, a tenth of the properties by default",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the scale mode dataset"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes inserting rows in scale mode",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of rows each worker builds and inserts at a time",
+        )
+        parser.add_argument(
+            "--password",
+            default="password123",
+            help="Password of every generated user in scale mode",
+        )
 
         return super().add_arguments(parser)
 
@@ -26,11 +66,41 @@ class Command(BaseCommand):
             self.style.SUCCESS(f"We are generating a test database for you project")
         )
         self.amout = options["amount_of_fake_data"]
+        if options["scale"]:
+            self.generate_scale(options)
+            return
         self.generate_users(self.amout)
         self.generate_properties(self.amout)
         self.generate_enquiries(self.amout)
         # self.generrate_ratings(self.amout)
 
+    def generate_scale(self, options):
+        """Bulk generate users, profiles, properties, ratings and enquiries"""
+        properties = self.amout
+        users = options["users"] if options["users"] is not None else properties // 10
+        enquiries = options["enquiries"]
+        if enquiries is None:
+            enquiries = properties // 10
+        generator = SyntheticDataGenerator(
+            seed=options["seed"],
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            stdout=self.stdout,
+        )
+        started = time.monotonic()
+        # Hashing is deliberately slow, every user shares this one hash.
+        rows = generator.generate(
+            users, properties, enquiries, make_password(options["password"])
+        )
+        seconds = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {rows} rows in {seconds:.1f}s "
+                f"({rows / seconds:.0f} rows/s), users log in with "
+                f"{options['password']!r}"
+            )
+        )
+
     def generate_properties(self, number_of_properties: int):
         """This method is used to generate fake data for properties in the database"""
 
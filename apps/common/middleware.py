@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+class QueryCountMiddleware:
+    """
+    Report the number of SQL queries a request ran in the X-Query-Count
+    response header, used by the load benchmarks in benchmarks/.
+
+    Only active with the QUERY_COUNT_HEADER setting. Streamed responses only
+    count the queries run before the first chunk is sent.
+    """
+
+    header = "X-Query-Count"
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_COUNT_HEADER", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        wrappers = [
+            connection.execute_wrapper(counter) for connection in connections.all()
+        ]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+        response[self.header] = str(count)
+        return response
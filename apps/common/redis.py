@@ -0,0 +1,29 @@
+import asyncio
+import weakref
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+_client = None
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_redis():
+    """Return the process wide Redis client for settings.REDIS_URL"""
+    global _client
+    if _client is None:
+        # redis-py resets its connection pool after a fork, so this is safe to
+        # share between celery and web worker processes.
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def get_async_redis():
+    """Return the asyncio Redis client of the running event loop"""
+    # Connections belong to the loop that opened them, and async_to_sync
+    # runs each call in a fresh loop.
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        _async_clients[loop] = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+    return _async_clients[loop]
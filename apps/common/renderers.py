@@ -0,0 +1,47 @@
+"""
+JSON rendering with orjson.
+
+ORJSONRenderer produces the same JSON as DRF's JSONRenderer with the default
+settings (compact, UTF-8, U+2028 and U+2029 escaped) several times faster.
+Strings, numbers, containers (ReturnDict and OrderedDict included) and UUIDs
+are encoded by orjson itself. Decimals, datetimes, phone numbers and the
+other types DRF's encoder knows about go through ``encode_default``, so they
+come out the way they did before.
+"""
+import orjson
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Datetimes are left to DRF's encoder, which trims them to milliseconds and
+# writes UTC as "Z".
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_drf_encoder = JSONEncoder()
+
+
+def encode_default(obj):
+    """Encode the types orjson leaves to us like DRF's JSONEncoder does"""
+    if isinstance(obj, PhoneNumber):
+        return str(obj)
+    return _drf_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in JSONRenderer encoding with orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            # Indented output is for people, the browsable API, not hot paths.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        # Valid JSON but not valid JavaScript, escaped like DRF does.
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
@@ -0,0 +1,86 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def forward_relation_path(model, attrs):
+    """
+    The select_related path of the leading foreign key and one-to-one
+    attributes of a dotted source, e.g. ``user`` for ``user.username``.
+    """
+    path = []
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not (field.many_to_one or field.one_to_one) or field.auto_created:
+            break
+        path.append(attr)
+        model = field.related_model
+    return "__".join(path)
+
+
+class EagerLoadingMixin:
+    """
+    ModelSerializer mixin loading every relation its fields read up front.
+
+    Dotted sources (``user.username``) and nested serializers become
+    select_related joins, nested serializers with many=True become a Prefetch
+    eager loaded in turn with the nested serializer's own needs. Relations
+    read in ways that cannot be inferred, such as by SerializerMethodFields,
+    are listed in ``select_related_fields`` and ``prefetch_related_fields``.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select_related, prefetch_related = cls.get_eager_loading()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    @classmethod
+    def get_eager_loading(cls):
+        """Return the (select_related, prefetch_related) lookups, built once"""
+        if "_eager_loading" not in cls.__dict__:
+            cls._eager_loading = cls.build_eager_loading()
+        return cls._eager_loading
+
+    @classmethod
+    def build_eager_loading(cls):
+        model = cls.Meta.model
+        select_related = set(cls.select_related_fields)
+        prefetch_related = list(cls.prefetch_related_fields)
+        for field in cls().fields.values():
+            if field.source == "*":
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                child = field.child
+                if hasattr(child, "setup_eager_loading"):
+                    related = child.Meta.model._default_manager.all()
+                    prefetch_related.append(
+                        Prefetch(
+                            "__".join(field.source_attrs),
+                            queryset=child.setup_eager_loading(related),
+                        )
+                    )
+                continue
+            if isinstance(field, EagerLoadingMixin):
+                # A nested object, joined along with the relations it reads.
+                path = forward_relation_path(model, field.source_attrs)
+                if path:
+                    select_related.add(path)
+                    nested, _ = field.get_eager_loading()
+                    select_related.update(f"{path}__{lookup}" for lookup in nested)
+                continue
+            # The last attribute is read off the related row, a foreign key
+            # itself is serialized from its id without a join.
+            path = forward_relation_path(model, field.source_attrs[:-1])
+            if path:
+                select_related.add(path)
+        return sorted(select_related), prefetch_related
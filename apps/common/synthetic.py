@@ -0,0 +1,308 @@
+"""
+Synthetic data for capacity testing, used by ``init_db --scale``.
+
+Rows are generated in fixed size chunks. Every chunk draws from its own
+random generator seeded from (seed, table, chunk number), so the same seed
+produces the same dataset whatever the number of workers. Chunks are written
+with bulk_create, either inline or by a pool of forked worker processes that
+each hold their own database connection.
+"""
+import math
+import multiprocessing
+import random
+import string
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.utils.text import slugify
+from faker import Faker
+
+from apps.enquiries.models import Enquiry
+from apps.profiles.models import Gender, Profile
+from apps.properties.geo import encode_geohash
+from apps.properties.models import Property
+from apps.ratings.models import Rating
+
+User = get_user_model()
+
+# City, latitude, longitude and share of the listings.
+CITIES = [
+    ("Douala", 4.0511, 9.7679, 30),
+    ("Yaounde", 3.8480, 11.5021, 25),
+    ("Bamenda", 5.9631, 10.1591, 10),
+    ("Bafoussam", 5.4781, 10.4176, 8),
+    ("Buea", 4.1560, 9.2632, 6),
+    ("Limbe", 4.0186, 9.2043, 5),
+    ("Garoua", 9.3017, 13.3921, 5),
+    ("Maroua", 10.5956, 14.3247, 4),
+    ("Kribi", 2.9400, 9.9100, 4),
+    ("Ngaoundere", 7.3167, 13.5833, 3),
+]
+# Property type, share of the listings and median price.
+PROPERTY_TYPES = [
+    ("House", 35, 120000),
+    ("Apartment", 30, 60000),
+    ("Land", 10, 30000),
+    ("Commercial", 6, 250000),
+    ("Office", 6, 150000),
+    ("Industrial", 3, 400000),
+    ("Storage", 3, 40000),
+    ("Parking", 2, 8000),
+    ("Other", 5, 50000),
+]
+ADVERT_TYPES = [("For Sale", 60), ("For Rent", 35), ("Auction", 5)]
+STREETS = ["Main", "Church", "Market", "Station", "Hill", "River", "Palm", "Beach"]
+FEATURES = [
+    "a large garden",
+    "a sea view",
+    "a swimming pool",
+    "parking for two cars",
+    "a quiet neighbourhood",
+    "a modern kitchen",
+    "easy access to the city centre",
+    "a backup generator",
+]
+COMMENTS = {
+    1: "Did not reply to my messages.",
+    2: "Slow to organise visits.",
+    3: "Helpful, the paperwork took a while.",
+    4: "Knew the area well and answered quickly.",
+    5: "Excellent, found us a home in a week.",
+}
+
+AGENT_RATIO = 0.2
+PUBLISHED_RATIO = 0.9
+MAX_PRICE = 999999
+# Largest number of reviews a single agent gets.
+MAX_REVIEWS_PER_AGENT = 200
+
+
+def chunk_random(seed, table, chunk):
+    return random.Random(f"{seed}:{table}:{chunk}")
+
+
+def chunk_faker(rng):
+    faker = Faker()
+    faker.seed_instance(rng.getrandbits(32))
+    return faker
+
+
+def weighted(rng, choices):
+    """Pick from (value, weight, ...) tuples"""
+    return rng.choices(choices, weights=[choice[1] for choice in choices])[0]
+
+
+def skewed_index(rng, size):
+    """Index into a list with the first entries picked far more often"""
+    return int(size * rng.random() ** 3)
+
+
+def build_users(rng, start, count, password):
+    faker = chunk_faker(rng)
+    users, profiles = [], []
+    for number in range(start, start + count):
+        first_name, last_name = faker.first_name(), faker.last_name()
+        username = f"{first_name}{last_name}{number}".lower()
+        users.append(
+            User(
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+                email=f"{username}@example.com",
+                password=password,
+            )
+        )
+    User.objects.bulk_create(users)
+    for user in users:
+        is_agent = rng.random() < AGENT_RATIO
+        profiles.append(
+            Profile(
+                user=user,
+                gender=rng.choice(Gender.values),
+                city=weighted(rng, CITIES)[0],
+                is_agent=is_agent,
+                is_seller=is_agent or rng.random() < 0.1,
+                is_buyer=not is_agent and rng.random() < 0.6,
+                license=f"LIC-{rng.randrange(10**8):08d}" if is_agent else None,
+            )
+        )
+    Profile.objects.bulk_create(profiles)
+    return len(users) + len(profiles)
+
+
+def build_property(rng, number, agent):
+    city, latitude, longitude, _ = weighted(rng, CITIES)
+    property_type, _, median_price = weighted(rng, PROPERTY_TYPES)
+    advert_type = weighted(rng, ADVERT_TYPES)[0]
+    bedrooms = max(0, min(int(rng.gauss(3, 1.5)), 8))
+    if property_type in ("Land", "Parking", "Storage"):
+        bedrooms = 0
+    price = median_price * rng.lognormvariate(0, 0.6)
+    if advert_type == "For Rent":
+        price /= 150
+    title = f"{bedrooms} bedroom {property_type} in {city}".title()
+    latitude += rng.gauss(0, 0.05)
+    longitude += rng.gauss(0, 0.05)
+    return Property(
+        user_id=agent,
+        title=title,
+        # Unique without a lookup, the row number is part of it.
+        slug=f"{slugify(title)[:36]}-{number}",
+        ref_code="REF-"
+        + "".join(rng.choices(string.ascii_uppercase + string.digits, k=10)),
+        description=(
+            f"{property_type} with {rng.choice(FEATURES)} and "
+            f"{rng.choice(FEATURES)}."
+        ).capitalize(),
+        city=city,
+        street_address=f"{rng.randint(1, 300)} {rng.choice(STREETS)} Street",
+        property_number=rng.randint(1, 999),
+        price=round(min(price, MAX_PRICE), 2),
+        tax=0.15,
+        plot_area=round(rng.lognormvariate(6.5, 0.5), 2),
+        bedrooms=bedrooms,
+        bathrooms=max(1, bedrooms - rng.randint(0, 2)) if bedrooms else 0,
+        total_floors=rng.choice([1, 1, 1, 2, 2, 3]),
+        garages=rng.choice([0, 0, 1, 1, 2]),
+        advert_type=advert_type,
+        property_type=property_type,
+        published_status=rng.random() < PUBLISHED_RATIO,
+        views=int(rng.paretovariate(1.5) * 10) - 10,
+        year_built=rng.randint(1960, 2024),
+        latitude=latitude,
+        longitude=longitude,
+        geohash=encode_geohash(latitude, longitude),
+    )
+
+
+def build_properties(rng, start, count, agents):
+    properties = []
+    for number in range(start, start + count):
+        agent = agents[skewed_index(rng, len(agents))]
+        properties.append(build_property(rng, number, agent))
+    for instance in properties:
+        instance._slug_reserved = True
+    Property.objects.bulk_create(properties)
+    return len(properties)
+
+
+def build_ratings(rng, start, count, agents, raters):
+    agents = agents[start : start + count]
+    ratings = []
+    for agent_pkid, agent_user in agents:
+        # Most agents have a handful of reviews, a few have a lot.
+        reviews = min(int(rng.paretovariate(1.1) * 3) - 3, MAX_REVIEWS_PER_AGENT)
+        quality = rng.uniform(2.5, 5)
+        candidates = rng.sample(raters, min(reviews + 1, len(raters)))
+        for rater in [rater for rater in candidates if rater != agent_user][:reviews]:
+            rating = max(1, min(round(rng.gauss(quality, 1)), 5))
+            ratings.append(
+                Rating(
+                    rater_id=rater,
+                    agent_id=agent_pkid,
+                    rating=rating,
+                    comment=COMMENTS[rating],
+                )
+            )
+    # Raters who already reviewed the agent in an earlier run are skipped, so
+    # the inserted rows are counted. Each chunk rates its own agents.
+    existing = Rating.objects.filter(agent_id__in=[pkid for pkid, user in agents])
+    before = existing.count()
+    Rating.objects.bulk_create(ratings, ignore_conflicts=True)
+    return existing.count() - before
+
+
+def build_enquiries(rng, start, count):
+    faker = chunk_faker(rng)
+    enquiries = [
+        Enquiry(
+            name=faker.name(),
+            phone_number=f"+2376{rng.randrange(10**8):08d}",
+            email=f"enquiry{number}@example.com",
+            subject=rng.choice(["Viewing", "Price", "Availability"]),
+            message=f"Is the {rng.choice(FEATURES)} still available?",
+        )
+        for number in range(start, start + count)
+    ]
+    Enquiry.objects.bulk_create(enquiries)
+    return len(enquiries)
+
+
+BUILDERS = {
+    "users": build_users,
+    "properties": build_properties,
+    "ratings": build_ratings,
+    "enquiries": build_enquiries,
+}
+
+
+def run_chunk(task):
+    table, seed, chunk, start, count, extra = task
+    rng = chunk_random(seed, table, chunk)
+    return BUILDERS[table](rng, start, count, *extra)
+
+
+def close_connections():
+    # Forked workers must not share the parent's database socket.
+    connections.close_all()
+
+
+class SyntheticDataGenerator:
+    """Fill the database with a realistic, reproducible dataset"""
+
+    def __init__(self, seed=0, workers=1, chunk_size=2000, stdout=None):
+        self.seed = seed
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.stdout = stdout
+        self.stats = []
+
+    def run(self, table, total, offset=0, extra=()):
+        """Build ``total`` rows of ``table`` in chunks and record the rate"""
+        tasks = [
+            (
+                table,
+                self.seed,
+                chunk,
+                offset + start,
+                min(self.chunk_size, total - start),
+                extra,
+            )
+            for chunk, start in enumerate(range(0, total, self.chunk_size))
+        ]
+        started = time.monotonic()
+        if self.workers > 1 and len(tasks) > 1:
+            close_connections()
+            context = multiprocessing.get_context("fork")
+            with context.Pool(self.workers, initializer=close_connections) as pool:
+                rows = sum(pool.imap_unordered(run_chunk, tasks))
+        else:
+            rows = sum(run_chunk(task) for task in tasks)
+        seconds = time.monotonic() - started
+        self.stats.append((table, rows, seconds))
+        if self.stdout is not None:
+            rate = rows / seconds if seconds else math.inf
+            self.stdout.write(
+                f"{table}: {rows} rows in {seconds:.1f}s ({rate:.0f} rows/s)"
+            )
+        return rows
+
+    def generate(self, users, properties, enquiries, password):
+        """Generate the whole dataset, returns the total number of rows"""
+        offset = User.objects.count()
+        self.run("users", users, offset, (password,))
+
+        agents = list(
+            Profile.objects.filter(is_agent=True)
+            .order_by("pkid")
+            .values_list("pkid", "user_id")
+        )
+        if agents:
+            agent_users = [user for pkid, user in agents]
+            self.run("properties", properties, Property.objects.count(), (agent_users,))
+            raters = list(User.objects.order_by("pkid").values_list("pkid", flat=True))
+            self.run("ratings", len(agents), 0, (agents, raters))
+            Rating.objects.reconcile_agents()
+        self.run("enquiries", enquiries, Enquiry.objects.count())
+        return sum(rows for table, rows, seconds in self.stats)
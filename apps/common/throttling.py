@@ -0,0 +1,126 @@
+"""
+Token-bucket throttling shared by every API process through Redis.
+
+Each client gets a bucket per scope holding up to N tokens, refilled at N per
+period, and every request takes one. Rates use DRF's syntax and live in
+``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]``: ``"search": "60/min"`` lets a
+client burst 60 searches and then make one a second. Authenticated users get
+the ``"<scope>.user"`` rate when there is one. Checking and taking a token is
+one Lua script call, timed by the Redis clock so that the API nodes need not
+agree on the time.
+"""
+import logging
+
+import redis
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from .redis import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] is the bucket hash, ARGV[1] its capacity and ARGV[2] the tokens
+# added per second. Returns whether a token was taken and, when none was
+# left, the seconds until one is, as a string since Lua numbers are truncated
+# on the way out.
+TAKE_TOKEN_SCRIPT = """
+redis.replicate_commands()
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(bucket[1]) or capacity
+local at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - at) * rate)
+local allowed, wait = 0, 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+_take_token = None
+
+
+def take_token(key, capacity, per_second):
+    """Take a token from the bucket, return ``(allowed, seconds to wait)``"""
+    global _take_token
+    if _take_token is None:
+        _take_token = get_redis().register_script(TAKE_TOKEN_SCRIPT)
+    allowed, wait = _take_token(keys=[key], args=[capacity, per_second])
+    return bool(allowed), float(wait)
+
+
+async def atake_token(key, capacity, per_second):
+    """take_token() over the asyncio Redis client"""
+    script = get_async_redis().register_script(TAKE_TOKEN_SCRIPT)
+    allowed, wait = await script(keys=[key], args=[capacity, per_second])
+    return bool(allowed), float(wait)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Throttle requests by the view's ``throttle_scope``, or the ``scope`` of a
+    subclass for function based views. Requests are let through when the
+    scope has no rate or Redis cannot be reached.
+    """
+
+    scope = None
+
+    def __init__(self):
+        # The rate depends on the view and the client, see allow_request.
+        self.wait_seconds = None
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return f"throttle:{self.scope}:{ident}"
+
+    def get_scope_rate(self, request):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        if request.user and request.user.is_authenticated:
+            return rates.get(f"{self.scope}.user", rates.get(self.scope))
+        return rates.get(self.scope)
+
+    def get_bucket(self, request, view):
+        """``(key, capacity, tokens per second)``, None when not throttled"""
+        self.scope = self.scope or getattr(view, "throttle_scope", None)
+        rate = self.get_scope_rate(request) if self.scope else None
+        if rate is None:
+            return None
+        capacity, period = self.parse_rate(rate)
+        return self.get_cache_key(request, view), capacity, capacity / period
+
+    def allow_request(self, request, view):
+        bucket = self.get_bucket(request, view)
+        if bucket is None:
+            return True
+        try:
+            allowed, self.wait_seconds = take_token(*bucket)
+        except redis.RedisError:
+            logger.warning(f"Not throttling {self.scope}, Redis is unavailable")
+            return True
+        return allowed
+
+    async def aallow_request(self, request, view=None):
+        """allow_request() for async views"""
+        bucket = self.get_bucket(request, view)
+        if bucket is None:
+            return True
+        try:
+            allowed, self.wait_seconds = await atake_token(*bucket)
+        except redis.RedisError:
+            logger.warning(f"Not throttling {self.scope}, Redis is unavailable")
+            return True
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
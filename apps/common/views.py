@@ -1,3 +1,9 @@
-from django.shortcuts import render
+class EagerLoadingViewMixin:
+    """
+    Generic view mixin eager loading the queryset for its serializer, see
+    apps.common.serializers.EagerLoadingMixin.
+    """
 
-# Create your views here.
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return self.get_serializer_class().setup_eager_loading(queryset)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Enquiry
+from .models import Enquiry, EnquiryOutbox
 
 
 class EnquiryAdmin(admin.ModelAdmin):
@@ -10,3 +10,12 @@ class EnquiryAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Enquiry, EnquiryAdmin)
+
+
+class EnquiryOutboxAdmin(admin.ModelAdmin):
+    list_display = ("enquiry", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    readonly_fields = ("enquiry", "attempts", "last_error", "sent_at")
+
+
+admin.site.register(EnquiryOutbox, EnquiryOutboxAdmin)
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.7 on 2026-10-18 17:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enquiries', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnquiryOutbox',
+            fields=[
+                ('pkid', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Next Attempt')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent')),
+                ('enquiry', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='outbox', to='enquiries.enquiry', verbose_name='Enquiry')),
+            ],
+            options={
+                'verbose_name': 'Enquiry Outbox',
+                'verbose_name_plural': 'Enquiry Outbox',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='enquiryoutbox',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='enquiry_outbox_pending_idx'),
+        ),
+    ]
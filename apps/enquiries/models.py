@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
 
@@ -18,3 +19,49 @@ class Enquiry(TimeStampedUUIDModel):
     class Meta:
         verbose_name = _("Enquiry")
         verbose_name_plural = _("Enquiries")
+
+
+class EnquiryOutbox(TimeStampedUUIDModel):
+    """
+    The email of an enquiry waiting to be delivered, written in the same
+    transaction as the enquiry and drained by apps/enquiries/outbox.py.
+    """
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        SENT = "sent", _("Sent")
+        FAILED = "failed", _("Failed")
+
+    enquiry = models.OneToOneField(
+        Enquiry,
+        related_name="outbox",
+        verbose_name=_("Enquiry"),
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(
+        verbose_name=_("Status"),
+        max_length=10,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(verbose_name=_("Attempts"), default=0)
+    next_attempt_at = models.DateTimeField(
+        verbose_name=_("Next Attempt"), default=timezone.now
+    )
+    last_error = models.TextField(verbose_name=_("Last Error"), blank=True)
+    sent_at = models.DateTimeField(verbose_name=_("Sent"), null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.enquiry.email} ({self.status})"
+
+    class Meta:
+        verbose_name = _("Enquiry Outbox")
+        verbose_name_plural = _("Enquiry Outbox")
+        indexes = [
+            # Only the pending rows are ever scanned by the drain.
+            models.Index(
+                fields=["next_attempt_at"],
+                name="enquiry_outbox_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
@@ -0,0 +1,156 @@
+"""
+Delivery of enquiry emails from the outbox.
+
+The enquiry endpoint only writes an Enquiry and its EnquiryOutbox row, in
+one transaction, and queues deliver_enquiries (apps/enquiries/tasks.py) once
+it commits. The task leases the due rows in batches, sends every email of a
+batch over one SMTP connection outside of any transaction, and reschedules
+the ones that failed with an exponential backoff, giving up after
+ENQUIRY_OUTBOX_MAX_ATTEMPTS. Workers draining at the same time skip the rows
+another one has leased. When the connection itself fails the rest of the
+batch is released without using up an attempt and the task is retried.
+"""
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EnquiryOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts):
+    """Seconds to wait after the given number of failed attempts"""
+    return min(
+        settings.ENQUIRY_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.ENQUIRY_OUTBOX_MAX_RETRY_DELAY,
+    )
+
+
+def enquiry_message(enquiry, connection):
+    return EmailMessage(
+        subject=enquiry.subject,
+        body=enquiry.message,
+        from_email=enquiry.email,
+        to=[settings.DEFAULT_FROM_EMAIL],
+        connection=connection,
+    )
+
+
+def record_failure(entry, error, now):
+    entry.attempts += 1
+    entry.last_error = f"{type(error).__name__}: {error}"
+    if entry.attempts >= settings.ENQUIRY_OUTBOX_MAX_ATTEMPTS:
+        entry.status = EnquiryOutbox.StatusChoices.FAILED
+        logger.error(f"Gave up on the email of enquiry {entry.enquiry.id}: {error}")
+    else:
+        entry.next_attempt_at = now + timedelta(seconds=retry_delay(entry.attempts))
+
+
+# Failures of the connection rather than of one email: the batch stops and
+# the task is retried with Celery's backoff. SMTPConnectError is a response
+# error and every SMTPException an OSError, hence the order they are caught.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+REFUSED_ERRORS = (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)
+
+
+def claim_batch(batch_size):
+    """
+    Lease up to batch_size due outbox rows to this worker and return them.
+
+    The rows are locked only while their next_attempt_at is pushed out by
+    ENQUIRY_OUTBOX_LEASE, which hides them from other workers while the
+    emails are sent outside of any transaction. A worker dying mid-batch
+    leaves its rows to be picked up again once the lease runs out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EnquiryOutbox.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("enquiry")
+            .filter(
+                status=EnquiryOutbox.StatusChoices.PENDING, next_attempt_at__lte=now
+            )
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        for entry in batch:
+            entry.next_attempt_at = now + timedelta(
+                seconds=settings.ENQUIRY_OUTBOX_LEASE
+            )
+        EnquiryOutbox.objects.bulk_update(batch, ["next_attempt_at"])
+    return batch
+
+
+def deliver_batch(connection, batch_size):
+    """
+    Send the emails of up to batch_size due outbox rows over the open
+    connection and return ``(sent, failed)``. Connection errors stop the
+    batch and are raised, the rows not sent yet are released uncharged.
+    """
+    batch = claim_batch(batch_size)
+    now = timezone.now()
+    sent = failed = 0
+    done = []
+    try:
+        for entry in batch:
+            try:
+                # Reopens the connection if a previous failure closed it.
+                connection.open()
+                enquiry_message(entry.enquiry, connection).send()
+            except CONNECTION_ERRORS:
+                connection.close()
+                raise
+            except REFUSED_ERRORS as error:
+                # Refused by the server, the connection is still usable.
+                record_failure(entry, error, now)
+                failed += 1
+            except OSError:
+                connection.close()
+                raise
+            except Exception as error:
+                connection.close()
+                record_failure(entry, error, now)
+                failed += 1
+            else:
+                entry.attempts += 1
+                entry.status = EnquiryOutbox.StatusChoices.SENT
+                entry.sent_at = timezone.now()
+                entry.last_error = ""
+                sent += 1
+            done.append(entry)
+    finally:
+        for entry in batch[len(done) :]:
+            entry.next_attempt_at = now
+        EnquiryOutbox.objects.bulk_update(
+            batch,
+            ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+        )
+    return sent, failed
+
+
+def drain_outbox(batch_size=None, max_batches=None):
+    """
+    Deliver due outbox emails batch by batch until none are left, or
+    max_batches were sent, and return ``(sent, failed)``
+    """
+    batch_size = batch_size or settings.ENQUIRY_OUTBOX_BATCH_SIZE
+    connection = get_connection(settings.ENQUIRY_EMAIL_BACKEND, fail_silently=False)
+    sent = failed = batches = 0
+    # Fails early, with nothing claimed, when the mail server is down.
+    connection.open()
+    try:
+        while max_batches is None or batches < max_batches:
+            batch_sent, batch_failed = deliver_batch(connection, batch_size)
+            sent += batch_sent
+            failed += batch_failed
+            batches += 1
+            if batch_sent + batch_failed < batch_size:
+                break
+    finally:
+        connection.close()
+    return sent, failed
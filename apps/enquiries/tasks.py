@@ -0,0 +1,21 @@
+import logging
+import smtplib
+
+from celery import shared_task
+
+from .outbox import drain_outbox
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    autoretry_for=(smtplib.SMTPException, OSError),
+    retry_backoff=True,
+    retry_backoff_max=60 * 10,
+    max_retries=8,
+)
+def deliver_enquiries():
+    """Send the enquiry emails waiting in the outbox"""
+    sent, failed = drain_outbox()
+    logger.info(f"Delivered {sent} enquiry emails, {failed} failed")
+    return sent
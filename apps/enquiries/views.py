@@ -1,41 +1,30 @@
-from django.core.mail import send_mail
-from rest_framework import permissions
-from rest_framework.decorators import api_view, permission_classes
+from django.db import transaction
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 
-from real_estate.settings.development import DEFAULT_FROM_EMAIL
+from apps.common.throttling import TokenBucketThrottle
 
-from .models import Enquiry
+from .models import EnquiryOutbox
+from .serializers import CreateEnquirySerializer
+from .tasks import deliver_enquiries
+
+
+class EnquiryThrottle(TokenBucketThrottle):
+    scope = "enquiry"
 
 
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([EnquiryThrottle])
 def send_enquiry_email(request):
-    data = request.data
-    try:
-        subject = data["subject"]
-        name = data["name"]
-        email = data["email"]
-        message = data["message"]
-        from_email = data["email"]
-        recipient_list = [DEFAULT_FROM_EMAIL]
-        send_mail(
-            subject,
-            message,
-            from_email,
-            recipient_list,
-            fail_silently=False,
-        )
-        print(data["phone_number"])
-        enquiry = Enquiry.objects.create(
-            name=name,
-            phone_number=data["phone_number"],
-            email=email,
-            subject=subject,
-            message=message,
-        )
-        enquiry.save()
-        return Response({"success": "Your enquiry has been sent"})
-    except Exception as e:
-        print(e)
-        return Response({"error": "Something went wrong, please try again later"})
+    serializer = CreateEnquirySerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    # The email is sent by the outbox worker, see apps/enquiries/outbox.py.
+    with transaction.atomic():
+        enquiry = serializer.save()
+        EnquiryOutbox.objects.create(enquiry=enquiry)
+        transaction.on_commit(deliver_enquiries.delay)
+    return Response(
+        {"success": "Your enquiry has been received"}, status=status.HTTP_202_ACCEPTED
+    )
@@ -1,7 +1,7 @@
 from rest_framework.exceptions import APIException
 
 
-class ProfileDoesNotExist(Exception):
+class ProfileDoesNotExist(APIException):
     """Raised when a profile is not found."""
 
     status_code = 404
@@ -9,7 +9,7 @@ class ProfileDoesNotExist(Exception):
     default_code = "profile_not_found"
 
 
-class NotYourProfileError(Exception):
+class NotYourProfileError(APIException):
     """Raised when a user tries to access a profile that is not theirs."""
 
     status_code = 403
@@ -0,0 +1,166 @@
+"""
+Precomputed top-agent leaderboard.
+
+rebuild_leaderboard() runs on a schedule (CELERY_BEAT_SCHEDULE) and ranks
+every agent by the Bayesian average of their ratings, pulled towards the mean
+of all agents until they have a few reviews, plus a bonus growing with the
+log of their published listings. The ranking is written to a Redis sorted set
+of profile ids and a hash of the serialized entries, both swapped in at once,
+so reading a page of the leaderboard is one Redis call and no SQL.
+
+Until the task has run, reads rank the agents in process and queue it once.
+The leaderboard has its own ranks, the top_agent flag is left to the admins.
+"""
+import json
+import logging
+import math
+
+import redis
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.common.redis import get_redis
+
+from .models import Profile
+from .serializers import LeaderboardSerializer
+
+logger = logging.getLogger(__name__)
+
+RANKING_KEY = "profiles:leaderboard"
+ENTRIES_KEY = "profiles:leaderboard:entries"
+BUILT_AT_KEY = "profiles:leaderboard:built-at"
+REBUILD_QUEUED_KEY = "profiles:leaderboard:rebuild-queued"
+# Seconds before a read finding no leaderboard queues the task again.
+REBUILD_QUEUED_TIMEOUT = 60 * 5
+
+# Reads the count and one page of entries in one round trip, so a rebuild
+# swapping the keys in between cannot mix two rankings. Members are scored by
+# their rank. Returns false when the leaderboard was never built.
+READ_PAGE_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 0 then
+    return false
+end
+local ids = redis.call('ZRANGE', KEYS[1], ARGV[1], ARGV[2])
+local entries = {}
+if #ids > 0 then
+    entries = redis.call('HMGET', KEYS[2], unpack(ids))
+end
+return {redis.call('ZCARD', KEYS[1]), entries}
+"""
+
+# Reviews an agent needs before their own average outweighs the global one.
+PRIOR_REVIEWS = 5
+# Points for published listings, log(1 + listings) times this.
+LISTING_WEIGHT = 0.25
+
+_read_page = None
+
+
+def bayesian_average(rating_total, num_reviews, mean):
+    return (PRIOR_REVIEWS * mean + rating_total) / (PRIOR_REVIEWS + num_reviews)
+
+
+def agent_score(rating_total, num_reviews, listings, mean):
+    return bayesian_average(
+        rating_total, num_reviews, mean
+    ) + LISTING_WEIGHT * math.log1p(listings)
+
+
+def rank_agents():
+    """
+    Return the agents best first, each annotated with ``listings`` and given
+    a ``score`` and ``rank``. The review aggregates kept on Profile are used,
+    so this is one aggregate and one listing query.
+    """
+    agents = Profile.objects.filter(is_agent=True)
+    totals = agents.aggregate(total=Sum("rating_total"), count=Sum("num_reviews"))
+    mean = totals["total"] / totals["count"] if totals["count"] else 0
+
+    ranked = list(
+        LeaderboardSerializer.setup_eager_loading(agents).annotate(
+            listings=Count(
+                "user__agent_buyer",
+                filter=Q(user__agent_buyer__published_status=True),
+            )
+        )
+    )
+    for agent in ranked:
+        agent.score = round(
+            agent_score(
+                agent.rating_total, agent.num_reviews or 0, agent.listings, mean
+            ),
+            4,
+        )
+    # Ties go to the agent with more reviews, then the older profile.
+    ranked.sort(key=lambda agent: (-agent.score, -(agent.num_reviews or 0), agent.pkid))
+    for rank, agent in enumerate(ranked, 1):
+        agent.rank = rank
+    return ranked
+
+
+def rebuild_leaderboard():
+    """Rank the agents and publish the leaderboard"""
+    ranked = rank_agents()
+    entries = LeaderboardSerializer(ranked, many=True).data
+    client = get_redis()
+    staging = [f"{RANKING_KEY}:next", f"{ENTRIES_KEY}:next"]
+    client.delete(*staging)
+    if entries:
+        for start in range(0, len(entries), 1000):
+            batch = entries[start : start + 1000]
+            client.zadd(staging[0], {entry["id"]: entry["rank"] for entry in batch})
+            client.hset(
+                staging[1],
+                mapping={
+                    entry["id"]: json.dumps(entry, cls=JSONEncoder) for entry in batch
+                },
+            )
+
+    # Readers see either the previous leaderboard or this one, never a mix.
+    with client.pipeline(transaction=True) as pipe:
+        if entries:
+            pipe.rename(staging[0], RANKING_KEY)
+            pipe.rename(staging[1], ENTRIES_KEY)
+        else:
+            pipe.delete(RANKING_KEY, ENTRIES_KEY)
+        pipe.set(BUILT_AT_KEY, timezone.now().isoformat())
+        pipe.execute()
+    return len(entries)
+
+
+def read_leaderboard(start, stop):
+    """
+    Return ``(count, entries)`` for the ranks ``start`` to ``stop`` (0-based,
+    inclusive), or None when the leaderboard has not been built yet.
+    """
+    global _read_page
+    client = get_redis()
+    if _read_page is None:
+        _read_page = client.register_script(READ_PAGE_SCRIPT)
+    page = _read_page(keys=[RANKING_KEY, ENTRIES_KEY, BUILT_AT_KEY], args=[start, stop])
+    if page is None:
+        return None
+    count, entries = page
+    return count, [json.loads(entry) for entry in entries if entry is not None]
+
+
+def leaderboard_page(start, stop):
+    """
+    read_leaderboard() that ranks the agents in process, without writing
+    anything, when the leaderboard has not been built or Redis is unavailable.
+    The first read finding no leaderboard queues the rank_top_agents task.
+    """
+    # The task module imports this one.
+    from .tasks import rank_top_agents
+
+    try:
+        page = read_leaderboard(start, stop)
+        if page is not None:
+            return page
+        if get_redis().set(REBUILD_QUEUED_KEY, 1, nx=True, ex=REBUILD_QUEUED_TIMEOUT):
+            rank_top_agents.delay()
+    except redis.RedisError:
+        logger.exception("Leaderboard unavailable, ranking the agents in process")
+    ranked = rank_agents()
+    return len(ranked), LeaderboardSerializer(ranked[start : stop + 1], many=True).data
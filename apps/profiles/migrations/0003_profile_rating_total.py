@@ -0,0 +1,37 @@
+# Generated by Django 3.2.7 on 2026-10-18 17:11
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Profile = apps.get_model('profiles', 'Profile')
+    Rating = apps.get_model('ratings', 'Rating')
+    reviews = Rating.objects.filter(agent=OuterRef('pkid')).values('agent')
+    Profile.objects.update(
+        num_reviews=Coalesce(
+            Subquery(reviews.annotate(count=Count('pkid')).values('count')), 0
+        ),
+        rating_total=Coalesce(
+            Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0
+        ),
+        rating=Subquery(reviews.annotate(average=Avg('rating')).values('average')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_rename_udpated_at_profile_updated_at'),
+        ('ratings', '0003_alter_rating_agent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Sum of the Ratings'),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
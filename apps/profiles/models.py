@@ -63,6 +63,11 @@ class Profile(TimeStampedUUIDModel):
     num_reviews = models.IntegerField(
         verbose_name=_("Number of Reviews"), default=0, null=True, blank=True
     )
+    # Sum of the review scores, kept next to num_reviews so a new review
+    # updates the average without reading the others, see RatingManager.
+    rating_total = models.PositiveIntegerField(
+        verbose_name=_("Sum of the Ratings"), default=0, editable=False
+    )
 
     def __str__(self) -> str:
         return f"{self.user.username}'s Profile"
@@ -1,7 +1,68 @@
+from collections import OrderedDict
+
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class ProfilePagination(PageNumberPagination):
     page_size = 3
     page_size_query_param = "page_size"
     max_page_size = 1000
+
+
+class LeaderboardPagination(ProfilePagination):
+    """
+    Page numbers over the leaderboard stored in Redis, same response shape as
+    the other profile lists.
+    """
+
+    page_size = 10
+
+    def paginate_leaderboard(self, request, read_page):
+        """
+        Return the entries of the requested page, ``read_page(start, stop)``
+        returns ``(count, entries)`` for the 0-based, inclusive rank range.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            self.number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.number = 0
+        if self.number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=self.number))
+
+        start = (self.number - 1) * page_size
+        self.count, entries = read_page(start, start + page_size - 1)
+        if self.number > 1 and start >= self.count:
+            raise NotFound(self.invalid_page_message.format(page_number=self.number))
+        self.has_next = start + page_size < self.count
+        return entries
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
@@ -1,21 +1,9 @@
-import json
+from apps.common.renderers import ORJSONRenderer
 
-from rest_framework.renderers import JSONRenderer
 
-
-class ProfileJSONRenderer(JSONRenderer):
+class ProfileJSONRenderer(ORJSONRenderer):
     charset = "utf-8"
 
     def render(self, data, media_type=None, renderer_context=None):
-        # If we receive a `token` key as part of the response, it will be a
-        # byte object. Byte objects don't serialize well, so we need to
-        # decode it before rendering the Profile object.
-        # token = data["token"]
-
-        # if token is not None and isinstance(token, bytes):
-        #     # Also as mentioned above, we will decode `token` if it is of type
-        #     # bytes.
-        #     data["token"] = token.decode("utf-8")
-
-        # Finally, we can render our data under the "profile" namespace.
-        return json.dumps({"profile": data})
+        # Render the data under the "profile" namespace.
+        return super().render({"profile": data}, media_type, renderer_context)
@@ -1,12 +1,13 @@
 from django_countries.serializer_fields import CountryField
 from rest_framework import serializers
 
+from apps.common.serializers import EagerLoadingMixin
 from apps.ratings.serializers import RatingSerializer
 
 from .models import Profile
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     username = serializers.CharField(source="user.username")
     first_name = serializers.CharField(source="user.first_name")
     last_name = serializers.CharField(source="user.last_name")
@@ -14,7 +15,7 @@ class ProfileSerializer(serializers.ModelSerializer):
     email = serializers.CharField(source="user.email")
     full_name = serializers.CharField(source="user.get_full_name", read_only=True)
     country = serializers.CharField(source="country.name", read_only=True)
-    reviews = RatingSerializer(many=True, read_only=True)
+    reviews = RatingSerializer(source="agent_reviews", many=True, read_only=True)
 
     class Meta:
         model = Profile
@@ -47,11 +48,6 @@ class ProfileSerializer(serializers.ModelSerializer):
     # def get_country(self, obj):
     #     return obj.country.name
 
-    def get_reviews(self, obj):
-        reviews = obj.reviews.all()
-        serializer = RatingSerializer(reviews, many=True)
-        return serializer.data
-
     def to_representation(self, instance):
         """Convert `username` to lowercase."""
         ret = super().to_representation(instance)
@@ -60,6 +56,31 @@ class ProfileSerializer(serializers.ModelSerializer):
         return ret
 
 
+class ProfileListSerializer(ProfileSerializer):
+    """A profile in the lists, reviews are only served for a single profile"""
+
+    class Meta(ProfileSerializer.Meta):
+        fields = [
+            field for field in ProfileSerializer.Meta.fields if field != "reviews"
+        ]
+
+
+class LeaderboardSerializer(ProfileSerializer):
+    """An agent's entry in the leaderboard, see apps/profiles/leaderboard.py"""
+
+    rank = serializers.IntegerField(read_only=True)
+    score = serializers.FloatField(read_only=True)
+    listings = serializers.IntegerField(read_only=True)
+
+    class Meta(ProfileSerializer.Meta):
+        fields = [
+            "rank",
+            "score",
+            "listings",
+            *[field for field in ProfileSerializer.Meta.fields if field != "reviews"],
+        ]
+
+
 class UpdateProfileSerializer(serializers.ModelSerializer):
     country = CountryField(name_only=True)
 
@@ -0,0 +1,15 @@
+import logging
+
+from celery import shared_task
+
+from .leaderboard import rebuild_leaderboard
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rank_top_agents():
+    """Recompute the top-agent leaderboard served by TopAgentsListAPIView"""
+    ranked = rebuild_leaderboard()
+    logger.info(f"Ranked {ranked} agents")
+    return ranked
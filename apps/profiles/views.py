@@ -1,24 +1,33 @@
+from django.db.models import prefetch_related_objects
 from django.shortcuts import render
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .pagination import ProfilePagination
+
+from apps.common.views import EagerLoadingViewMixin
 
 from .exceptions import NotYourProfileError, ProfileDoesNotExist
+from .leaderboard import leaderboard_page
 from .models import Profile
+from .pagination import LeaderboardPagination, ProfilePagination
 from .renderers import ProfileJSONRenderer
-from .serializers import ProfileSerializer, UpdateProfileSerializer
+from .serializers import (
+    LeaderboardSerializer,
+    ProfileListSerializer,
+    ProfileSerializer,
+    UpdateProfileSerializer,
+)
 
 
-class AgentListAPIView(generics.ListAPIView):
+class AgentListAPIView(EagerLoadingViewMixin, generics.ListAPIView):
     renderer_classes = (ProfileJSONRenderer,)
-    serializer_class = ProfileSerializer
+    serializer_class = ProfileListSerializer
+    queryset = Profile.objects.filter(is_agent=True)
 
     def get(self, request, format=None):
-        agents = Profile.objects.filter(is_agent=True)
-        serializer = self.serializer_class(agents, many=True)
+        serializer = self.get_serializer(self.get_queryset(), many=True)
         return Response(serializer.data)
 
 
@@ -35,12 +44,13 @@ def agent_list_api_view(request):
 
 class TopAgentsListAPIView(generics.ListAPIView):
     renderer_classes = [ProfileJSONRenderer]
-    serializer_class = ProfileSerializer
+    serializer_class = LeaderboardSerializer
+    pagination_class = LeaderboardPagination
 
     def get(self, request, format=None):
-        agents = Profile.objects.filter(top_agent=True)
-        serializer = self.serializer_class(agents, many=True)
-        return Response(serializer.data)
+        # Ranked ahead of time by the rank_top_agents task, see leaderboard.py
+        entries = self.paginator.paginate_leaderboard(request, leaderboard_page)
+        return self.get_paginated_response(entries)
 
 
 class GetProfileAPIView(APIView):
@@ -55,8 +65,13 @@ class GetProfileAPIView(APIView):
     #     return Response(serializer.data, status=status.HTTP_200_OK)
 
     def get(self, request):
-        user = request.user
-        profile = Profile.objects.get(user=user)
+        # Loaded along with the user by CachedJWTAuthentication.
+        try:
+            profile = request.user.profile
+        except Profile.DoesNotExist:
+            raise ProfileDoesNotExist("Profile does not exist")
+        select_related, prefetch_related = ProfileSerializer.get_eager_loading()
+        prefetch_related_objects([profile], *prefetch_related)
         serializer = ProfileSerializer(profile, context={"request": request})
         return Response(serializer.data)
 
@@ -76,7 +91,9 @@ class ProfileUpdateAPIView(APIView):
 
     def patch(self, request, username):
         try:
-            profile = Profile.objects.get(user__username=username)
+            profile = Profile.objects.select_related("user").get(
+                user__username=username
+            )
         except Profile.DoesNotExist:
             raise ProfileDoesNotExist("Profile does not exist")
 
@@ -84,19 +101,19 @@ class ProfileUpdateAPIView(APIView):
         if user_name != username:
             raise NotYourProfileError("Not your profile to update")
 
+        # Not request.user.profile, which may be a cached copy with stale
+        # rating aggregates that save() would write back.
         serializer = self.serializer_class(
-            instance=request.user.profile, data=request.data, partial=True
+            instance=profile, data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class GetAllProfilesAPIView(generics.ListAPIView):
+class GetAllProfilesAPIView(EagerLoadingViewMixin, generics.ListAPIView):
     renderer_classes = [ProfileJSONRenderer]
-    serializer_class = ProfileSerializer
+    serializer_class = ProfileListSerializer
     # set up pagination for profiles
     pagination_class = ProfilePagination
-
-    def get_queryset(self):
-        return Profile.objects.all()
+    queryset = Profile.objects.order_by("pkid")
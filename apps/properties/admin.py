@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Property, PropertyViews
+from .models import Property, PropertyImportJob, PropertyViews
 
 
 class PropertyAdmin(admin.ModelAdmin):
@@ -30,5 +30,21 @@ class PropertyAdmin(admin.ModelAdmin):
     # prepopulated_fields = {"slug": ("title",)}
 
 
+class PropertyImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "source",
+        "status",
+        "total_rows",
+        "created_rows",
+        "updated_rows",
+        "unchanged_rows",
+        "failed_rows",
+        "created_at",
+    )
+    list_filter = ("status", "format", "created_at")
+
+
 admin.site.register(Property, PropertyAdmin)
+admin.site.register(PropertyImportJob, PropertyImportJobAdmin)
 admin.site.register(PropertyViews)
@@ -0,0 +1,87 @@
+"""
+Async versions of the property list, detail and search endpoints.
+
+Served under ASGI, a request waiting on Postgres or Redis holds neither a
+worker process nor a thread: queries go through the ORM thread pool of
+apps/common/aio.py and the response cache, view counter and throttle use the
+asyncio Redis client. Query building, filtering, pagination and
+serialization are the sync views', so both return the same responses. The
+async search only returns JSON, streamed exports stay on the sync endpoint.
+"""
+import asyncio
+
+from apps.common.aio import async_api_view, authenticate, drf_view, json_response, orm
+
+from . import cache
+from .counters import arecord_view
+from .exceptions import PropertyNotFound
+from .models import Property
+from .serializers import PropertySerializer
+from .views import CachedListMixin, ListAllPropertyAPIView, PropertySearchAPIView
+
+
+def cache_headers(hit):
+    return {"X-Cache": "HIT" if hit else "MISS"}
+
+
+@async_api_view(["GET"])
+async def property_list(request):
+    await authenticate(request)
+    view = drf_view(ListAllPropertyAPIView, request)
+
+    def produce():
+        return super(CachedListMixin, view).list(view.request).data
+
+    data, hit = await cache.acached_response_data(
+        view.cache_namespace, view.get_cache_params(), orm(produce)
+    )
+    return json_response(data, headers=cache_headers(hit))
+
+
+def get_property(slug):
+    try:
+        return Property.objects.select_related("user").get(slug=slug)
+    except Property.DoesNotExist:
+        return None
+
+
+@async_api_view(["GET"])
+async def property_detail(request, slug):
+    # The user and the property are looked up at the same time.
+    user, property = await asyncio.gather(
+        authenticate(request), orm(get_property)(slug), return_exceptions=True
+    )
+    if isinstance(user, Exception):
+        raise user
+    if isinstance(property, Exception):
+        raise property
+    if property is None:
+        raise PropertyNotFound
+
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for:
+        ip_address = x_forwarded_for.split(",")[0]
+    else:
+        ip_address = request.META.get("REMOTE_ADDR")
+    await arecord_view(property.pkid, ip_address)
+    serializer = PropertySerializer(property, context={"request": request})
+    return json_response(serializer.data)
+
+
+@async_api_view(["POST"])
+async def property_search(request):
+    await authenticate(request, required=False)
+    view = drf_view(PropertySearchAPIView, request)
+
+    for throttle in view.get_throttles():
+        if not await throttle.aallow_request(view.request, view):
+            view.throttled(view.request, throttle.wait())
+
+    data, hit = await cache.acached_response_data(
+        "search", view.get_cache_params(), orm(view.get_results)
+    )
+    return json_response(data, headers=cache_headers(hit))
+
+
+# POST only carries the filters, see apps/common/db_router.py.
+property_search.replica_reads = True
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.common.db_router import pinned_to_primary, primary_reads
+from apps.common.redis import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "properties:cache:version"
+STATS_KEY = "properties:cache:stats"
+
+# Reads the current version and the entry stored under it, and counts the
+# hit or miss, in one round trip. Returns {version, cached value or false}.
+LOOKUP_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local value = redis.call('GET', ARGV[1] .. ':' .. version .. ':' .. ARGV[2])
+if value then
+    redis.call('HINCRBY', KEYS[2], ARGV[3] .. ':hits', 1)
+else
+    redis.call('HINCRBY', KEYS[2], ARGV[3] .. ':misses', 1)
+end
+return {version, value}
+"""
+
+_lookup = None
+
+
+def entry_key_prefix(namespace):
+    return f"properties:cache:{namespace}"
+
+
+def params_digest(params):
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def cached_response_data(namespace, params, produce):
+    """
+    Return ``(data, hit)`` for the response described by namespace and params.
+
+    On a miss ``produce()`` builds the data, which is stored under the current
+    cache version. Saving or deleting any Property bumps the version, so
+    every entry written before the change stops being read.
+
+    Misses are built from the primary, once per cache version: a replica may
+    not have replayed the write that bumped it yet. Clients pinned to the
+    primary after a write bypass the cache.
+    """
+    global _lookup
+    if pinned_to_primary():
+        return produce(), False
+    client = get_redis()
+    if _lookup is None:
+        _lookup = client.register_script(LOOKUP_SCRIPT)
+    prefix, digest = entry_key_prefix(namespace), params_digest(params)
+    try:
+        version, cached = _lookup(
+            keys=[VERSION_KEY, STATS_KEY], args=[prefix, digest, namespace]
+        )
+    except redis.RedisError:
+        logger.exception("Property cache lookup failed")
+        return produce(), False
+    if cached:
+        return json.loads(cached), True
+
+    with primary_reads():
+        data = produce()
+    try:
+        client.set(
+            f"{prefix}:{version.decode()}:{digest}",
+            json.dumps(data, cls=JSONEncoder),
+            ex=settings.PROPERTY_CACHE_TIMEOUT,
+        )
+    except redis.RedisError:
+        logger.exception("Property cache store failed")
+    return data, False
+
+
+async def acached_response_data(namespace, params, produce):
+    """
+    cached_response_data() for async views, over the asyncio Redis client.
+    ``produce`` is a coroutine function.
+    """
+    if pinned_to_primary():
+        return await produce(), False
+    client = get_async_redis()
+    prefix, digest = entry_key_prefix(namespace), params_digest(params)
+    try:
+        version, cached = await client.register_script(LOOKUP_SCRIPT)(
+            keys=[VERSION_KEY, STATS_KEY], args=[prefix, digest, namespace]
+        )
+    except redis.RedisError:
+        logger.exception("Property cache lookup failed")
+        return await produce(), False
+    if cached:
+        return json.loads(cached), True
+
+    with primary_reads():
+        data = await produce()
+    try:
+        await client.set(
+            f"{prefix}:{version.decode()}:{digest}",
+            json.dumps(data, cls=JSONEncoder),
+            ex=settings.PROPERTY_CACHE_TIMEOUT,
+        )
+    except redis.RedisError:
+        logger.exception("Property cache store failed")
+    return data, False
+
+
+def bump_version():
+    try:
+        get_redis().incr(VERSION_KEY)
+    except redis.RedisError:
+        logger.exception("Could not invalidate the property cache")
+
+
+def invalidate():
+    """Invalidate every cached property response once the transaction commits"""
+    transaction.on_commit(bump_version)
+
+
+def get_stats():
+    """Return the hit and miss counters of each namespace"""
+    stats = {}
+    for field, count in get_redis().hgetall(STATS_KEY).items():
+        namespace, counter = field.decode().rsplit(":", 1)
+        stats.setdefault(namespace, {"hits": 0, "misses": 0})[counter] = int(count)
+    return stats
@@ -0,0 +1,221 @@
+"""
+Read-only fast path for serializing property lists.
+
+CompiledPropertySerializer gives the same output as PropertySerializer
+without building model instances or running the DRF field machinery per
+row. The list is read with values() over just the columns the fields need,
+and every row is turned into a dict by a plan compiled once from
+PropertySerializer's fields: a column and a converter per output key, with
+the converters of plain strings, numbers and booleans left out since the
+database driver already returns what DRF would.
+"""
+from functools import partial
+
+from django.db.models.fields.files import FileField
+from django.utils import translation
+from django_countries.serializer_fields import CountryField
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from .images import IMAGE_FIELDS, photo_variant_urls
+from .models import Property
+from .serializers import PropertySerializer
+
+# The driver returns these as the Python type DRF would convert them to.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+)
+
+
+def decimal_converter(field):
+    """DRF's DecimalField output, without re-quantizing values already at scale"""
+    exponent = -field.decimal_places
+    to_representation = field.to_representation
+    coerce_to_string = getattr(
+        field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+    )
+    if not coerce_to_string or field.localize:
+        return to_representation
+
+    def convert(value):
+        if value.as_tuple().exponent == exponent:
+            return "{:f}".format(value)
+        return to_representation(value)
+
+    return convert
+
+
+def country_converter(field):
+    """The country dict of each code, looked up once per code and language"""
+    cache = {}
+
+    def convert(code):
+        key = (code, translation.get_language())
+        if key not in cache:
+            cache[key] = field.to_representation(code)
+        representation = cache[key]
+        return (
+            dict(representation) if isinstance(representation, dict) else representation
+        )
+
+    return convert
+
+
+class CompiledPropertySerializer:
+    """
+    Drop-in for ``PropertySerializer(rows, many=True)`` on rows read with
+    ``CompiledPropertySerializer.project(queryset)``.
+    """
+
+    serializer_class = PropertySerializer
+    model = Property
+
+    def __init__(self, instance=None, many=False, context=None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        request = self.context.get("request")
+        self.build_url = request.build_absolute_uri if request else None
+        self.photo_storages = {
+            name: self.model._meta.get_field(name).storage for name in IMAGE_FIELDS
+        }
+        self.plan = [
+            (key, column, self.bind(converter), optional)
+            for key, column, converter, optional in self.get_plan()
+        ]
+
+    @classmethod
+    def get_plan(cls):
+        """
+        Return ``(key, column, converter, optional)`` for each output key,
+        compiled once. Optional columns are annotations only some querysets
+        have, PropertySerializer leaves the key out without them.
+        """
+        if "_plan" not in cls.__dict__:
+            cls._plan = cls.compile_plan()
+        return cls._plan
+
+    @classmethod
+    def compile_plan(cls):
+        plan = []
+        model_fields = {field.name: field for field in cls.model._meta.get_fields()}
+        for key, field in cls.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                plan.append((key, None, f"get_{key}", False))
+                continue
+            column = "__".join(field.source_attrs)
+            model_field = model_fields.get(field.source_attrs[0])
+            plan.append(
+                (
+                    key,
+                    column,
+                    cls.compile_field(field, model_field),
+                    model_field is None,
+                )
+            )
+        return plan
+
+    @classmethod
+    def compile_field(cls, field, model_field):
+        if isinstance(field, CountryField):
+            return country_converter(field)
+        if isinstance(field, PASSTHROUGH_FIELDS):
+            return None
+        if isinstance(field, serializers.FloatField):
+            return float
+        if isinstance(field, serializers.UUIDField):
+            return str
+        if isinstance(field, serializers.DecimalField):
+            return decimal_converter(field)
+        if isinstance(field, serializers.FileField) and isinstance(
+            model_field, FileField
+        ):
+            return ("file", model_field.storage)
+        return field.to_representation
+
+    def bind(self, converter):
+        """Attach the request to the converters that build URLs"""
+        if isinstance(converter, str):
+            return getattr(self, converter)
+        if isinstance(converter, tuple):
+            return partial(self.file_url, converter[1])
+        return converter
+
+    @classmethod
+    def columns(cls, queryset=None):
+        """The values() columns of the plan, with the optional ones queryset has"""
+        annotations = queryset.query.annotations if queryset is not None else {}
+        # pkid and created_at are what keyset pagination cursors are made of.
+        columns = {"pkid": None, "created_at": None}
+        for key, column, converter, optional in cls.get_plan():
+            if column is None:
+                columns.update(dict.fromkeys(cls.method_columns[key]))
+            elif not optional or column in annotations:
+                columns[column] = None
+        return list(columns)
+
+    @classmethod
+    def project(cls, queryset):
+        """The queryset as values() rows holding just the needed columns"""
+        return queryset.values(*cls.columns(queryset))
+
+    def file_url(self, storage, name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return self.build_url(url) if self.build_url else url
+
+    def to_representation(self, row):
+        ret = {}
+        for key, column, convert, optional in self.plan:
+            if column is None:
+                ret[key] = convert(row)
+                continue
+            if optional and column not in row:
+                continue
+            value = row[column]
+            if value is None or convert is None:
+                ret[key] = value
+            else:
+                ret[key] = convert(value)
+        return ret
+
+    @property
+    def data(self):
+        if self.many:
+            return ReturnList(
+                [self.to_representation(row) for row in self.instance], serializer=self
+            )
+        return ReturnDict(self.to_representation(self.instance), serializer=self)
+
+    # The SerializerMethodFields of PropertySerializer, on values() rows.
+
+    method_columns = {
+        "user": ["user__username"],
+        "final_property_price": ["price", "tax"],
+        "image_variants": [*IMAGE_FIELDS, "image_variants"],
+    }
+
+    def get_user(self, row):
+        return row["user__username"]
+
+    def get_final_property_price(self, row):
+        return Property.price_after_tax(row["price"], row["tax"])
+
+    def get_image_variants(self, row):
+        variants = row["image_variants"] or {}
+        return {
+            field_name: photo_variant_urls(
+                row[field_name],
+                variants.get(field_name),
+                self.photo_storages[field_name],
+                self.build_url,
+            )
+            for field_name in IMAGE_FIELDS
+        }
@@ -0,0 +1,136 @@
+import logging
+import time
+
+import redis
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+
+from apps.common.redis import get_async_redis, get_redis
+
+from .cache import bump_version
+from .models import Property
+
+logger = logging.getLogger(__name__)
+
+PENDING_VIEWS_KEY = "properties:views:pending"
+FLUSHING_VIEWS_KEY = "properties:views:flushing"
+FLUSH_LOCK_KEY = "properties:views:flush-lock"
+FLUSH_BATCH_SIZE = 1000
+
+# KEYS[1] is the per property, per window HyperLogLog of viewer IPs and
+# KEYS[2] the hash of views waiting to be flushed. PFADD only reports 1 when
+# the estimated cardinality changed, i.e. this IP has not been seen yet.
+RECORD_VIEW_SCRIPT = """
+if redis.call('PFADD', KEYS[1], ARGV[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    redis.call('HINCRBY', KEYS[2], ARGV[3], 1)
+    return 1
+end
+return 0
+"""
+
+_record_view = None
+
+
+def seen_key(property_pkid, window):
+    return f"properties:views:seen:{property_pkid}:{window}"
+
+
+def record_view(property_pkid, ip_address):
+    """
+    Count a view of the property by the given IP at most once per window.
+
+    The view lands in a Redis buffer and reaches the database on the next
+    flush_views() run. Returns True when the view was counted.
+    """
+    global _record_view
+    window_length = settings.PROPERTY_VIEWS_WINDOW
+    window = int(time.time() // window_length)
+    client = get_redis()
+    if _record_view is None:
+        _record_view = client.register_script(RECORD_VIEW_SCRIPT)
+    try:
+        counted = _record_view(
+            keys=[seen_key(property_pkid, window), PENDING_VIEWS_KEY],
+            args=[ip_address or "unknown", window_length * 2, property_pkid],
+        )
+    except redis.RedisError:
+        # Losing a view is better than failing the page.
+        logger.exception("Could not record view of property %s", property_pkid)
+        return False
+    return bool(counted)
+
+
+async def arecord_view(property_pkid, ip_address):
+    """record_view() over the asyncio Redis client"""
+    window_length = settings.PROPERTY_VIEWS_WINDOW
+    window = int(time.time() // window_length)
+    client = get_async_redis()
+    try:
+        counted = await client.register_script(RECORD_VIEW_SCRIPT)(
+            keys=[seen_key(property_pkid, window), PENDING_VIEWS_KEY],
+            args=[ip_address or "unknown", window_length * 2, property_pkid],
+        )
+    except redis.RedisError:
+        logger.exception("Could not record view of property %s", property_pkid)
+        return False
+    return bool(counted)
+
+
+def flush_views():
+    """
+    Move the buffered view counts into Property.views.
+
+    Counts are applied with one UPDATE ... SET views = views + n statement per
+    batch of properties. update() skips the signals invalidating the response
+    cache, so the flush bumps its version itself. Returns the number of views
+    written.
+
+    Delivery is at least once: a flush dying between a batch's UPDATE and
+    dropping it from Redis applies that batch again on the next run. The
+    counts are approximate anyway, see RECORD_VIEW_SCRIPT.
+    """
+    client = get_redis()
+    lock = client.lock(FLUSH_LOCK_KEY, timeout=300)
+    if not lock.acquire(blocking=False):
+        logger.info("Property views flush already running, skipping")
+        return 0
+    try:
+        # A flush that died half way leaves its batch behind, finish that one
+        # first. Otherwise swap the pending hash out so new views keep
+        # landing in a fresh one while this batch is written.
+        if not client.exists(FLUSHING_VIEWS_KEY):
+            try:
+                client.rename(PENDING_VIEWS_KEY, FLUSHING_VIEWS_KEY)
+            except redis.ResponseError:
+                return 0
+
+        counts = {
+            int(pkid): int(views)
+            for pkid, views in client.hgetall(FLUSHING_VIEWS_KEY).items()
+        }
+        pkids = sorted(counts)
+        flushed = 0
+        for start in range(0, len(pkids), FLUSH_BATCH_SIZE):
+            batch = pkids[start : start + FLUSH_BATCH_SIZE]
+            Property.objects.filter(pkid__in=batch).update(
+                views=F("views")
+                + Case(
+                    *[When(pkid=pkid, then=Value(counts[pkid])) for pkid in batch],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+            # Drop each batch once it is committed, so a crash only repeats
+            # the batch in flight rather than the whole flush.
+            client.hdel(FLUSHING_VIEWS_KEY, *batch)
+            flushed += sum(counts[pkid] for pkid in batch)
+        if flushed:
+            bump_version()
+        return flushed
+    finally:
+        try:
+            lock.release()
+        except redis.exceptions.LockNotOwnedError:
+            # Ran past the lock's timeout, another flush may have started.
+            logger.warning("Property views flush outlived its lock")
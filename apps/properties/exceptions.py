@@ -5,3 +5,9 @@ class PropertyNotFound(APIException):
     status_code = 404
     default_detail = "Property not found."
     default_code = "property_not_found"
+
+
+class PropertyImportNotFound(APIException):
+    status_code = 404
+    default_detail = "Property import not found."
+    default_code = "property_import_not_found"
@@ -0,0 +1,113 @@
+import operator
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+
+from django.db.models import Count, Q
+from rest_framework.exceptions import ValidationError
+
+from .models import Property
+
+# Options of the search form, mapped to the minimum value they stand for.
+# None means the dimension is not filtered.
+PRICE_BUCKETS = {
+    "Any": None,
+    "$0+": 0,
+    "$100,000+": 100000,
+    "$200,000+": 200000,
+    "$300,000+": 300000,
+    "$400,000+": 400000,
+    "$500,000+": 500000,
+    "$600,000+": 600000,
+}
+BEDROOM_BUCKETS = {f"{count}+": count for count in range(7)}
+BATHROOM_BUCKETS = {f"{count}+": count for count in range(5)}
+
+
+def bucket_minimum(field, buckets, label):
+    """The minimum a label stands for, numbers not among them are used as is"""
+    if label is None or label in buckets:
+        return buckets.get(label)
+    try:
+        minimum = Decimal(str(label))
+    except InvalidOperation:
+        minimum = None
+    if minimum is None or not minimum.is_finite():
+        raise ValidationError({field: [f"{label!r} is not a valid choice or number."]})
+    return minimum
+
+
+def bucket_q(field, buckets, label):
+    minimum = bucket_minimum(field, buckets, label)
+    if minimum is None:
+        return Q()
+    return Q(**{f"{field}__gte": minimum})
+
+
+def search_filters(data):
+    """Return the Q object of each faceted dimension of a search request"""
+    filters = {
+        "advert_type": Q(),
+        "property_type": Q(),
+        "price": bucket_q("price", PRICE_BUCKETS, data.get("price")),
+        "bedrooms": bucket_q("bedrooms", BEDROOM_BUCKETS, data.get("bedrooms")),
+        "bathrooms": bucket_q("bathrooms", BATHROOM_BUCKETS, data.get("bathrooms")),
+    }
+    if data.get("advert_type"):
+        filters["advert_type"] = Q(advert_type__iexact=data["advert_type"])
+    if data.get("property_type"):
+        filters["property_type"] = Q(property_type__iexact=data["property_type"])
+    return filters
+
+
+FACETS = {
+    "advert_type": [
+        (choice, Q(advert_type=choice)) for choice in Property.AvertTypeChoices.values
+    ],
+    "property_type": [
+        (choice, Q(property_type=choice))
+        for choice in Property.PropertyTypeChoices.values
+    ],
+    "price": [
+        (label, bucket_q("price", PRICE_BUCKETS, label)) for label in PRICE_BUCKETS
+    ],
+    "bedrooms": [
+        (label, bucket_q("bedrooms", BEDROOM_BUCKETS, label))
+        for label in BEDROOM_BUCKETS
+    ],
+    "bathrooms": [
+        (label, bucket_q("bathrooms", BATHROOM_BUCKETS, label))
+        for label in BATHROOM_BUCKETS
+    ],
+}
+
+
+def combine(filters):
+    # Empty Q objects drop out, so an unfiltered count has no FILTER clause.
+    return reduce(operator.and_, filters, Q())
+
+
+def facet_counts(queryset, data):
+    """
+    Count the rows behind every option of the search form in one query.
+
+    Each dimension is counted with the filters of all the other dimensions
+    applied but not its own, so the counts show what picking another option
+    would return.
+    """
+    filters = search_filters(data)
+    aggregates = {"total": Count("pkid", filter=combine(filters.values()))}
+    for dimension, buckets in FACETS.items():
+        others = [q for name, q in filters.items() if name != dimension]
+        for index, (label, q) in enumerate(buckets):
+            aggregates[f"{dimension}_{index}"] = Count(
+                "pkid", filter=combine([*others, q])
+            )
+
+    totals = queryset.aggregate(**aggregates)
+    counts = {"total": totals["total"]}
+    for dimension, buckets in FACETS.items():
+        counts[dimension] = {
+            label: totals[f"{dimension}_{index}"]
+            for index, (label, q) in enumerate(buckets)
+        }
+    return counts
@@ -0,0 +1,160 @@
+import math
+
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GEOHASH_PRECISION = 12
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Return the geohash of the point, nearby points share a prefix"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+    while len(geohash) < precision:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(geohash)
+
+
+def cell_size(precision):
+    """Return the (latitude, longitude) span in degrees of a geohash cell"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def precision_for_radius(latitude, radius_km):
+    """
+    Return the longest geohash precision whose cells are at least radius_km
+    across at this latitude, so the 3x3 block of cells around the centre
+    covers the whole circle. 0 means the circle is too large for a prefix.
+    """
+    lng_scale = max(math.cos(math.radians(latitude)), 1e-6)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_span, lng_span = cell_size(precision)
+        height = lat_span * KM_PER_DEGREE
+        width = lng_span * KM_PER_DEGREE * lng_scale
+        if height >= radius_km and width >= radius_km:
+            return precision
+    return 0
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """Return the geohash prefixes of the cell around the point and its neighbours"""
+    precision = precision_for_radius(latitude, radius_km)
+    if not precision:
+        return []
+    lat_span, lng_span = cell_size(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        cell_lat = latitude + lat_step * lat_span
+        if not -90 <= cell_lat <= 90:
+            continue
+        for lng_step in (-1, 0, 1):
+            cell_lng = (longitude + lng_step * lng_span + 180) % 360 - 180
+            cells.add(encode_geohash(cell_lat, cell_lng, precision))
+    return sorted(cells)
+
+
+def distance_expression(latitude, longitude):
+    """Haversine distance in kilometres from the point to each row"""
+    d_lat = Radians(F("latitude") - latitude)
+    d_lng = Radians(F("longitude") - longitude)
+    a = Power(Sin(d_lat / 2), 2) + Cos(Radians(F("latitude"))) * math.cos(
+        math.radians(latitude)
+    ) * Power(Sin(d_lng / 2), 2)
+    return ASin(Sqrt(a), output_field=FloatField()) * (2 * EARTH_RADIUS_KM)
+
+
+def bbox_q(min_lat, min_lng, max_lat, max_lng):
+    lng_q = Q(longitude__gte=min_lng, longitude__lte=max_lng)
+    if min_lng > max_lng:
+        # The box crosses the antimeridian.
+        lng_q = Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng)
+    return Q(latitude__gte=min_lat, latitude__lte=max_lat) & lng_q
+
+
+def within_bbox(queryset, min_lat, min_lng, max_lat, max_lng):
+    """Filter to rows inside the box, served by the (latitude, longitude) index"""
+    return queryset.filter(bbox_q(min_lat, min_lng, max_lat, max_lng))
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """
+    Filter to rows within radius_km of the point and annotate ``distance``.
+
+    The geohash prefixes and the circle's bounding box narrow the rows down
+    through an index before the exact haversine distance is checked.
+    """
+    cells = covering_cells(latitude, longitude, radius_km)
+    if cells:
+        cell_q = Q()
+        for cell in cells:
+            cell_q |= Q(geohash__startswith=cell)
+        queryset = queryset.filter(cell_q)
+
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_scale = math.cos(math.radians(min(abs(latitude) + lat_delta, 90)))
+    if lng_scale > 1e-6 and radius_km / KM_PER_DEGREE / lng_scale < 180:
+        lng_delta = radius_km / KM_PER_DEGREE / lng_scale
+        queryset = queryset.filter(
+            bbox_q(
+                latitude - lat_delta,
+                (longitude - lng_delta + 180) % 360 - 180,
+                latitude + lat_delta,
+                (longitude + lng_delta + 180) % 360 - 180,
+            )
+        )
+
+    return queryset.annotate(distance=distance_expression(latitude, longitude)).filter(
+        distance__lte=radius_km
+    )
+
+
+def parse_coordinates(value, count):
+    """
+    Parse "a,b,..." (or a list) into exactly ``count`` floats, raising
+    ValueError for anything else.
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)) or len(value) != count:
+        raise ValueError(f"Expected {count} comma separated numbers.")
+    numbers = [float(number) for number in value]
+    if not all(math.isfinite(number) for number in numbers):
+        raise ValueError("Coordinates must be finite numbers.")
+    return numbers
+
+
+def parse_radius(value):
+    """Parse "latitude,longitude,km" for within_radius"""
+    latitude, longitude, radius_km = parse_coordinates(value, 3)
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError("Latitude must be within ±90 and longitude within ±180.")
+    if radius_km <= 0:
+        raise ValueError("The radius must be a positive number of kilometres.")
+    return latitude, longitude, radius_km
+
+
+def parse_bbox(value):
+    """Parse "min_lat,min_lng,max_lat,max_lng" for within_bbox"""
+    min_lat, min_lng, max_lat, max_lng = parse_coordinates(value, 4)
+    if not -90 <= min_lat <= max_lat <= 90:
+        raise ValueError("Latitudes must be within ±90, the minimum first.")
+    if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+        raise ValueError("Longitudes must be within ±180.")
+    return min_lat, min_lng, max_lat, max_lng
@@ -0,0 +1,128 @@
+"""
+Resized and re-encoded variants of property photos.
+
+Uploading a photo queues generate_image_variants (apps/properties/tasks.py)
+on the "images" Celery queue, whose prefork worker renders every size in
+every format and records the stored names in Property.image_variants. Until
+then serializers fall back to the original upload.
+"""
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from .uploads import PHOTOS_DIR
+
+IMAGE_FIELDS = ("cover_photo", "photo_1", "photo_2", "photo_3")
+
+# Largest width and height of each size, the aspect ratio is kept.
+VARIANT_SIZES = {
+    "thumbnail": (320, 240),
+    "card": (800, 600),
+    "full": (1920, 1440),
+}
+
+VARIANT_FORMATS = {
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+}
+
+VARIANTS_DIR = "photos/variants"
+
+
+def available_formats():
+    # Pillow may be built without libwebp, JPEG is always there.
+    return [
+        name for name in VARIANT_FORMATS if name != "webp" or features.check("webp")
+    ]
+
+
+def is_default_image(instance, field_name):
+    """The sample images every property starts with are not processed"""
+    field = instance._meta.get_field(field_name)
+    return getattr(instance, field_name).name == field.get_default()
+
+
+def variant_name(source_name, size, format):
+    stem = os.path.splitext(os.path.basename(source_name))[0]
+    return f"{VARIANTS_DIR}/{stem}/{size}.{'jpg' if format == 'jpeg' else format}"
+
+
+def render_variants(source_name, storage=default_storage):
+    """
+    Render every size and format of the stored image and return
+    ``{"source": source_name, size: {format: stored name}}``
+
+    Content-addressed photos (apps/properties/uploads.py) shared by several
+    properties are only rendered the first time.
+    """
+    if source_name.startswith(f"{PHOTOS_DIR}/"):
+        variants = {
+            size: {
+                format: variant_name(source_name, size, format)
+                for format in available_formats()
+            }
+            for size in VARIANT_SIZES
+        }
+        if all(
+            storage.exists(name)
+            for formats in variants.values()
+            for name in formats.values()
+        ):
+            return {"source": source_name, **variants}
+
+    with storage.open(source_name, "rb") as stream:
+        image = Image.open(stream)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+
+    variants = {"source": source_name}
+    for size, bounds in VARIANT_SIZES.items():
+        resized = image.copy()
+        # Never upscale, small originals are re-encoded at their own size.
+        resized.thumbnail(bounds, Image.LANCZOS)
+        variants[size] = {}
+        for format in available_formats():
+            pillow_format, options = VARIANT_FORMATS[format]
+            buffer = io.BytesIO()
+            resized.save(buffer, pillow_format, **options)
+            name = variant_name(source_name, size, format)
+            if storage.exists(name):
+                storage.delete(name)
+            variants[size][format] = storage.save(name, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def variant_urls(instance, field_name, build_url=None):
+    """
+    URLs of each size and format of the photo, all pointing at the original
+    until the variants of the current upload are ready. None without a photo.
+    """
+    photo = getattr(instance, field_name)
+    variants = (instance.image_variants or {}).get(field_name)
+    return photo_variant_urls(photo.name, variants, photo.storage, build_url)
+
+
+def photo_variant_urls(name, variants, storage, build_url=None):
+    """variant_urls() for a stored photo name and its variants entry"""
+    if not name:
+        return None
+    build_url = build_url or (lambda url: url)
+    if not variants or variants.get("source") != name:
+        original = build_url(storage.url(name))
+        return {
+            size: {format: original for format in VARIANT_FORMATS}
+            for size in VARIANT_SIZES
+        }
+    # Without WebP support the JPEG stands in for it.
+    return {
+        size: {
+            format: build_url(
+                storage.url(variants[size].get(format) or variants[size]["jpeg"])
+            )
+            for format in VARIANT_FORMATS
+        }
+        for size in VARIANT_SIZES
+    }
@@ -0,0 +1,327 @@
+"""
+Bulk import of properties from CSV or NDJSON.
+
+Rows are read as a stream, validated with PropertyImportSerializer and written
+in batches: new rows go through one bulk_create with slugs and reference codes
+worked out up front, rows whose ref_code already exists are rewritten with one
+bulk_update, and rows whose content hash matches the last import are skipped.
+
+Rows without a ref_code cannot be matched to the listing they created, so
+they are skipped when the agent has a listing with the same content hash and
+created with a new ref_code otherwise. Editing such a listing clears its
+hash, after which importing the row again creates a second listing.
+"""
+import csv
+import hashlib
+import io
+import json
+import operator
+import os
+import time
+from functools import reduce
+
+from autoslug.utils import crop_slug
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from . import cache
+from .models import Property, PropertyImportJob, generate_ref_code
+from .serializers import PropertyImportSerializer
+
+IMPORT_BATCH_SIZE = 500
+# Only the first errors are kept on the job, the count covers all of them.
+MAX_REPORTED_ERRORS = 1000
+
+FORMAT_EXTENSIONS = {
+    ".csv": PropertyImportJob.FormatChoices.CSV,
+    ".ndjson": PropertyImportJob.FormatChoices.NDJSON,
+    ".jsonl": PropertyImportJob.FormatChoices.NDJSON,
+}
+
+
+def detect_format(filename):
+    """Return the import format for the file name, or None"""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+def read_rows(stream, format):
+    """
+    Yield (row number, row) for every record of a binary or text stream.
+
+    The row is None when the record could not be parsed. Empty CSV cells are
+    left out so the model defaults apply.
+    """
+    if isinstance(stream.read(0), bytes):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if format == PropertyImportJob.FormatChoices.CSV:
+        for number, row in enumerate(csv.DictReader(stream), 1):
+            yield number, {key: value for key, value in row.items() if value}
+        return
+
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def content_hash(data):
+    """Return a stable hash of a validated row"""
+    encoded = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def reserve_slugs(titles):
+    """
+    Return a unique slug for each title with one query, numbered the way
+    AutoSlugField numbers clashes.
+    """
+    field = Property._meta.get_field("slug")
+    bases = [
+        crop_slug(field, field.slugify(title)) or Property._meta.model_name
+        for title in titles
+    ]
+    lookups = [Q(slug=base) | Q(slug__startswith=f"{base}-") for base in set(bases)]
+    taken = set(
+        Property.objects.filter(reduce(operator.or_, lookups)).values_list(
+            "slug", flat=True
+        )
+        if lookups
+        else []
+    )
+
+    slugs = []
+    for base in bases:
+        slug, index = base, 1
+        while slug in taken:
+            index += 1
+            tail = f"{field.index_sep}{index}"
+            slug = base[: field.max_length - len(tail)] + tail
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+class ImportReport:
+    """Counts, per-row errors and throughput of one import"""
+
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.errors = []
+        self.started = time.monotonic()
+        self.finished = None
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    @property
+    def duration(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.total / self.duration if self.duration else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.total} rows in {self.duration:.2f}s "
+            f"({self.rows_per_second:.0f} rows/s): {self.created} created, "
+            f"{self.updated} updated, {self.unchanged} unchanged, "
+            f"{self.failed} failed"
+        )
+
+
+class PropertyImporter:
+    """Import rows for one agent, see the module docstring"""
+
+    def __init__(self, user, batch_size=IMPORT_BATCH_SIZE):
+        self.user = user
+        self.batch_size = batch_size
+        self.serializer = PropertyImportSerializer()
+        self.report = ImportReport()
+
+    def run(self, rows):
+        """Import (row number, row) pairs and return the ImportReport"""
+        batch = []
+        for number, row in rows:
+            self.report.total += 1
+            if row is None:
+                self.report.add_error(number, {"row": ["Could not parse the row."]})
+                continue
+            try:
+                data = self.serializer.run_validation(row)
+            except ValidationError as error:
+                self.report.add_error(number, error.detail)
+                continue
+            batch.append((number, data))
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = []
+        if batch:
+            self.write_batch(batch)
+
+        if self.report.created or self.report.updated:
+            cache.invalidate()
+        self.report.finish()
+        return self.report
+
+    def write_batch(self, batch):
+        codes = [data["ref_code"] for number, data in batch if data.get("ref_code")]
+        existing = {
+            row.ref_code: row
+            for row in Property.objects.filter(ref_code__in=codes).only(
+                "pkid", "ref_code", "user_id", "content_hash", "slug"
+            )
+        }
+        digests = [content_hash(data) for number, data in batch]
+        unreferenced = [
+            digest
+            for digest, (number, data) in zip(digests, batch)
+            if not data.get("ref_code")
+        ]
+        imported = set(
+            Property.objects.filter(
+                user=self.user, content_hash__in=unreferenced
+            ).values_list("content_hash", flat=True)
+            if unreferenced
+            else []
+        )
+
+        new_rows, changed_rows, seen = [], [], set()
+        for digest, (number, data) in zip(digests, batch):
+            ref_code = data.get("ref_code")
+            if ref_code in seen:
+                self.report.add_error(
+                    number, {"ref_code": ["Appears more than once in the batch."]}
+                )
+                continue
+            if ref_code:
+                seen.add(ref_code)
+            elif digest in imported:
+                self.report.unchanged += 1
+                continue
+            else:
+                imported.add(digest)
+            current = existing.get(ref_code)
+            if current is None:
+                new_rows.append((number, self.build(data, digest)))
+            elif current.user_id != self.user.pkid:
+                self.report.add_error(
+                    number, {"ref_code": ["Belongs to another agent's property."]}
+                )
+            elif current.content_hash == digest:
+                self.report.unchanged += 1
+            else:
+                changed_rows.append((number, self.build(data, digest, current)))
+
+        if new_rows:
+            self.create(new_rows)
+        if changed_rows:
+            self.update(changed_rows)
+
+    def build(self, data, digest, current=None):
+        instance = Property(user=self.user, content_hash=digest, **data)
+        # The same normalisation Property.save applies.
+        instance.title = str.title(instance.title)
+        instance.description = str.capitalize(instance.description)
+        instance.set_geohash()
+        if current is not None:
+            instance.pkid = current.pkid
+            instance.slug = current.slug
+            instance._state.adding = False
+        elif not instance.ref_code:
+            instance.ref_code = generate_ref_code()
+        return instance
+
+    def create(self, rows):
+        instances = [instance for number, instance in rows]
+        for instance, slug in zip(
+            instances, reserve_slugs(instance.title for instance in instances)
+        ):
+            instance.slug = slug
+            instance._slug_reserved = True
+        try:
+            with transaction.atomic():
+                Property.objects.bulk_create(instances)
+        except IntegrityError:
+            # A slug was taken between reserving and inserting, fall back to
+            # saving row by row and let AutoSlugField find free ones. The
+            # ref_codes are kept, Property.save only makes up missing ones.
+            for number, instance in rows:
+                instance._slug_reserved = False
+                instance.slug = ""
+                try:
+                    with transaction.atomic():
+                        instance.save()
+                except IntegrityError as error:
+                    self.report.add_error(number, {"row": [str(error)]})
+                else:
+                    self.report.created += 1
+        else:
+            self.report.created += len(instances)
+
+    def update(self, rows):
+        instances = [instance for number, instance in rows]
+        now = timezone.now()
+        for instance in instances:
+            instance.updated_at = now
+        # An imported row replaces the listing, columns it leaves out go back
+        # to their defaults like they would for a new row.
+        fields = [
+            field.source
+            for field in self.serializer.fields.values()
+            if not field.read_only
+        ]
+        fields += ["geohash", "content_hash", "updated_at"]
+        Property.objects.bulk_update(instances, fields)
+        self.report.updated += len(instances)
+
+
+def import_properties(stream, format, user, batch_size=IMPORT_BATCH_SIZE):
+    """Import a CSV or NDJSON stream for the user and return the ImportReport"""
+    importer = PropertyImporter(user, batch_size=batch_size)
+    return importer.run(read_rows(stream, format))
+
+
+def run_import_job(job):
+    """Run a PropertyImportJob and record the outcome on it"""
+    job.status = PropertyImportJob.StatusChoices.RUNNING
+    job.started_at = timezone.now()
+    job.save(update_fields=["status", "started_at", "updated_at"])
+    try:
+        with job.source.open("rb") as stream:
+            report = import_properties(stream, job.format, job.user)
+    except Exception:
+        job.status = PropertyImportJob.StatusChoices.FAILED
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "finished_at", "updated_at"])
+        raise
+
+    job.status = PropertyImportJob.StatusChoices.DONE
+    job.total_rows = report.total
+    job.created_rows = report.created
+    job.updated_rows = report.updated
+    job.unchanged_rows = report.unchanged
+    job.failed_rows = report.failed
+    job.errors = report.errors
+    job.finished_at = timezone.now()
+    job.save()
+    return report
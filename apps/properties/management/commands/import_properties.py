@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from apps.properties.importer import (
+    FORMAT_EXTENSIONS,
+    IMPORT_BATCH_SIZE,
+    detect_format,
+    import_properties,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Import properties for an agent from a CSV or NDJSON file"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help="CSV or NDJSON file to import")
+        parser.add_argument(
+            "--user",
+            required=True,
+            help="Email address of the agent the properties belong to",
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(set(FORMAT_EXTENSIONS.values())),
+            help="File format, guessed from the extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Number of rows written per statement",
+        )
+
+        return super().add_arguments(parser)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with the email {options['user']}")
+        format = options["format"] or detect_format(options["path"])
+        if format is None:
+            raise CommandError("Pass --format, the extension is not .csv or .ndjson")
+
+        with open(options["path"], "rb") as stream:
+            report = import_properties(
+                stream, format, user, batch_size=options["batch_size"]
+            )
+
+        for error in report.errors:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {report}"))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.db.models import Max, Min
+
+from apps.properties.models import Property
+from apps.properties.search import PROPERTY_SEARCH_VECTOR
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search vector of every property in batches"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of primary keys updated per statement",
+        )
+
+        return super().add_arguments(parser)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        bounds = Property.objects.aggregate(low=Min("pkid"), high=Max("pkid"))
+        if bounds["low"] is None:
+            self.stdout.write(self.style.WARNING("No properties to index"))
+            return
+
+        # Walk the primary key range rather than OFFSET pages, every batch is
+        # an index range scan and commits on its own so locks stay short.
+        updated = 0
+        for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+            updated += Property.objects.filter(
+                pkid__gte=start, pkid__lt=start + batch_size
+            ).update(search_vector=PROPERTY_SEARCH_VECTOR)
+            self.stdout.write(f"Indexed {updated} properties")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt search index for {updated} properties")
+        )
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION properties_property_search_vector_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english'::regconfig, COALESCE(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, COALESCE(NEW.city, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, COALESCE(NEW.street_address, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, COALESCE(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_property_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, city, street_address
+    ON properties_property
+    FOR EACH ROW EXECUTE PROCEDURE properties_property_search_vector_update();
+
+UPDATE properties_property SET title = title;
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS properties_property_search_vector_trigger ON properties_property;
+DROP FUNCTION IF EXISTS properties_property_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0004_property_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.7 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_property_search_vector_trigger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['created_at', 'pkid'], name='property_created_pkid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['user', 'created_at', 'pkid'], name='property_user_created_pkid_idx'),
+        ),
+    ]
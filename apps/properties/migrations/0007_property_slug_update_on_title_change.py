@@ -0,0 +1,19 @@
+# Generated by Django 3.2.7 on 2026-10-18 16:47
+
+import autoslug.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_property_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='property',
+            name='slug',
+            field=autoslug.fields.AutoSlugField(editable=False, populate_from='title', unique=True),
+        ),
+    ]
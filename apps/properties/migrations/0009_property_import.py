@@ -0,0 +1,62 @@
+# Generated by Django 3.2.7 on 2026-10-18 16:58
+
+import apps.properties.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('properties', '0008_property_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyImportJob',
+            fields=[
+                ('pkid', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('source', models.FileField(upload_to='imports', verbose_name='Source File')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('ndjson', 'NDJSON')], max_length=10, verbose_name='Format')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10, verbose_name='Status')),
+                ('total_rows', models.PositiveIntegerField(default=0, verbose_name='Rows')),
+                ('created_rows', models.PositiveIntegerField(default=0, verbose_name='Created')),
+                ('updated_rows', models.PositiveIntegerField(default=0, verbose_name='Updated')),
+                ('unchanged_rows', models.PositiveIntegerField(default=0, verbose_name='Unchanged')),
+                ('failed_rows', models.PositiveIntegerField(default=0, verbose_name='Failed')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Row Errors')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished')),
+            ],
+            options={
+                'verbose_name': 'Property Import',
+                'verbose_name_plural': 'Property Imports',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='Content Hash'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='slug',
+            field=apps.properties.models.PropertySlugField(editable=False, populate_from='title', unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['ref_code'], name='property_ref_code_idx'),
+        ),
+        migrations.AddField(
+            model_name='propertyimportjob',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='property_imports', to=settings.AUTH_USER_MODEL, verbose_name='Agent'),
+        ),
+    ]
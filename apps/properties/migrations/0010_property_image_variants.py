@@ -0,0 +1,18 @@
+# Generated by Django 3.2.7 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_property_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Image Variants'),
+        ),
+    ]
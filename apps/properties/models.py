@@ -1,10 +1,14 @@
+import copy
 import random
 import string
 
 from autoslug import AutoSlugField
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.fields.files import FieldFile
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django_countries.fields import CountryField
@@ -12,9 +16,31 @@ from django_countries.fields import CountryField
 
 from apps.common.models import TimeStampedUUIDModel
 
+from .geo import encode_geohash
+from .images import IMAGE_FIELDS
+
 User = get_user_model()
 
 
+def generate_ref_code():
+    """Return a random reference code such as REF-7G2KQ0XW1B"""
+    return "REF-" + "".join(
+        random.choices(string.ascii_uppercase + string.digits, k=10)
+    )
+
+
+class PropertySlugField(AutoSlugField):
+    """
+    AutoSlugField that keeps a slug reserved up front by the bulk importer
+    instead of probing the table for a free one row by row.
+    """
+
+    def pre_save(self, instance, add):
+        if getattr(instance, "_slug_reserved", False):
+            return self.value_from_object(instance)
+        return super().pre_save(instance, add)
+
+
 class ProperyPublishedManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset().filter(published_status=True)
@@ -46,7 +72,8 @@ class Property(TimeStampedUUIDModel):
         on_delete=models.DO_NOTHING,
     )
     title = models.CharField(verbose_name=_("Property Title"), max_length=255)
-    slug = AutoSlugField(populate_from="title", unique=True, always_update=True)
+    # Rebuilt by save() when the title changes, see Property.save
+    slug = PropertySlugField(populate_from="title", unique=True)
     ref_code = models.CharField(
         verbose_name=_("Reference Code"), max_length=255, null=True, blank=True
     )
@@ -147,6 +174,38 @@ class Property(TimeStampedUUIDModel):
     year_built = models.PositiveIntegerField(
         verbose_name=_("Year Built"), default=0, null=True, blank=True
     )
+    latitude = models.FloatField(
+        verbose_name=_("Latitude"),
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        verbose_name=_("Longitude"),
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    # Derived from latitude and longitude by save(), prefix searches on it
+    # find the rows near a point, see apps/properties/geo.py
+    geohash = models.CharField(
+        verbose_name=_("Geohash"), max_length=12, blank=True, default="", editable=False
+    )
+    # Resized copies of the photos, see apps/properties/images.py
+    image_variants = models.JSONField(
+        verbose_name=_("Image Variants"), default=dict, blank=True, editable=False
+    )
+    # Hash of the row as last imported, see apps/properties/importer.py
+    content_hash = models.CharField(
+        verbose_name=_("Content Hash"),
+        max_length=64,
+        blank=True,
+        default="",
+        editable=False,
+    )
+    # Maintained by the properties_property_search_vector_trigger database
+    # trigger, see apps/properties/search.py for the weighting.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = models.Manager()
     published = ProperyPublishedManager()
@@ -156,6 +215,26 @@ class Property(TimeStampedUUIDModel):
 
         verbose_name = "Property"
         verbose_name_plural = "Properties"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="property_search_vector_idx"),
+            # Keyset pagination in pagination.PropertyKeysetPagination
+            models.Index(
+                fields=["created_at", "pkid"], name="property_created_pkid_idx"
+            ),
+            models.Index(
+                fields=["user", "created_at", "pkid"],
+                name="property_user_created_pkid_idx",
+            ),
+            # Radius and bounding box filters in apps/properties/geo.py
+            models.Index(
+                fields=["geohash"],
+                name="property_geohash_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            models.Index(fields=["latitude", "longitude"], name="property_lat_lng_idx"),
+            # Re-imports match rows on the reference code.
+            models.Index(fields=["ref_code"], name="property_ref_code_idx"),
+        ]
 
     def __str__(self):
         """Unicode representation of Property."""
@@ -167,27 +246,175 @@ class Property(TimeStampedUUIDModel):
             "properties:property_detail", args=[str(self.slug)]
         )  # TODO: Fix this
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._tracked_values()
+        return instance
+
+    def _tracked_values(self):
+        deferred = self.get_deferred_fields()
+        values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            value = getattr(self, field.attname)
+            if isinstance(value, FieldFile):
+                value = value.name
+            elif isinstance(value, (dict, list)):
+                value = copy.deepcopy(value)
+            values[field.attname] = value
+        return values
+
+    def get_changed_fields(self):
+        """
+        Return the attnames of the fields changed since the row was loaded, or
+        None when that is unknown (new rows and instances not read from the db)
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        if self._state.adding or loaded is None:
+            return None
+        return {
+            name
+            for name, value in self._tracked_values().items()
+            if name not in loaded or loaded[name] != value
+        }
+
     def save(self, *args, **kwargs):
-        """Save method for Property. modify the ref_code field using random string from string library"""
-        self.title = str.title(self.title)
-        self.description = str.capitalize(self.description)
-        self.ref_code = "REF-"
-        self.ref_code += "".join(
-            random.choices(string.ascii_uppercase + string.digits, k=10)
-        )
+        """
+        Save method for Property.
+
+        Existing rows only write the fields that changed (or the given
+        update_fields). The title is title-cased and the ref_code and slug are
+        regenerated only for new rows or when the title changes, so price or
+        counter updates are a single narrow UPDATE without a slug probe. New
+        rows keep a ref_code they were given, such as an imported one.
+        """
+        changed = self.get_changed_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+        elif changed is not None:
+            update_fields = set(changed)
+
+        def is_written(name):
+            in_update = update_fields is None or name in update_fields
+            return in_update and (changed is None or name in changed)
+
+        if is_written("title"):
+            self.title = str.title(self.title)
+            if not (self._state.adding and self.ref_code):
+                self.ref_code = generate_ref_code()
+            # An empty slug makes AutoSlugField populate it from the new title.
+            if not self._state.adding:
+                self.slug = ""
+            if update_fields is not None:
+                update_fields.update(["slug", "ref_code"])
+        if is_written("description"):
+            self.description = str.capitalize(self.description)
+        if is_written("latitude") or is_written("longitude"):
+            self.set_geohash()
+            if update_fields is not None:
+                update_fields.add("geohash")
+
+        # Variants are rendered for these after the save, see signals.py
+        self._written_images = [name for name in IMAGE_FIELDS if is_written(name)]
+
+        if not self._state.adding and self.content_hash:
+            # Edited outside the importer, the next import has to rewrite it.
+            if update_fields is None or update_fields - {"views", "content_hash"}:
+                self.content_hash = ""
+                if update_fields is not None:
+                    update_fields.add("content_hash")
+
+        if update_fields is not None:
+            # The search vector is owned by the database trigger.
+            update_fields.discard("search_vector")
+            if not update_fields:
+                return
+            update_fields.add("updated_at")
+            kwargs["update_fields"] = update_fields
         super(Property, self).save(*args, **kwargs)
+        self._loaded_values = self._tracked_values()
+
+    def set_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ""
+        else:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
 
     @property
     def final_property_price(self):
         """Return the final price of the property after tax"""
-        tax_percentage = self.tax
-        property_price = self.price
+        return self.price_after_tax(self.price, self.tax)
+
+    @staticmethod
+    def price_after_tax(property_price, tax_percentage):
         tax_amount = round(tax_percentage * property_price, 2)
         price_after_tax = float(round(property_price + tax_amount))
         return price_after_tax
 
 
+class PropertyImportJob(TimeStampedUUIDModel):
+    """A bulk import of properties run in the background"""
+
+    class FormatChoices(models.TextChoices):
+        CSV = "csv", _("CSV")
+        NDJSON = "ndjson", _("NDJSON")
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        RUNNING = "running", _("Running")
+        DONE = "done", _("Done")
+        FAILED = "failed", _("Failed")
+
+    user = models.ForeignKey(
+        User,
+        related_name="property_imports",
+        verbose_name=_("Agent"),
+        on_delete=models.CASCADE,
+    )
+    source = models.FileField(verbose_name=_("Source File"), upload_to="imports")
+    format = models.CharField(
+        verbose_name=_("Format"), max_length=10, choices=FormatChoices.choices
+    )
+    status = models.CharField(
+        verbose_name=_("Status"),
+        max_length=10,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+    )
+    total_rows = models.PositiveIntegerField(verbose_name=_("Rows"), default=0)
+    created_rows = models.PositiveIntegerField(verbose_name=_("Created"), default=0)
+    updated_rows = models.PositiveIntegerField(verbose_name=_("Updated"), default=0)
+    unchanged_rows = models.PositiveIntegerField(verbose_name=_("Unchanged"), default=0)
+    failed_rows = models.PositiveIntegerField(verbose_name=_("Failed"), default=0)
+    errors = models.JSONField(verbose_name=_("Row Errors"), default=list, blank=True)
+    started_at = models.DateTimeField(verbose_name=_("Started"), null=True, blank=True)
+    finished_at = models.DateTimeField(
+        verbose_name=_("Finished"), null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = "Property Import"
+        verbose_name_plural = "Property Imports"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.user} import of {self.source.name} ({self.status})"
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at or not self.finished_at:
+            return None
+        seconds = (self.finished_at - self.started_at).total_seconds()
+        return round(self.total_rows / seconds, 1) if seconds else None
+
+
 class PropertyViews(TimeStampedUUIDModel):
+    # No longer written: views are counted in Redis and flushed into
+    # Property.views, see apps/properties/counters.py. Kept for the rows
+    # recorded before, which the admin still lists.
     ip = models.CharField(verbose_name=_("IP Address"), max_length=255)
     property = models.ForeignKey(
         Property, on_delete=models.CASCADE, related_name="property_views"
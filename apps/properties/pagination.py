@@ -1,7 +1,159 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from collections import OrderedDict
+
+from django.db import connections
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
 
 class PropertyPagination(PageNumberPagination):
     page_size = 3
     page_size_query_param = "page_size"
     max_page_size = 1000
+
+
+def approximate_count(queryset):
+    """Return the planner's row estimate for the queryset instead of COUNT(*)"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class PropertyKeysetPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, pkid).
+
+    Clients opt in by sending the ``cursor`` query parameter (empty for the
+    first page) and then follow the ``next``/``previous`` links. Each page is
+    an index range scan, so page N costs the same as page 1, and ``count`` is
+    the planner's estimate rather than an exact COUNT(*). Requests without a
+    cursor, or ordered by anything the cursor does not encode such as
+    ``distance``, are paginated by page number as before.
+    """
+
+    page_size = PropertyPagination.page_size
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    ordering_query_param = api_settings.ORDERING_PARAM
+    fallback_class = PropertyPagination
+    invalid_cursor_message = "Invalid cursor"
+    keyset_orderings = ("", "created_at", "-created_at")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = request.query_params.get(self.ordering_query_param, "")
+        if (
+            self.cursor_query_param not in request.query_params
+            or ordering not in self.keyset_orderings
+        ):
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.fallback = None
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = approximate_count(queryset)
+
+        position, reverse = self.decode_cursor(request)
+        ascending = ordering == "created_at"
+        # A previous link walks the index the other way and flips the page back.
+        forwards = ascending != reverse
+
+        if forwards:
+            queryset = queryset.order_by("created_at", "pkid")
+        else:
+            queryset = queryset.order_by("-created_at", "-pkid")
+
+        if position is not None:
+            created_at, pkid = position
+            if forwards:
+                queryset = queryset.filter(created_at__gte=created_at).exclude(
+                    created_at=created_at, pkid__lte=pkid
+                )
+            else:
+                queryset = queryset.filter(created_at__lte=created_at).exclude(
+                    created_at=created_at, pkid__gte=pkid
+                )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.results = results
+        return results
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.results:
+            return None
+        return self.encode_cursor(self.results[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.results:
+            return None
+        return self.encode_cursor(self.results[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        # Rows are model instances or values() dicts.
+        if isinstance(row, dict):
+            created_at, pkid = row["created_at"], row["pkid"]
+        else:
+            created_at, pkid = row.created_at, row.pkid
+        position = "|".join(
+            [created_at.isoformat(), str(pkid), "r" if reverse else "f"]
+        )
+        token = base64.urlsafe_b64encode(position.encode("ascii")).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            position = base64.urlsafe_b64decode(token.encode("ascii")).decode("ascii")
+            created_at, pkid, direction = position.split("|")
+            created_at = parse_datetime(created_at)
+            pkid = int(pkid)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None or direction not in ("f", "r"):
+            raise NotFound(self.invalid_cursor_message)
+        return (created_at, pkid), direction == "r"
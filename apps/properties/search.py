@@ -0,0 +1,26 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F
+
+# Text search configuration used for both the stored vector and the queries,
+# they have to match or stemmed lexemes will never line up.
+SEARCH_CONFIG = "english"
+
+# Keep in sync with the properties_property_search_vector_update() trigger
+# function installed by migration 0005, the trigger keeps the column fresh on
+# every write and this expression is used to rebuild it in bulk.
+PROPERTY_SEARCH_VECTOR = (
+    SearchVector("title", weight="A", config=SEARCH_CONFIG)
+    + SearchVector("city", weight="B", config=SEARCH_CONFIG)
+    + SearchVector("street_address", weight="B", config=SEARCH_CONFIG)
+    + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+)
+
+
+def search_properties(queryset, phrase):
+    """Filter the queryset down to rows matching the phrase, best match first"""
+    query = SearchQuery(phrase, search_type="websearch", config=SEARCH_CONFIG)
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "-created_at")
+    )
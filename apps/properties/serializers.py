@@ -3,7 +3,8 @@ from django_countries.serializer_fields import CountryField
 from django_countries.serializers import CountryFieldMixin
 from rest_framework import serializers
 
-from .models import Property, PropertyViews
+from .images import IMAGE_FIELDS, variant_urls
+from .models import Property, PropertyImportJob
 
 
 class PropertySerializer(CountryFieldMixin, serializers.ModelSerializer):
@@ -13,6 +14,9 @@ class PropertySerializer(CountryFieldMixin, serializers.ModelSerializer):
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
     final_property_price = serializers.SerializerMethodField(read_only=True)
+    # Kilometres from the point of a radius search, left out otherwise.
+    distance = serializers.FloatField(read_only=True)
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Property
@@ -50,6 +54,10 @@ class PropertySerializer(CountryFieldMixin, serializers.ModelSerializer):
             "property_number",
             "area_measurement",
             "year_built",
+            "latitude",
+            "longitude",
+            "distance",
+            "image_variants",
         )
 
     def get_user(self, obj):
@@ -58,6 +66,14 @@ class PropertySerializer(CountryFieldMixin, serializers.ModelSerializer):
     def get_final_property_price(self, obj):
         return obj.final_property_price
 
+    def get_image_variants(self, obj):
+        request = self.context.get("request")
+        build_url = request.build_absolute_uri if request else None
+        return {
+            field_name: variant_urls(obj, field_name, build_url)
+            for field_name in IMAGE_FIELDS
+        }
+
 
 class PropertyCreateSerializer(serializers.ModelSerializer):
     country = CountryField(country_dict=True)
@@ -71,13 +87,48 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
             "updated_at",
             "views",
             "published_status",
+            "search_vector",
+            "geohash",
+            "image_variants",
         )
 
     def get_user(self, obj):
         return obj.user.username
 
 
-class PropertyViewSerializer(serializers.ModelSerializer):
+class PropertyImportSerializer(PropertyCreateSerializer):
+    """A row of a bulk import, the agent comes from the import itself"""
+
+    country = CountryField(country_dict=True, required=False)
+
+    class Meta(PropertyCreateSerializer.Meta):
+        exclude = PropertyCreateSerializer.Meta.exclude + (
+            "user",
+            "cover_photo",
+            "photo_1",
+            "photo_2",
+            "photo_3",
+        )
+
+
+class PropertyImportJobSerializer(serializers.ModelSerializer):
+    rows_per_second = serializers.FloatField(read_only=True)
+
     class Meta:
-        model = PropertyViews
-        exclude = ("updated_at", "pkid")
+        model = PropertyImportJob
+        fields = (
+            "id",
+            "status",
+            "format",
+            "total_rows",
+            "created_rows",
+            "updated_rows",
+            "unchanged_rows",
+            "failed_rows",
+            "rows_per_second",
+            "errors",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = fields
@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.properties import cache
+from apps.properties.images import is_default_image
+from apps.properties.models import Property
+from apps.properties.tasks import generate_image_variants
+
+
+@receiver(post_save, sender=Property)
+def invalidate_cache_on_save(sender, instance, **kw):
+    cache.invalidate()
+
+
+@receiver(post_save, sender=Property)
+def queue_image_variants(sender, instance, **kw):
+    written, instance._written_images = getattr(instance, "_written_images", []), []
+    for field_name in written:
+        photo = getattr(instance, field_name)
+        variants = instance.image_variants.get(field_name, {})
+        if not photo or is_default_image(instance, field_name):
+            continue
+        if variants.get("source") == photo.name:
+            continue
+        transaction.on_commit(
+            lambda field_name=field_name, source=photo.name: (
+                generate_image_variants.delay(instance.pkid, field_name, source)
+            )
+        )
+
+
+@receiver(post_delete, sender=Property)
+def invalidate_cache_on_delete(sender, instance, **kw):
+    cache.invalidate()
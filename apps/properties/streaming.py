@@ -0,0 +1,91 @@
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from apps.common.renderers import ORJSONRenderer
+
+STREAM_CHUNK_SIZE = 500
+# Rendered rows are sent in writes of roughly this many bytes.
+STREAM_BUFFER_SIZE = 64 * 1024
+
+JSON = "json"
+NDJSON = "ndjson"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Lets content negotiation pick NDJSON. Streamed responses bypass it, so it
+    only renders non-streamed data such as errors, as a single line.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+    format = NDJSON
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return ORJSONRenderer().render(data) + b"\n"
+
+
+def get_stream_format(request):
+    """
+    Return the streaming format the client asked for, or None to respond as
+    usual. Clients opt in with ``?stream=json``/``?stream=ndjson`` or by
+    accepting application/x-ndjson (views need NDJSONRenderer for that).
+    """
+    stream_format = request.query_params.get("stream")
+    if stream_format in (JSON, NDJSON):
+        return stream_format
+    if getattr(request, "accepted_renderer", None) is not None:
+        if request.accepted_renderer.format == NDJSON:
+            return NDJSON
+    return None
+
+
+def iter_rendered_rows(queryset, serializer_class, context=None):
+    """
+    Yield each row of the queryset rendered as JSON bytes.
+
+    Rows are read through a server-side cursor STREAM_CHUNK_SIZE at a time,
+    so memory stays flat however many rows match.
+    """
+    renderer = ORJSONRenderer()
+    serializer = serializer_class(context=context or {})
+    for instance in queryset.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        yield renderer.render(serializer.to_representation(instance))
+
+
+def iter_json_array(rows):
+    yield b"["
+    for index, row in enumerate(rows):
+        yield row if index == 0 else b"," + row
+    yield b"]"
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield row + b"\n"
+
+
+def iter_buffered(chunks, size=None):
+    """Join the chunks into writes of at least ``size`` bytes, the last aside"""
+    size = size or STREAM_BUFFER_SIZE
+    buffer, buffered = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def stream_properties(queryset, serializer_class, stream_format, context=None):
+    rows = iter_rendered_rows(queryset, serializer_class, context)
+    if stream_format == NDJSON:
+        return StreamingHttpResponse(
+            iter_buffered(iter_ndjson(rows)), content_type=NDJSON_MEDIA_TYPE
+        )
+    return StreamingHttpResponse(
+        iter_buffered(iter_json_array(rows)), content_type="application/json"
+    )
@@ -0,0 +1,55 @@
+import logging
+
+from celery import shared_task
+from django.db.models import F, JSONField, Value
+from django.db.models.expressions import CombinedExpression
+
+from . import cache
+from .counters import flush_views
+from .images import render_variants
+from .importer import run_import_job
+from .models import Property, PropertyImportJob
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_property_views():
+    """Write the view counts buffered in Redis to the database"""
+    flushed = flush_views()
+    logger.info(f"Flushed {flushed} property views")
+    return flushed
+
+
+@shared_task
+def run_property_import(job_pkid):
+    """Run a bulk property import uploaded through the API"""
+    job = PropertyImportJob.objects.select_related("user").get(pkid=job_pkid)
+    report = run_import_job(job)
+    logger.info(f"Property import {job.id}: {report}")
+    return str(report)
+
+
+@shared_task(queue="images")
+def generate_image_variants(property_pkid, field_name, source_name):
+    """Render the variants of one photo and record them on the property"""
+    try:
+        variants = render_variants(source_name)
+    except FileNotFoundError:
+        logger.warning(f"Photo {source_name} of property {property_pkid} is gone")
+        return 0
+
+    # Merge into the JSON column in SQL, the other photos of the property are
+    # processed in parallel. Skipped if the photo was replaced meanwhile.
+    merged = CombinedExpression(
+        F("image_variants"),
+        "||",
+        Value({field_name: variants}, output_field=JSONField()),
+        output_field=JSONField(),
+    )
+    updated = Property.objects.filter(
+        pkid=property_pkid, **{field_name: source_name}
+    ).update(image_variants=merged)
+    if updated:
+        cache.invalidate()
+    return updated
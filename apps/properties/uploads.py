@@ -0,0 +1,79 @@
+"""
+Content-addressed storage of uploaded property photos.
+
+HashingUploadHandler streams every upload to a temporary file in chunks and
+computes its SHA-256 on the way, so memory stays at one chunk per upload
+whatever the file size. The photo is then stored once under
+``photos/sha256/ab/cd/<hash>.<ext>`` and every property uploading the same
+image points at that file; a duplicate is not written again.
+"""
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image, UnidentifiedImageError
+
+PHOTOS_DIR = "photos/sha256"
+
+# File extension of the image formats, anything else uses the format name.
+EXTENSIONS = {"JPEG": "jpg", "MPO": "jpg", "TIFF": "tif"}
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Write uploads to disk chunk by chunk and record their sha256"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.hasher.hexdigest()
+        return upload
+
+
+def file_digest(upload):
+    """The sha256 of the upload, hashed by the handler when it went through it"""
+    digest = getattr(upload, "sha256", None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        for chunk in upload.chunks():
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+    upload.seek(0)
+    return digest
+
+
+def image_extension(upload):
+    """
+    The extension of the image format, read from the file header. Raises
+    ValueError when the upload is not an image.
+    """
+    try:
+        image = Image.open(upload)
+    except (UnidentifiedImageError, OSError):
+        raise ValueError("Upload a valid image.")
+    finally:
+        upload.seek(0)
+    return EXTENSIONS.get(image.format, image.format.lower())
+
+
+def content_name(upload):
+    digest = file_digest(upload)
+    return f"{PHOTOS_DIR}/{digest[:2]}/{digest[2:4]}/{digest}.{image_extension(upload)}"
+
+
+def store_photo(upload, storage=default_storage):
+    """
+    Store the upload under its content address and return the stored name,
+    nothing is written when the same image is already there.
+    """
+    name = content_name(upload)
+    if storage.exists(name):
+        return name
+    # Two first uploads racing each other end up with a suffixed copy.
+    return storage.save(name, upload)
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path("all/", views.ListAllPropertyAPIView.as_view(), name="properties"),
@@ -15,5 +15,30 @@ urlpatterns = [
     ),
     path("update/<slug:slug>/", views.update_property_api_view, name="property-update"),
     path("delete/<slug:slug>/", views.delete_property_api_view, name="property-delete"),
+    path("upload-images/", views.uploadPropertyImage, name="property-image-upload"),
     path("search/", views.PropertySearchAPIView.as_view(), name="property-search"),
+    path(
+        "search/facets/",
+        views.PropertySearchFacetsAPIView.as_view(),
+        name="property-search-facets",
+    ),
+    path("import/", views.PropertyImportAPIView.as_view(), name="property-import"),
+    path(
+        "import/<uuid:id>/",
+        views.PropertyImportStatusAPIView.as_view(),
+        name="property-import-status",
+    ),
+    # The async read path, for ASGI servers, see apps/properties/async_views.py.
+    path("async/all/", async_views.property_list, name="async-properties"),
+    path(
+        "async/detail/<slug:slug>/",
+        async_views.property_detail,
+        name="async-property-details",
+    ),
+    path("async/search/", async_views.property_search, name="async-property-search"),
+    path(
+        "cache/stats/",
+        views.PropertyCacheStatsAPIView.as_view(),
+        name="property-cache-stats",
+    ),
 ]
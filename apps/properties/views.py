@@ -1,17 +1,39 @@
 import logging
 
 import django_filters
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, permissions, status, viewsets
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from .exceptions import PropertyNotFound
-from .models import Property, PropertyViews
-from .pagination import PropertyPagination
-from .serializers import (PropertyCreateSerializer, PropertySerializer,
-                          PropertyViewSerializer)
+from apps.common.throttling import TokenBucketThrottle
+
+from . import cache
+from .compiled import CompiledPropertySerializer
+from .counters import record_view
+from .exceptions import PropertyImportNotFound, PropertyNotFound
+from .facets import facet_counts, search_filters
+from .geo import parse_bbox, parse_radius, within_bbox, within_radius
+from .images import IMAGE_FIELDS
+from .importer import detect_format
+from .models import Property, PropertyImportJob
+from .pagination import PropertyKeysetPagination
+from .search import search_properties
+from .serializers import (
+    PropertyCreateSerializer,
+    PropertyImportJobSerializer,
+    PropertySerializer,
+)
+from .streaming import NDJSONRenderer, get_stream_format, stream_properties
+from .tasks import run_property_import
+from .uploads import HashingUploadHandler, store_photo
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +48,9 @@ class PropertyFilter(django_filters.FilterSet):
     price = django_filters.NumberFilter()
     price__gt = django_filters.NumberFilter(field_name="price", lookup_expr="gt")
     price__lt = django_filters.NumberFilter(field_name="price", lookup_expr="lt")
+    # ?radius=latitude,longitude,km and ?bbox=min_lat,min_lng,max_lat,max_lng
+    radius = django_filters.CharFilter(method="filter_radius")
+    bbox = django_filters.CharFilter(method="filter_bbox")
 
     class Meta:
         model = Property
@@ -53,66 +78,141 @@ class PropertyFilter(django_filters.FilterSet):
     #         "address": ["icontains"],
     #     }
 
+    def filter_radius(self, queryset, name, value):
+        try:
+            latitude, longitude, radius_km = parse_radius(value)
+        except (TypeError, ValueError) as error:
+            raise ValidationError({name: [str(error)]})
+        return within_radius(queryset, latitude, longitude, radius_km)
+
+    def filter_bbox(self, queryset, name, value):
+        try:
+            bbox = parse_bbox(value)
+        except (TypeError, ValueError) as error:
+            raise ValidationError({name: [str(error)]})
+        return within_bbox(queryset, *bbox)
+
+
+class PropertyOrderingFilter(filters.OrderingFilter):
+    """Ordering filter that only allows distance once a radius filter set it"""
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = super().remove_invalid_fields(queryset, fields, view, request)
+        if "distance" in queryset.query.annotations:
+            return fields
+        return [field for field in fields if field.lstrip("-") != "distance"]
+
+
+class CachedListMixin:
+    """Serve list responses from the property response cache"""
+
+    cache_namespace = None
 
-class ListAllPropertyAPIView(generics.ListAPIView):
+    def get_cache_params(self):
+        # Results depend on who asks (staff see everything), the query string
+        # and the host the pagination links are built with.
+        return {
+            "user": self.request.user.pkid,
+            "staff": self.request.user.is_staff,
+            "host": self.request.get_host(),
+            "query": sorted(self.request.query_params.lists()),
+        }
+
+    def list(self, request, *args, **kwargs):
+        def produce():
+            return super(CachedListMixin, self).list(request, *args, **kwargs).data
+
+        data, hit = cache.cached_response_data(
+            self.cache_namespace, self.get_cache_params(), produce
+        )
+        response = Response(data)
+        response["X-Cache"] = "HIT" if hit else "MISS"
+        return response
+
+
+class CompiledListMixin:
+    """
+    List through the read-only CompiledPropertySerializer, the rows are read
+    with values() and never become model instances.
+    """
+
+    compiled_serializer_class = CompiledPropertySerializer
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.compiled_serializer_class
+        queryset = serializer_class.project(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = serializer_class(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(queryset, many=True, context=context)
+        return Response(serializer.data)
+
+
+class ListAllPropertyAPIView(CachedListMixin, CompiledListMixin, generics.ListAPIView):
     """
     List all properties for a specific user or agent
     """
 
     serializer_class = PropertySerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = PropertyPagination
+    pagination_class = PropertyKeysetPagination
     filter_backends = [
         filters.SearchFilter,
         DjangoFilterBackend,
-        filters.OrderingFilter,
+        PropertyOrderingFilter,
     ]
     filterset_class = PropertyFilter
     search_fields = [
         "country",
         "city",
     ]
-    ordering_fields = ["created_at"]
+    ordering_fields = ["created_at", "distance"]
+    cache_namespace = "all"
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Property.objects.select_related("user")
         if user.is_staff:
-            return Property.objects.all()
-        return Property.objects.filter(user=user).order_by("-created_at")
+            return queryset.all()
+        return queryset.filter(user=user).order_by("-created_at")
 
 
-class ListAgentsPropertiesAPIView(generics.ListAPIView):
+class ListAgentsPropertiesAPIView(
+    CachedListMixin, CompiledListMixin, generics.ListAPIView
+):
     """
     List all properties for a specific user or agent
     """
 
     serializer_class = PropertySerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = PropertyPagination
+    pagination_class = PropertyKeysetPagination
     filter_backends = [
         filters.SearchFilter,
         DjangoFilterBackend,
-        filters.OrderingFilter,
+        PropertyOrderingFilter,
     ]
     filterset_class = PropertyFilter
     search_fields = [
         "country",
         "city",
     ]
-    ordering_fields = ["created_at"]
+    ordering_fields = ["created_at", "distance"]
+    cache_namespace = "agents"
 
     def get_queryset(self):
         user = self.request.user
         # if user.is_staff:
         #     return Property.objects.all()
-        return Property.objects.filter(user=user).order_by("-created_at")
-
-
-class PropertyViewsAPIView(generics.ListAPIView):
-    """List all property views"""
-
-    serializer_class = PropertyViewSerializer
-    queryset = PropertyViews.objects.all()
+        return (
+            Property.objects.select_related("user")
+            .filter(user=user)
+            .order_by("-created_at")
+        )
 
 
 class PropertyDetailView(APIView):
@@ -124,7 +224,7 @@ class PropertyDetailView(APIView):
 
     def get_object(self, slug):
         try:
-            return Property.objects.get(slug=slug)
+            return Property.objects.select_related("user").get(slug=slug)
         except Property.DoesNotExist:
             raise PropertyNotFound
 
@@ -135,12 +235,9 @@ class PropertyDetailView(APIView):
             ip_address = x_forwarded_for.split(",")[0]
         else:
             ip_address = request.META.get("REMOTE_ADDR")
-        if not PropertyViews.objects.filter(
-            property=property, ip_address=ip_address
-        ).exists():
-            PropertyViews.objects.create(property=property, ip_address=ip_address)
-            property.views += 1
-            property.save()
+        # Deduplicated and buffered in Redis, flush_property_views writes the
+        # counts back so reading a property never writes to the database.
+        record_view(property.pkid, ip_address)
         serializer = PropertySerializer(property, context={"request": request})
         return Response(serializer.data)
 
@@ -219,15 +316,38 @@ def delete_property_api_view(request, slug):
 
 
 @api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated])
 def uploadPropertyImage(request):
     if request.method == "POST":
+        # Stream the files to disk and hash them, before the body is parsed.
+        request.upload_handlers = [HashingUploadHandler(request._request)]
         data = request.data
         property_id = data.get("property_id")
-        property = Property.objects.get(id=property_id)
-        property.cover_photo = request.FILES["cover_photo"]
-        property.photo1 = request.FILES["photo1"]
-        property.photo2 = request.FILES["photo2"]
-        property.photo3 = request.FILES["photo3"]
+        try:
+            property = Property.objects.get(id=property_id)
+        except (Property.DoesNotExist, DjangoValidationError):
+            raise PropertyNotFound
+        if property.user_id != request.user.pkid:
+            return Response(
+                {
+                    "message": "You are not allowed to perform this action, property deos not belong to you"
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        for field_name in IMAGE_FIELDS:
+            # photo1..photo3 are the names older clients send.
+            upload = request.FILES.get(field_name) or request.FILES.get(
+                field_name.replace("_", "")
+            )
+            if upload is None:
+                continue
+            try:
+                # Identical images are stored once and shared by properties.
+                setattr(property, field_name, store_photo(upload))
+            except ValueError as error:
+                raise ValidationError({field_name: [str(error)]})
+        # Only the new photos are written, their variants are rendered by the
+        # images worker once the transaction commits, see signals.py.
         property.save()
         return Response("Image(s) uploaded", status=status.HTTP_200_OK)
     return Response({"message": "Invalid request"}, status=status.HTTP_400_BAD_REQUEST)
@@ -235,72 +355,150 @@ def uploadPropertyImage(request):
 
 class PropertySearchAPIView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "search"
+    # POST only carries the filters, see apps/common/db_router.py.
+    replica_reads = True
     serializer_class = PropertySerializer
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
+    def get_base_queryset(self):
+        """Published rows matching the catch phrase and location"""
+        queryset = Property.objects.select_related("user").filter(published_status=True)
+        data = self.request.data
+
+        catch_phrase = str(data.get("catch_phrase") or "").strip()
+        if catch_phrase:
+            queryset = search_properties(queryset, catch_phrase)
+
+        # Optional location filters, in the same format as PropertyFilter.
+        try:
+            if data.get("radius"):
+                queryset = within_radius(queryset, *parse_radius(data["radius"]))
+            if data.get("bbox"):
+                queryset = within_bbox(queryset, *parse_bbox(data["bbox"]))
+        except (TypeError, ValueError) as error:
+            raise ValidationError({"location": [str(error)]})
+
+        return queryset
+
+    def get_queryset(self):
+        data = self.request.data
+        filters = search_filters(data)
+        queryset = self.get_base_queryset().filter(*filters.values())
+
+        if data.get("ordering") == "distance":
+            if not data.get("radius"):
+                raise ValidationError(
+                    {"ordering": ["Sorting by distance needs a radius."]}
+                )
+            queryset = queryset.order_by("distance", "-created_at")
+
+        return queryset
+
+    def get_cache_params(self):
+        data = self.request.data
+        return {
+            # advert_type and property_type are matched case-insensitively and
+            # the full-text search ignores case and extra whitespace.
+            "advert_type": str(data.get("advert_type") or "").lower(),
+            "property_type": str(data.get("property_type") or "").lower(),
+            "price": data.get("price"),
+            "bedrooms": data.get("bedrooms"),
+            "bathrooms": data.get("bathrooms"),
+            "catch_phrase": " ".join(
+                str(data.get("catch_phrase") or "").lower().split()
+            ),
+            "radius": data.get("radius"),
+            "bbox": data.get("bbox"),
+            "ordering": data.get("ordering"),
+        }
+
+    def get_results(self):
+        queryset = CompiledPropertySerializer.project(self.get_queryset())
+        return CompiledPropertySerializer(queryset, many=True).data
 
     def post(self, request):
-        queryset = Property.objects.filter(published_status=True)
-        data = request.data
+        stream_format = get_stream_format(request)
+        if stream_format is not None:
+            return stream_properties(
+                CompiledPropertySerializer.project(self.get_queryset()),
+                CompiledPropertySerializer,
+                stream_format,
+            )
+
+        data, hit = cache.cached_response_data(
+            "search", self.get_cache_params(), self.get_results
+        )
+        response = Response(data)
+        response["X-Cache"] = "HIT" if hit else "MISS"
+        return response
 
-        advert_type = data["advert_type"]
-        queryset = queryset.filter(advert_type__iexact=advert_type)
-        property_type = data["property_type"]
-        queryset = queryset.filter(property_type__iexact=property_type)
-        price = data["price"]
-        if price == "$0+":
-            price = 0
-        elif price == "$100,000+":
-            price = 100000
-        elif price == "$200,000+":
-            price = 200000
-        elif price == "$300,000+":
-            price = 300000
-        elif price == "$400,000+":
-            price = 400000
-        elif price == "$500,000+":
-            price = 500000
-        elif price == "$600,000+":
-            price = 600000
-        elif price == "Any":
-            price = -1
-
-        if price != -1:
-            queryset = queryset.filter(price__gte=price)
-
-        bedrooms = data["bedrooms"]
-        if bedrooms == "0+":
-            bedrooms = 0
-        elif bedrooms == "1+":
-            bedrooms = 1
-        elif bedrooms == "2+":
-            bedrooms = 2
-        elif bedrooms == "3+":
-            bedrooms = 3
-        elif bedrooms == "4+":
-            bedrooms = 4
-        elif bedrooms == "5+":
-            bedrooms = 5
-        elif bedrooms == "6+":
-            bedrooms = 6
-
-        queryset = queryset.filter(bedrooms__gte=bedrooms)
-
-        bathrooms = data["bathrooms"]
-        if bathrooms == "0+":
-            bathrooms = 0
-        elif bathrooms == "1+":
-            bathrooms = 1
-        elif bathrooms == "2+":
-            bathrooms = 2
-        elif bathrooms == "3+":
-            bathrooms = 3
-        elif bedrooms == "4+":
-            bedrooms = 4
-
-        queryset = queryset.filter(bathrooms__gte=bathrooms)
-
-        catch_phrase = data["catch_phrase"]
-        queryset = queryset.filter(description__icontains=catch_phrase)
-
-        serializer = PropertySerializer(queryset, many=True)
 
-        return Response(serializer.data)
+class PropertySearchFacetsAPIView(PropertySearchAPIView):
+    """
+    Counts behind each advert type, property type, price and room option of
+    the search form, for the same request body as the search endpoint.
+    """
+
+    def post(self, request):
+        def produce():
+            return facet_counts(self.get_base_queryset(), request.data)
+
+        data, hit = cache.cached_response_data(
+            "facets", self.get_cache_params(), produce
+        )
+        response = Response(data)
+        response["X-Cache"] = "HIT" if hit else "MISS"
+        return response
+
+
+class PropertyImportAPIView(APIView):
+    """
+    Upload a CSV or NDJSON file of listings, the rows are imported in the
+    background and the response points at the import's status.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        source = request.FILES.get("file")
+        if source is None:
+            raise ValidationError({"file": ["No file was submitted."]})
+        format = request.data.get("format") or detect_format(source.name)
+        if format not in PropertyImportJob.FormatChoices.values:
+            raise ValidationError({"format": ["Upload a .csv or .ndjson file."]})
+
+        job = PropertyImportJob.objects.create(
+            user=request.user, source=source, format=format
+        )
+        transaction.on_commit(lambda: run_property_import.delay(job.pkid))
+        serializer = PropertyImportJobSerializer(job)
+        response = Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        response["Location"] = reverse(
+            "property-import-status", args=[job.id], request=request
+        )
+        return response
+
+
+class PropertyImportStatusAPIView(APIView):
+    """Progress and per-row errors of one of the user's imports"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, id):
+        try:
+            job = PropertyImportJob.objects.get(id=id, user=request.user)
+        except PropertyImportJob.DoesNotExist:
+            raise PropertyImportNotFound
+        return Response(PropertyImportJobSerializer(job).data)
+
+
+class PropertyCacheStatsAPIView(APIView):
+    """Hit and miss counters of the property response cache"""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache.get_stats())
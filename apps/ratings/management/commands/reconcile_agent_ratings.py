@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.ratings.models import Rating
+
+
+class Command(BaseCommand):
+    help = "Recompute the review count and average rating of every agent"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of profiles read and updated per statement",
+        )
+
+        return super().add_arguments(parser)
+
+    def handle(self, *args, **options):
+        fixed = Rating.objects.reconcile_agents(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled the ratings of {fixed} profiles")
+        )
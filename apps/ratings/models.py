@@ -1,11 +1,89 @@
-from django.db import models
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce
 from django.utils.translation import gettext_lazy as _
 
 from apps.common.models import TimeStampedUUIDModel
 from apps.profiles.models import Profile
+from apps.users.authentication import forget_user
 from real_estate.settings.base import AUTH_USER_MODEL
 
 
+def average_rating(total, count):
+    """The Profile.rating stored for a sum and number of ratings"""
+    return Cast(total, DecimalField(max_digits=12, decimal_places=2)) / count
+
+
+class RatingManager(models.Manager):
+    def create_review(self, rater, agent, rating, comment):
+        """
+        Insert a review and add it to the agent's aggregates in the same
+        transaction. The UPDATE reads the current counters in the database,
+        so concurrent reviews of one agent are all counted.
+        """
+        with transaction.atomic():
+            review = self.create(
+                rater=rater, agent=agent, rating=rating, comment=comment
+            )
+            num_reviews = Coalesce(F("num_reviews"), 0) + 1
+            rating_total = F("rating_total") + Value(review.rating)
+            Profile.objects.filter(pkid=agent.pkid).update(
+                num_reviews=num_reviews,
+                rating_total=rating_total,
+                rating=average_rating(rating_total, num_reviews),
+            )
+            forget_user(agent.user)
+        return review
+
+    def reconcile_agents(self, batch_size=1000):
+        """
+        Recompute the aggregates of every agent from their reviews with one
+        GROUP BY and write the ones that drifted, returns how many were fixed.
+        """
+        totals = {
+            row["agent"]: (row["count"], row["total"])
+            for row in self.filter(agent__isnull=False)
+            .values("agent")
+            .annotate(count=Count("pkid"), total=Sum("rating"))
+            .order_by()
+        }
+        profiles = (
+            Profile.objects.filter(Q(is_agent=True) | Q(pkid__in=list(totals)))
+            .select_related("user")
+            .only("pkid", "num_reviews", "rating_total", "rating", "user__id")
+        )
+
+        drifted = []
+        for profile in profiles.iterator(chunk_size=batch_size):
+            count, total = totals.get(profile.pkid, (0, 0))
+            rating = None
+            if count:
+                # Rounded the way PostgreSQL stores the numeric column.
+                rating = (Decimal(total) / count).quantize(
+                    Decimal("0.01"), rounding=ROUND_HALF_UP
+                )
+            if (profile.num_reviews, profile.rating_total, profile.rating) != (
+                count,
+                total,
+                rating,
+            ):
+                profile.num_reviews = count
+                profile.rating_total = total
+                profile.rating = rating
+                drifted.append(profile)
+        with transaction.atomic():
+            Profile.objects.bulk_update(
+                drifted,
+                ["num_reviews", "rating_total", "rating"],
+                batch_size=batch_size,
+            )
+            for profile in drifted:
+                forget_user(profile.user)
+        return len(drifted)
+
+
 class Rating(TimeStampedUUIDModel):
     class Range(models.IntegerChoices):
         RATTING_1 = 1, _("Poor")
@@ -36,6 +114,8 @@ class Rating(TimeStampedUUIDModel):
     )
     comment = models.TextField(verbose_name=_("Comment"))
 
+    objects = RatingManager()
+
     class Meta:
         unique_together = ["rater", "agent"]
 
@@ -1,18 +1,24 @@
 from rest_framework import serializers
 
+from apps.common.serializers import EagerLoadingMixin
+
 from .models import Rating
 
 
-class RatingSerializer(serializers.ModelSerializer):
+class RatingSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     rater = serializers.SerializerMethodField(read_only=True)
     agent = serializers.SerializerMethodField(read_only=True)
 
+    # Read by get_rater and get_agent.
+    select_related_fields = ["rater", "agent__user"]
+
     class Meta:
         model = Rating
         exclude = ["updated_at", "pkid"]
 
     def get_rater(self, obj):
-        return obj.rater.username
+        # Ratings are kept when the rater's account is deleted.
+        return obj.rater.username if obj.rater else None
 
     def get_agent(self, obj):
         return obj.agent.user.username
@@ -1,4 +1,4 @@
-from django.contrib.auth import get_user_model
+from django.db import IntegrityError
 from rest_framework import permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -7,8 +7,6 @@ from apps.profiles.models import Profile
 
 from .models import Rating
 
-User = get_user_model()
-
 
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
@@ -17,7 +15,9 @@ def create_agent_review(request, profile_id):
     Create a review for an agent
     """
     try:
-        agent_profile = Profile.objects.get(id=profile_id, is_agent=True)
+        agent_profile = Profile.objects.select_related("user").get(
+            id=profile_id, is_agent=True
+        )
     except Profile.DoesNotExist:
         formatted_response = {
             "error": "The agent you are trying to review does not exist",
@@ -25,41 +25,32 @@ def create_agent_review(request, profile_id):
         return Response(formatted_response, status=status.HTTP_404_NOT_FOUND)
 
     data = request.data
-    profile_user = User.objects.get(pkid=agent_profile.user.pkid)
 
-    if profile_user.email == request.user.email:
+    if agent_profile.user_id == request.user.pkid:
         formatted_response = {
             "error": "You cannot rate yourself",
         }
         return Response(formatted_response, status=status.HTTP_400_BAD_REQUEST)
 
-    alreadyExists = agent_profile.agent_reviews.filter(
-        agent__pkid=profile_user.pkid
-    ).exists()
-    if alreadyExists:
-        formatted_response = {
-            "error": "You have already reviewed this agent",
-        }
-        return Response(formatted_response, status=status.HTTP_400_BAD_REQUEST)
-
-    elif data["rating"] == 0:
+    if data["rating"] == 0:
         formatted_response = {
             "error": "Please select a rating",
         }
         return Response(formatted_response, status=status.HTTP_400_BAD_REQUEST)
     else:
-        review = Rating.objects.create(
-            rater=request.user,
-            agent=agent_profile,
-            rating=data["rating"],
-            comment=data["comment"],
-        )
-        reviews = agent_profile.agent_reviews.all()
-        agent_profile.num_reviews = len(reviews)
-
-        total = 0
-        for i in reviews:
-            total += i.rating
+        try:
+            Rating.objects.create_review(
+                rater=request.user,
+                agent=agent_profile,
+                rating=data["rating"],
+                comment=data["comment"],
+            )
+        except IntegrityError:
+            # A rater reviews an agent once, see Rating.Meta.unique_together.
+            formatted_response = {
+                "error": "You have already reviewed this agent",
+            }
+            return Response(formatted_response, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(
             {"success": "You have successfully reviewed this agent"},
@@ -0,0 +1,92 @@
+"""
+JWT authentication resolving the user, with their profile, from Redis.
+
+simplejwt's JWTAuthentication loads the User row on every request, and most
+views then read request.user.profile. CachedJWTAuthentication keeps both,
+pickled, under the token's user id for AUTH_USER_CACHE_TIMEOUT seconds, so
+an authenticated request usually makes no authentication query.
+
+Saving or deleting a User or Profile replaces the entry with an empty one
+(see apps/users/signals.py), so a deactivated user is refused on their next
+request. The empty entry is not overwritten until it expires, which keeps a
+request that read the user just before the change from caching it again.
+Bulk ``update()`` calls bypass the signals, so the ones changing profiles
+call ``forget_user()`` themselves (``Rating.objects.create_review()``,
+``reconcile_agents()``). Any other is picked up when the entry expires.
+"""
+import logging
+import pickle
+
+import redis
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.common.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def user_cache_key(user_id):
+    return f"users:auth:{user_id}"
+
+
+def forget_user(user):
+    """Stop serving the cached user once the transaction commits"""
+    key = user_cache_key(getattr(user, api_settings.USER_ID_FIELD))
+
+    def invalidate():
+        try:
+            get_redis().set(key, b"", ex=settings.AUTH_USER_CACHE_TIMEOUT)
+        except redis.RedisError:
+            logger.exception("Could not invalidate the cached user")
+
+    transaction.on_commit(invalidate)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = self.get_cached_user(user_id)
+        if user is None:
+            try:
+                # From the primary: a lagging replica could still return a
+                # user deactivated since.
+                user = (
+                    self.user_model.objects.using(DEFAULT_DB_ALIAS)
+                    .select_related("profile")
+                    .get(**{api_settings.USER_ID_FIELD: user_id})
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            self.cache_user(user_id, user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    def get_cached_user(self, user_id):
+        try:
+            cached = get_redis().get(user_cache_key(user_id))
+        except redis.RedisError:
+            logger.exception("Cached user lookup failed")
+            return None
+        return pickle.loads(cached) if cached else None
+
+    def cache_user(self, user_id, user):
+        try:
+            get_redis().set(
+                user_cache_key(user_id),
+                pickle.dumps(user, pickle.HIGHEST_PROTOCOL),
+                ex=settings.AUTH_USER_CACHE_TIMEOUT,
+                nx=True,
+            )
+        except redis.RedisError:
+            logger.exception("Could not cache the user")
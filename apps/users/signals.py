@@ -0,0 +1,24 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from real_estate.settings.base import AUTH_USER_MODEL
+
+from .authentication import forget_user
+
+
+@receiver(post_save, sender=AUTH_USER_MODEL)
+@receiver(post_delete, sender=AUTH_USER_MODEL)
+def forget_saved_user(sender, instance, **kwargs):
+    forget_user(instance)
+
+
+@receiver(post_save, sender="profiles.Profile")
+@receiver(post_delete, sender="profiles.Profile")
+def forget_profile_user(sender, instance, **kwargs):
+    try:
+        user = instance.user
+    except ObjectDoesNotExist:
+        # Deleted along with the user, which was forgotten then.
+        return
+    forget_user(user)
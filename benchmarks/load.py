@@ -0,0 +1,327 @@
+"""
+Load benchmark for the hot REST endpoints.
+
+Runs against a live server (``python manage.py runserver`` or the docker
+stack) backed by a seeded database, for example one filled with
+``python manage.py init_db 100000 --scale``. Start the server with
+QUERY_COUNT_HEADER=True to get queries per request as well.
+
+    python -m benchmarks.load --email someone@example.com --password password123
+    python -m benchmarks.load --compare benchmarks/results/a1b2c3d.json \\
+        benchmarks/results/e4f5a6b.json
+
+Each endpoint is driven in turn by ``--concurrency`` clients for
+``--duration`` seconds. Authenticated endpoints use a JWT from the djoser
+jwt/create endpoint, the others are called anonymously. Results are printed
+and saved to ``--output``/<git sha>.json so runs can be compared across
+commits.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+
+API = "/api/v1"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SEARCH_BODY = {
+    "advert_type": "For Sale",
+    "property_type": "House",
+    "price": "$100,000+",
+    "bedrooms": "3+",
+    "bathrooms": "2+",
+    "catch_phrase": "garden",
+}
+
+
+class Endpoint:
+    def __init__(self, name, method, path, auth=False, body=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.auth = auth
+        self.body = body
+
+    def paths(self, slugs):
+        if "{slug}" not in self.path:
+            return itertools.repeat(self.path)
+        return (self.path.format(slug=slug) for slug in itertools.cycle(slugs))
+
+
+ENDPOINTS = [
+    Endpoint("properties-all", "GET", f"{API}/properties/all/", auth=True),
+    Endpoint(
+        "properties-search", "POST", f"{API}/properties/search/", body=SEARCH_BODY
+    ),
+    Endpoint(
+        "properties-detail", "GET", f"{API}/properties/detail/{{slug}}/", auth=True
+    ),
+    Endpoint("profiles-agents", "GET", f"{API}/profiles/agents/all/"),
+    Endpoint("profiles-top-agents", "GET", f"{API}/profiles/top-agents/"),
+    # The async views, served under ASGI.
+    Endpoint("async-all", "GET", f"{API}/properties/async/all/", auth=True),
+    Endpoint(
+        "async-search", "POST", f"{API}/properties/async/search/", body=SEARCH_BODY
+    ),
+    Endpoint(
+        "async-detail",
+        "GET",
+        f"{API}/properties/async/detail/{{slug}}/",
+        auth=True,
+    ),
+]
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of the values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples, seconds):
+    """Turn (latency, status, queries) samples into the saved statistics"""
+    latencies = [latency * 1000 for latency, status, queries in samples]
+    ok = [sample for sample in samples if 200 <= sample[1] < 300]
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "throughput": round(len(ok) / seconds, 1) if seconds else 0.0,
+        "mean_ms": round(statistics.mean(latencies), 2) if latencies else None,
+        "p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+        "queries_per_request": (
+            round(statistics.mean(queries), 2) if queries else None
+        ),
+    }
+
+
+async def fetch_token(session, base_url, email, password):
+    url = f"{base_url}{API}/auth/jwt/create/"
+    async with session.post(url, json={"email": email, "password": password}) as r:
+        if r.status != 200:
+            raise SystemExit(
+                f"Could not log in as {email}: {r.status} {await r.text()}"
+            )
+        return (await r.json())["access"]
+
+
+async def fetch_slugs(session, base_url, headers):
+    """Slugs for the detail endpoint, from the user's listings or the search"""
+    body = {
+        **SEARCH_BODY,
+        "price": "Any",
+        "bedrooms": "0+",
+        "bathrooms": "0+",
+        "catch_phrase": "",
+    }
+    url = f"{base_url}{API}/properties/all/?cursor=&page_size=100"
+    async with session.get(url, headers=headers) as response:
+        if response.status == 200:
+            slugs = [row["slug"] for row in (await response.json())["results"]]
+            if slugs:
+                return slugs
+    url = f"{base_url}{API}/properties/search/?stream=ndjson"
+    async with session.post(url, json=body) as response:
+        slugs = []
+        async for line in response.content:
+            if line.strip():
+                slugs.append(json.loads(line)["slug"])
+            if len(slugs) == 100:
+                break
+    return slugs
+
+
+async def drive(session, base_url, endpoint, headers, paths, concurrency, duration):
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with session.request(
+                    endpoint.method,
+                    base_url + next(paths),
+                    json=endpoint.body,
+                    headers=headers,
+                ) as response:
+                    await response.read()
+                    queries = response.headers.get("X-Query-Count")
+                    status = response.status
+            except aiohttp.ClientError:
+                status, queries = 0, None
+            samples.append(
+                (
+                    time.perf_counter() - started,
+                    status,
+                    int(queries) if queries is not None else None,
+                )
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - started)
+
+
+async def run(args):
+    timeout = aiohttp.ClientTimeout(total=60)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        token = await fetch_token(session, args.base_url, args.email, args.password)
+        auth_headers = {"Authorization": f"Bearer {token}"}
+        slugs = await fetch_slugs(session, args.base_url, auth_headers)
+
+        results = {}
+        for endpoint in ENDPOINTS:
+            if args.endpoints and endpoint.name not in args.endpoints:
+                continue
+            if "{slug}" in endpoint.path and not slugs:
+                print(f"Skipping {endpoint.name}, no properties found", file=sys.stderr)
+                continue
+            # Warm up connections, caches and the query planner.
+            await drive(
+                session,
+                args.base_url,
+                endpoint,
+                auth_headers if endpoint.auth else {},
+                endpoint.paths(slugs),
+                args.concurrency,
+                args.warmup,
+            )
+            results[endpoint.name] = await drive(
+                session,
+                args.base_url,
+                endpoint,
+                auth_headers if endpoint.auth else {},
+                endpoint.paths(slugs),
+                args.concurrency,
+                args.duration,
+            )
+            print_row(endpoint.name, results[endpoint.name])
+        return results
+
+
+def git_sha():
+    try:
+        sha = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"]).returncode
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{sha}-dirty" if dirty else sha
+
+
+COLUMNS = [
+    ("throughput", "req/s"),
+    ("p50_ms", "p50 ms"),
+    ("p95_ms", "p95 ms"),
+    ("p99_ms", "p99 ms"),
+    ("queries_per_request", "queries"),
+    ("errors", "errors"),
+]
+
+
+def print_header():
+    print(f"{'endpoint':<22}" + "".join(f"{title:>12}" for key, title in COLUMNS))
+
+
+def print_row(name, stats):
+    cells = []
+    for key, title in COLUMNS:
+        value = stats.get(key)
+        cells.append(f"{'-' if value is None else value:>12}")
+    print(f"{name:<22}" + "".join(cells))
+
+
+def compare(base_path, head_path):
+    """Print how each endpoint moved between two saved runs"""
+    base = json.loads(Path(base_path).read_text())
+    head = json.loads(Path(head_path).read_text())
+    print(f"{base['label']} -> {head['label']}")
+    print(f"{'endpoint':<22}" + "".join(f"{title:>18}" for key, title in COLUMNS))
+    for name, stats in head["endpoints"].items():
+        before = base["endpoints"].get(name, {})
+        cells = []
+        for key, title in COLUMNS:
+            old, new = before.get(key), stats.get(key)
+            if old is None or new is None:
+                cells.append(f"{'-' if new is None else new:>18}")
+            elif old:
+                cells.append(f"{new} ({(new - old) / old:+.0%})".rjust(18))
+            else:
+                cells.append(f"{new}".rjust(18))
+        print(f"{name:<22}" + "".join(cells))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", help="User to get a JWT for")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--duration", type=float, default=10, help="Seconds per endpoint"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=2, help="Unmeasured seconds per endpoint"
+    )
+    parser.add_argument(
+        "--endpoints",
+        nargs="*",
+        choices=[endpoint.name for endpoint in ENDPOINTS],
+        help="Only run these endpoints",
+    )
+    parser.add_argument("--label", help="Name of the run, the git sha by default")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASE", "HEAD"),
+        help="Compare two saved runs instead of running",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return
+    if not args.email:
+        raise SystemExit("--email is required to benchmark")
+
+    print_header()
+    endpoints = asyncio.run(run(args))
+    label = args.label or git_sha()
+    result = {
+        "label": label,
+        "git_sha": git_sha(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "endpoints": endpoints,
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / f"{label}.json"
+    path.write_text(json.dumps(result, indent=2))
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Micro benchmark of the JSON renderers on list endpoint sized payloads.
+
+    python -m benchmarks.renderers --rows 1000 --repeat 50
+
+Renders the same payloads with the stdlib json.dumps the old
+ProfileJSONRenderer used, DRF's JSONRenderer and ORJSONRenderer, and prints
+the median time per render. The "native" payload holds the Decimal, UUID
+and datetime objects that the stdlib encoder cannot encode, so it is only
+timed with the DRF encoder and orjson.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "real_estate.settings.development")
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from apps.common.renderers import ORJSONRenderer  # noqa: E402
+from apps.profiles.renderers import ProfileJSONRenderer  # noqa: E402
+
+STARTED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def review(rng, number):
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "created_at": (STARTED + timedelta(minutes=number)).isoformat(),
+        "rater": f"rater{number}",
+        "agent": f"agent{number}",
+        "rating": rng.randint(1, 5),
+        "comment": "Knew the area well and answered quickly.",
+    }
+
+
+def profile_row(rng, number):
+    """A row the way ProfileSerializer outputs it"""
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "username": f"agent{number}",
+        "first_name": "Ngozi",
+        "last_name": "Mbah",
+        "email": f"agent{number}@example.com",
+        "full_name": "Ngozi Mbah",
+        "phone_number": "+237670181440",
+        "about_me": "Helping families find homes in Douala since 2012.",
+        "license": f"LIC-{number:08d}",
+        "profile_photo": "/mediafiles/profile_default.png",
+        "gender": "Female",
+        "country": "Cameroon",
+        "city": "Douala",
+        "is_buyer": False,
+        "is_seller": True,
+        "is_agent": True,
+        "top_agent": number < 10,
+        "rating": f"{rng.uniform(1, 5):.2f}",
+        "reviews": [review(rng, number * 3 + index) for index in range(3)],
+        "num_reviews": 3,
+    }
+
+
+def property_row(rng, number):
+    """A row the way PropertySerializer outputs it"""
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "user": f"agent{number % 50}",
+        "profile_photo": "/mediafiles/profile_default.png",
+        "title": "3 Bedroom House In Douala",
+        "slug": f"3-bedroom-house-in-douala-{number}",
+        "ref_code": f"REF-{number:010d}",
+        "description": "House with a large garden and a sea view.",
+        "country": "Cameroon",
+        "city": "Douala",
+        "postal_code": "140",
+        "street_address": f"{number} Main Street",
+        "property_number": number,
+        "price": f"{rng.uniform(10000, 900000):.2f}",
+        "tax": "0.15",
+        "final_property_price": f"{rng.uniform(10000, 900000):.2f}",
+        "plot_area": f"{rng.uniform(100, 900):.2f}",
+        "total_floors": 2,
+        "bedrooms": 3,
+        "bathrooms": "2.0",
+        "advert_type": "For Sale",
+        "property_type": "House",
+        "cover_photo": "/mediafiles/house_sample.jpg",
+        "published_status": True,
+        "views": rng.randint(0, 5000),
+        "latitude": 4.0511 + rng.gauss(0, 0.05),
+        "longitude": 9.7679 + rng.gauss(0, 0.05),
+    }
+
+
+def native_row(rng, number):
+    """A row holding the Python objects behind the strings above"""
+    return {
+        "id": uuid.UUID(int=rng.getrandbits(128)),
+        "created_at": STARTED + timedelta(minutes=number, microseconds=123456),
+        "price": Decimal(f"{rng.uniform(10000, 900000):.2f}"),
+        "title": "3 Bedroom House In Douala",
+        "views": rng.randint(0, 5000),
+    }
+
+
+def legacy_profile_render(data):
+    """ProfileJSONRenderer.render before it moved to orjson"""
+    return json.dumps({"profile": data})
+
+
+def payloads(rows, seed=0):
+    rng = random.Random(seed)
+    return {
+        "profiles": [profile_row(rng, number) for number in range(rows)],
+        "properties": [property_row(rng, number) for number in range(rows)],
+        "native": [native_row(rng, number) for number in range(rows)],
+    }
+
+
+def renderers():
+    drf, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+    profile = ProfileJSONRenderer()
+    return {
+        "profiles": {
+            "stdlib json": legacy_profile_render,
+            "orjson": profile.render,
+        },
+        "properties": {
+            "drf JSONRenderer": drf.render,
+            "orjson": orjson_renderer.render,
+        },
+        "native": {
+            "drf JSONRenderer": drf.render,
+            "orjson": orjson_renderer.render,
+        },
+    }
+
+
+def time_render(render, data, repeat):
+    """Median milliseconds of one render"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(data)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(rows, repeat):
+    """Return {payload: {renderer: median ms}}"""
+    data = payloads(rows)
+    return {
+        name: {
+            label: time_render(render, data[name], repeat)
+            for label, render in candidates.items()
+        }
+        for name, candidates in renderers().items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{'payload':<12}{'renderer':<20}{'median ms':>12}{'speedup':>10}")
+    for name, timings in run(args.rows, args.repeat).items():
+        baseline = next(iter(timings.values()))
+        for label, ms in timings.items():
+            print(f"{name:<12}{label:<20}{ms:>12.3f}{baseline / ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 import pytest
 from pytest_factoryboy import register
-from tests.factories import ProfileFactory, UserFactory
+from rest_framework.test import APIClient
+
+from apps.common.redis import get_redis
+from tests.factories import ProfileFactory, PropertyFactory, UserFactory
+
+pytest_plugins = ["tests.query_budget"]
 
 register(ProfileFactory)
 register(UserFactory)
+register(PropertyFactory)
 
 # Create the fixtures
 
@@ -24,3 +30,48 @@ def super_user(db, user_factory):
 def profile(db, profile_factory):
     new_profile = profile_factory.create()
     return new_profile
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def agent_client(api_client, base_user):
+    api_client.force_authenticate(user=base_user)
+    return api_client
+
+
+@pytest.fixture
+def search_payload():
+    """Builds the body of a property search matching every listing"""
+
+    def build(catch_phrase="", **overrides):
+        return {
+            "advert_type": "For Sale",
+            "property_type": "House",
+            "price": "Any",
+            "bedrooms": "0+",
+            "bathrooms": "0+",
+            "catch_phrase": catch_phrase,
+            **overrides,
+        }
+
+    return build
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Uploads and image variants written to a temporary MEDIA_ROOT"""
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def redis_client():
+    """The REDIS_URL database, emptied before and after every test"""
+    client = get_redis()
+    client.flushdb()
+    yield client
+    client.flushdb()
@@ -0,0 +1,57 @@
+"""
+Gunicorn settings for serving real_estate.wsgi in production, used by
+docker/production/django/start:
+
+    gunicorn --config gunicorn.conf.py real_estate.wsgi:application
+
+Every setting can be overridden from the environment, see
+https://docs.gunicorn.org/en/stable/settings.html.
+"""
+import multiprocessing
+import os
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Preforked sync workers, the usual (2 x CPUs) + 1 so one worker's requests
+# waiting on Postgres or Redis leave the CPUs to the others.
+workers = env_int("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+threads = env_int("GUNICORN_THREADS", 1)
+
+# Import Django and the apps once in the master, the workers share the pages
+# copy-on-write and start faster.
+preload_app = True
+
+# Replace each worker after about this many requests to cap memory growth.
+# The jitter keeps the workers from all restarting at once.
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+# Workers silent for longer are killed and replaced.
+timeout = env_int("GUNICORN_TIMEOUT", 60)
+# On SIGTERM workers stop accepting connections and get this long to finish
+# the requests they have, streamed exports included.
+graceful_timeout = env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+# Behind nginx, which reuses its upstream connections.
+keepalive = env_int("GUNICORN_KEEPALIVE", 5)
+
+# The heartbeat file of each worker, on tmpfs since a container's disk can
+# stall long enough to get workers killed.
+worker_tmp_dir = os.environ.get("GUNICORN_WORKER_TMP_DIR", "/dev/shm")
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading belong to the master, each worker
+    # opens its own.
+    from django.db import connections
+
+    connections.close_all()
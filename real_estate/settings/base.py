@@ -34,6 +34,7 @@ DJANGO_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
 ]
 
 SITE_ID = 10
@@ -61,8 +62,24 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 # Configuring Authentication
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+        "apps.users.authentication.CachedJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "apps.common.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    # Token buckets of apps.common.throttling.TokenBucketThrottle, per client:
+    # "N/period" bursts up to N requests and refills N per period.
+    "DEFAULT_THROTTLE_RATES": {
+        "search": env("THROTTLE_SEARCH_RATE", default="60/min"),
+        "search.user": env("THROTTLE_SEARCH_USER_RATE", default="240/min"),
+        "enquiry": env("THROTTLE_ENQUIRY_RATE", default="10/hour"),
+    },
+    # Proxies in front of the API, nginx in the docker stacks. Anonymous
+    # clients are throttled by the address the nearest of them saw, which
+    # is appended last to X-Forwarded-For, not by the addresses clients
+    # put in the header themselves. 0 uses REMOTE_ADDR.
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=1),
 }
 
 
@@ -102,12 +119,14 @@ DJOSER = {
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "apps.common.db_router.ReplicaMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.common.middleware.QueryCountMiddleware",
 ]
 
 
@@ -143,10 +162,46 @@ DATABASES = {
         "HOST": env("POSTGRES_HOST"),
         "PASSWORD": env("POSTGRES_PASSWORD"),
         "PORT": env("POSTGRES_PORT"),
+        # Seconds a connection is reused: across requests by the sync workers,
+        # across orm() calls by the async views' threads. 0 closes it each time.
+        "CONN_MAX_AGE": env.int("CONN_MAX_AGE", default=60),
     }
 }
 
 
+def replica_databases(primary):
+    """DATABASES entries of the POSTGRES_REPLICAS read replicas, "host:port" each"""
+    replicas = {}
+    for number, address in enumerate(env.list("POSTGRES_REPLICAS", default=[])):
+        host, separator, port = address.rpartition(":")
+        if not separator:
+            host, port = address, primary["PORT"]
+        replicas[f"replica_{number}"] = {
+            **primary,
+            "HOST": host,
+            "PORT": port,
+            # The test database is only created on the primary.
+            "TEST": {"MIRROR": "default"},
+        }
+    return replicas
+
+
+DATABASES.update(replica_databases(DATABASES["default"]))
+
+# Threads running the ORM calls of the async views of each process, which
+# also bounds their database connections. 0 runs them in Django's single
+# thread for sync code.
+ASYNC_ORM_THREADS = env.int("ASYNC_ORM_THREADS", default=16)
+
+# Reads of safe requests go to the replicas, see apps/common/db_router.py.
+DATABASE_ROUTERS = ["apps.common.db_router.PrimaryReplicaRouter"]
+# Replicas further behind the primary than this (seconds) are not read from.
+REPLICA_MAX_LAG = env.float("REPLICA_MAX_LAG", default=5.0)
+REPLICA_LAG_CHECK_INTERVAL = 5
+# How long a client reads from the primary after writing (seconds).
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=15)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -194,6 +249,53 @@ MEDIA_ROOT = BASE_DIR / "mediafiles"
 
 AUTH_USER_MODEL = "users.User"
 
+REDIS_URL = env("REDIS_URL", default="redis://redis:6379/1")
+
+# Views of a property from the same IP are counted once per window (seconds)
+PROPERTY_VIEWS_WINDOW = 60 * 60 * 24
+
+# Upper bound (seconds) on how long a cached property search or listing
+# response lives, saving or deleting a property invalidates them all sooner.
+PROPERTY_CACHE_TIMEOUT = 60 * 5
+
+# How long an authenticated user and their profile are cached, saving either
+# drops the entry sooner. See apps/users/authentication.py.
+AUTH_USER_CACHE_TIMEOUT = env.int("AUTH_USER_CACHE_TIMEOUT", default=60)
+
+# Adds X-Query-Count to every response for the load benchmarks, see
+# benchmarks/load.py. Keep it off in production.
+QUERY_COUNT_HEADER = env.bool("QUERY_COUNT_HEADER", default=False)
+
+# Enquiry emails go through the outbox drained by a Celery task, see
+# apps/enquiries/outbox.py. The SMTP backend is used directly, the task
+# already runs outside the request.
+ENQUIRY_EMAIL_BACKEND = env(
+    "ENQUIRY_EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend"
+)
+ENQUIRY_OUTBOX_BATCH_SIZE = 50
+ENQUIRY_OUTBOX_MAX_ATTEMPTS = 8
+# Seconds before the first retry of a failed email, doubled on every failure.
+ENQUIRY_OUTBOX_RETRY_DELAY = 30
+ENQUIRY_OUTBOX_MAX_RETRY_DELAY = 60 * 60
+# Seconds a worker holds the rows it is sending, longer than a batch takes.
+ENQUIRY_OUTBOX_LEASE = 60 * 5
+
+CELERY_BEAT_SCHEDULE = {
+    "flush-property-views": {
+        "task": "apps.properties.tasks.flush_property_views",
+        "schedule": 60.0,
+    },
+    "rank-top-agents": {
+        "task": "apps.profiles.tasks.rank_top_agents",
+        "schedule": 60.0 * 15,
+    },
+    # Picks up retries and enquiries whose task was lost.
+    "deliver-enquiries": {
+        "task": "apps.enquiries.tasks.deliver_enquiries",
+        "schedule": 60.0,
+    },
+}
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 import logging
 import logging.config
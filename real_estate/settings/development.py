@@ -19,8 +19,10 @@ DATABASES = {
         "PASSWORD": env("POSTGRES_PASSWORD"),
         "HOST": env("POSTGRES_HOST"),
         "PORT": env("POSTGRES_PORT"),
+        "CONN_MAX_AGE": env.int("CONN_MAX_AGE", default=60),
     }
 }
+DATABASES.update(replica_databases(DATABASES["default"]))
 
 
 # Email configuration
@@ -0,0 +1,257 @@
+import time
+
+import pytest
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.common import db_router
+from apps.common.db_router import (
+    PIN_COOKIE,
+    PrimaryReplicaRouter,
+    ReplicaMiddleware,
+    read_state,
+    replica_lag,
+)
+from apps.properties import cache
+from apps.properties.models import Property
+from apps.properties.views import PropertySearchAPIView
+
+router = PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    """Two replicas whose lag the test sets, None meaning unreachable"""
+    lags = {"replica_0": 0.0, "replica_1": 0.0}
+    monkeypatch.setattr(db_router, "replica_aliases", lambda: list(lags))
+    monkeypatch.setattr(db_router, "replica_lag", lags.get)
+    return lags
+
+
+def test_reads_outside_requests_use_the_primary(replicas):
+    """Test tasks and commands never read from a replica"""
+    assert router.db_for_read(Property) == DEFAULT_DB_ALIAS
+    with read_state(use_replicas=False):
+        assert router.db_for_read(Property) == DEFAULT_DB_ALIAS
+
+
+def test_safe_request_sticks_to_one_replica(replicas):
+    """Test the reads of a request all go to the same replica"""
+    with read_state(use_replicas=True):
+        chosen = {router.db_for_read(Property) for _ in range(20)}
+    assert len(chosen) == 1 and chosen <= set(replicas)
+
+
+def test_lagging_and_unreachable_replicas_are_skipped(replicas, settings):
+    """Test only replicas within REPLICA_MAX_LAG are read from"""
+    replicas.update(replica_0=settings.REPLICA_MAX_LAG + 1, replica_1=None)
+    with read_state(use_replicas=True):
+        assert router.db_for_read(Property) == DEFAULT_DB_ALIAS
+    replicas["replica_1"] = settings.REPLICA_MAX_LAG
+    with read_state(use_replicas=True):
+        assert router.db_for_read(Property) == "replica_1"
+
+
+def test_writes_pin_the_request_to_the_primary(replicas):
+    """Test reads after a write see it"""
+    with read_state(use_replicas=True) as state:
+        assert router.db_for_read(Property) in replicas
+        assert router.db_for_write(Property) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(Property) == DEFAULT_DB_ALIAS
+    assert state.wrote
+
+
+def test_migrations_only_run_on_the_primary():
+    """Test replicas are left to replication"""
+    assert router.allow_migrate(DEFAULT_DB_ALIAS, "properties")
+    assert not router.allow_migrate("replica_0", "properties")
+
+
+@pytest.mark.django_db
+def test_replica_lag_is_checked_once_per_interval(monkeypatch):
+    """Test the lag query is not run on every request"""
+    monkeypatch.setattr(db_router, "_lag_checks", {})
+    # The primary itself reports no lag.
+    assert replica_lag(DEFAULT_DB_ALIAS) == 0
+    with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+        assert replica_lag(DEFAULT_DB_ALIAS) == 0
+    assert len(queries) == 0
+
+
+def call_middleware(request, view, write=False):
+    states = []
+
+    def get_response(request):
+        middleware.process_view(request, view, (), {})
+        states.append(router.db_for_read(Property))
+        if write:
+            router.db_for_write(Property)
+        return HttpResponse()
+
+    middleware = ReplicaMiddleware(get_response)
+    return middleware(request), states[0]
+
+
+def test_middleware_enables_replicas_for_safe_requests(replicas):
+    """Test GETs and replica_reads views read from replicas, other POSTs not"""
+    factory = RequestFactory()
+    search = PropertySearchAPIView.as_view()
+    list_view = lambda request: None  # noqa: E731
+    assert call_middleware(factory.get("/"), list_view)[1] in replicas
+    assert call_middleware(factory.post("/"), search)[1] in replicas
+    assert call_middleware(factory.post("/"), list_view)[1] == DEFAULT_DB_ALIAS
+
+
+def test_middleware_pins_clients_after_a_write(replicas):
+    """Test a write sets the cookie that keeps the next requests on the primary"""
+    factory = RequestFactory()
+    view = lambda request: None  # noqa: E731
+    response, _ = call_middleware(factory.get("/"), view, write=True)
+    cookie = response.cookies[PIN_COOKIE]
+    assert cookie["max-age"] == settings.REPLICA_PIN_SECONDS
+
+    request = factory.get("/")
+    request.COOKIES[PIN_COOKIE] = cookie.value
+    response, alias = call_middleware(request, view)
+    assert alias == DEFAULT_DB_ALIAS
+    assert PIN_COOKIE not in response.cookies
+
+
+def read_through_cache(**state):
+    """Cache the alias a list read would use, returns (alias, hit)"""
+    with read_state(**state):
+        return cache.cached_response_data(
+            "test", {}, lambda: router.db_for_read(Property)
+        )
+
+
+def test_cache_misses_are_filled_from_the_primary(replicas):
+    """Test shared responses are built from the primary, then served cached"""
+    assert read_through_cache(use_replicas=True) == (DEFAULT_DB_ALIAS, False)
+    assert read_through_cache(use_replicas=True) == (DEFAULT_DB_ALIAS, True)
+    with read_state(use_replicas=True):
+        cache.cached_response_data("test", {}, lambda: None)
+        assert router.db_for_read(Property) in replicas
+
+
+def test_pinned_requests_skip_the_cache(replicas):
+    """Test a client that just wrote never reads an entry stored by others"""
+    read_through_cache(use_replicas=False)
+    assert read_through_cache(use_replicas=True, pinned=True) == (
+        DEFAULT_DB_ALIAS,
+        False,
+    )
+
+
+@pytest.fixture
+def replica(transactional_db, monkeypatch):
+    """
+    The first POSTGRES_REPLICAS replica, serving the test database streamed
+    from the primary
+    """
+    connection = connections["replica_0"]
+    mirror = connection.settings_dict
+    connection.close()
+    connection.settings_dict = {
+        **settings.DATABASES["replica_0"],
+        "NAME": connections[DEFAULT_DB_ALIAS].settings_dict["NAME"],
+    }
+    monkeypatch.setattr(db_router, "_lag_checks", {})
+    yield connection
+    connection.close()
+    connection.settings_dict = mirror
+
+
+def wait_for_replica(connection, pkid, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not Property.objects.using(connection.alias).filter(pkid=pkid).exists():
+        assert time.monotonic() < deadline, "The replica did not catch up"
+        time.sleep(0.05)
+
+
+@pytest.mark.skipif(
+    "replica_0" not in settings.DATABASES,
+    reason="Needs POSTGRES_REPLICAS, see make test-replica",
+)
+@pytest.mark.django_db(transaction=True, databases=list(settings.DATABASES))
+def test_reads_go_to_a_streaming_replica(replica, api_client, base_user):
+    """Test against a real replica: details read from it unless pinned"""
+    api_client.force_authenticate(user=base_user)
+    response = api_client.post(
+        reverse("property-create"),
+        {
+            "title": "sunny villa",
+            "country": "CM",
+            "city": "Douala",
+            "street_address": "1 Main Street",
+            "price": "150000.00",
+        },
+        format="json",
+    )
+    assert response.status_code == 201
+    assert PIN_COOKIE in response.cookies
+    created = response.data["id"]
+    pkid = Property.objects.get(id=created).pkid
+    wait_for_replica(replica, pkid)
+
+    url = reverse("property-details", args=[Property.objects.get(pkid=pkid).slug])
+
+    # Still pinned to the primary by the cookie.
+    with CaptureQueriesContext(replica) as queries:
+        response = api_client.get(url)
+    assert response.status_code == 200
+    assert len(queries) == 0
+
+    api_client.cookies.pop(PIN_COOKIE)
+    assert replica_lag(replica.alias) <= settings.REPLICA_MAX_LAG
+    with CaptureQueriesContext(replica) as queries:
+        response = api_client.get(url)
+    assert response.data["id"] == created
+    assert len(queries) > 0
+
+
+@pytest.mark.skipif(
+    "replica_0" not in settings.DATABASES,
+    reason="Needs POSTGRES_REPLICAS, see make test-replica",
+)
+@pytest.mark.django_db(transaction=True, databases=list(settings.DATABASES))
+def test_searches_after_a_write_are_cached_from_the_primary(
+    replica, api_client, base_user, property_factory, client
+):
+    """Test a search after a write caches the written rows, and then hits"""
+    listing = property_factory.create(user=base_user, title="Sunny villa")
+    wait_for_replica(replica, listing.pkid)
+    url = reverse("property-search")
+    api_client.force_authenticate(user=base_user)
+    response = api_client.put(
+        reverse("property-update", args=[listing.slug]),
+        {
+            "user": base_user.pkid,
+            "title": "renamed villa",
+            "country": "CM",
+            "city": "Douala",
+            "street_address": "1 Main Street",
+            "price": "150000.00",
+        },
+        format="json",
+    )
+    assert response.status_code == 200
+    assert PIN_COOKIE in response.cookies
+
+    # Whether or not the replica has replayed the update yet.
+    with CaptureQueriesContext(replica) as queries:
+        first = client.post(url, {}, content_type="application/json")
+        second = client.post(url, {}, content_type="application/json")
+    assert (first["X-Cache"], second["X-Cache"]) == ("MISS", "HIT")
+    assert len(queries) == 0
+    assert [row["title"] for row in second.json()] == ["Renamed Villa"]
+
+    with CaptureQueriesContext(replica) as queries:
+        response = api_client.post(url, {}, format="json")
+    assert len(queries) == 0
+    assert response["X-Cache"] == "MISS"
+    assert [row["title"] for row in response.data] == ["Renamed Villa"]
@@ -0,0 +1,90 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+
+from apps.common.synthetic import SyntheticDataGenerator
+from apps.enquiries.models import Enquiry
+from apps.profiles.models import Profile
+from apps.properties.models import Property
+from apps.ratings.models import Rating
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def generate(seed=1):
+    out = io.StringIO()
+    call_command(
+        "init_db",
+        300,
+        scale=True,
+        users=100,
+        seed=seed,
+        workers=1,
+        chunk_size=64,
+        stdout=out,
+    )
+    return out.getvalue()
+
+
+def snapshot():
+    return list(
+        Property.objects.order_by("pkid").values_list(
+            "title", "price", "city", "slug", "user__email"
+        )
+    )
+
+
+def test_scale_mode_generates_every_table():
+    """Test scale mode fills users, profiles, properties and enquiries"""
+    output = generate()
+    assert User.objects.count() == Profile.objects.count() == 100
+    assert Property.objects.count() == 300
+    assert Enquiry.objects.count() == 30
+    assert "rows/s" in output
+
+    agents = Profile.objects.filter(is_agent=True)
+    assert set(Property.objects.values_list("user__profile__is_agent", flat=True)) == {
+        True
+    }
+    assert not Rating.objects.filter(rater=F("agent__user")).exists()
+    for agent in agents.exclude(num_reviews=0):
+        assert agent.num_reviews == agent.agent_reviews.count()
+
+
+def test_scale_mode_shares_one_password_hash():
+    """Test users can log in with the password hashed once up front"""
+    generate()
+    assert User.objects.values("password").distinct().count() == 1
+    assert User.objects.first().check_password("password123")
+
+
+def test_scale_mode_is_deterministic():
+    """Test the same seed builds the same dataset"""
+    generate(seed=3)
+    first = snapshot()
+    Rating.objects.all().delete()
+    Property.objects.all().delete()
+    User.objects.all().delete()
+    generate(seed=3)
+    assert snapshot() == first
+
+
+def test_scale_mode_counts_only_inserted_ratings():
+    """Test ratings skipped as already present are not counted as rows"""
+    generate()
+    agents = list(
+        Profile.objects.filter(is_agent=True)
+        .order_by("pkid")
+        .values_list("pkid", "user_id")
+    )
+    raters = list(User.objects.order_by("pkid").values_list("pkid", flat=True))
+    generator = SyntheticDataGenerator(seed=1, chunk_size=64)
+    ratings = Rating.objects.count()
+    assert ratings > 0
+    assert generator.run("ratings", len(agents), 0, (agents, raters)) == 0
+    assert Rating.objects.count() == ratings
@@ -0,0 +1,18 @@
+import pytest
+from django.urls import reverse
+
+pytestmark = pytest.mark.django_db
+
+
+def test_query_count_header(api_client, settings, property_factory):
+    """Test responses report their query count when the setting is on"""
+    settings.QUERY_COUNT_HEADER = True
+    property_factory.create_batch(2)
+    response = api_client.get(reverse("agent-list"))
+    assert response["X-Query-Count"] == "1"
+
+
+def test_query_count_header_off_by_default(api_client):
+    """Test the header is left out unless enabled"""
+    response = api_client.get(reverse("agent-list"))
+    assert "X-Query-Count" not in response
@@ -0,0 +1,55 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from apps.common.renderers import ORJSONRenderer
+from apps.profiles.renderers import ProfileJSONRenderer
+
+
+def test_output_matches_drf():
+    """Test orjson renders the same bytes as DRF's JSONRenderer"""
+    data = {
+        "id": uuid.UUID("0a04cdaa-3411-452c-8e46-62f4479b4c38"),
+        "price": Decimal("150000.50"),
+        "created_at": datetime(2024, 5, 1, 8, 30, 15, 123456, tzinfo=timezone.utc),
+        "title": "Maison à Douala ",
+        "rows": ReturnDict({"bedrooms": 3, 1: None}, serializer=None),
+        "tags": ("garden", "pool"),
+    }
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_phone_numbers_are_rendered_as_text():
+    """Test phone numbers, which DRF's encoder rejects, become strings"""
+    data = {"phone_number": PhoneNumber.from_string("+237670181440")}
+    assert json.loads(ORJSONRenderer().render(data)) == {
+        "phone_number": "+237670181440"
+    }
+
+
+def test_indented_output_falls_back_to_drf():
+    """Test a requested indent is honoured"""
+    rendered = ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+    assert rendered == b'{\n    "a": 1\n}'
+
+
+def test_profile_envelope():
+    """Test profile responses keep the profile namespace"""
+    rendered = ProfileJSONRenderer().render([{"username": "agent"}])
+    assert json.loads(rendered) == {"profile": [{"username": "agent"}]}
+
+
+@pytest.mark.django_db
+def test_api_responses_use_orjson(api_client):
+    """Test the default renderer of the API is ORJSONRenderer"""
+    response = api_client.get(reverse("agent-list"))
+    assert isinstance(response.accepted_renderer, ProfileJSONRenderer)
+    response = api_client.get(reverse("property-cache-stats"))
+    assert isinstance(response.accepted_renderer, ORJSONRenderer)
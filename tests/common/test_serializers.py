@@ -0,0 +1,45 @@
+import pytest
+
+from apps.profiles.models import Profile
+from apps.profiles.serializers import LeaderboardSerializer, ProfileSerializer
+from apps.ratings.models import Rating
+
+pytestmark = pytest.mark.django_db
+
+
+def test_relations_are_inferred_from_the_fields():
+    """Test dotted sources are joined and nested lists prefetched"""
+    select_related, prefetch_related = ProfileSerializer.get_eager_loading()
+    assert select_related == ["user"]
+    [reviews] = prefetch_related
+    assert reviews.prefetch_to == "agent_reviews"
+    assert reviews.queryset.query.select_related == {
+        "rater": {},
+        "agent": {"user": {}},
+    }
+
+
+def test_serializers_without_nested_lists_only_join():
+    """Test the leaderboard entries, which leave the reviews out, prefetch nothing"""
+    assert LeaderboardSerializer.get_eager_loading() == (["user"], [])
+
+
+def test_profiles_serialize_in_constant_queries(
+    profile_factory, django_assert_num_queries
+):
+    """Test the reviews of many profiles cost one extra query"""
+    agents = profile_factory.create_batch(3, is_agent=True)
+    raters = [profile.user for profile in profile_factory.create_batch(2)]
+    for agent in agents:
+        for rater in raters:
+            Rating.objects.create_review(rater, agent, 5, "Great")
+
+    with django_assert_num_queries(2):
+        queryset = ProfileSerializer.setup_eager_loading(
+            Profile.objects.filter(is_agent=True)
+        )
+        data = ProfileSerializer(queryset, many=True).data
+    assert {review["rater"] for review in data[0]["reviews"]} == {
+        rater.username for rater in raters
+    }
+    assert data[0]["reviews"][0]["agent"] == data[0]["username"]
@@ -0,0 +1,99 @@
+import pytest
+import redis
+from django.urls import reverse
+
+from apps.common import throttling
+from apps.common.throttling import take_token
+
+pytestmark = pytest.mark.django_db
+
+SEARCH_URL = reverse("property-search")
+ENQUIRY_URL = reverse("send_enquiry_email")
+
+
+@pytest.fixture(autouse=True)
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            "search": "3/min",
+            "search.user": "5/min",
+            "enquiry": "1/hour",
+        },
+    }
+
+
+def search(client, address="10.0.0.1"):
+    return client.post(SEARCH_URL, {}, format="json", REMOTE_ADDR=address)
+
+
+def test_bucket_empties_then_rejects_with_retry_after(api_client):
+    """Test a client gets its burst and then 429 with Retry-After"""
+    assert [search(api_client).status_code for _ in range(3)] == [200] * 3
+    response = search(api_client)
+    assert response.status_code == 429
+    # One token of a 3/min bucket refills in 20 seconds.
+    assert response["Retry-After"] == "20"
+
+
+def test_buckets_are_per_client(api_client, base_user):
+    """Test each address and user has its own bucket and users get their rate"""
+    assert [search(api_client).status_code for _ in range(4)][-1] == 429
+    assert search(api_client, address="10.0.0.2").status_code == 200
+
+    api_client.force_authenticate(user=base_user)
+    statuses = [search(api_client).status_code for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
+
+
+def test_spoofed_forwarded_for_does_not_reset_the_bucket(api_client):
+    """Test clients cannot get a fresh bucket by making up X-Forwarded-For"""
+    statuses = [
+        api_client.post(
+            SEARCH_URL,
+            {},
+            format="json",
+            REMOTE_ADDR="172.18.0.5",
+            # What nginx forwards: the client's header, then the real address.
+            HTTP_X_FORWARDED_FOR=f"203.0.113.{number}, 10.0.0.1",
+        ).status_code
+        for number in range(4)
+    ]
+    assert statuses == [200] * 3 + [429]
+
+
+def test_bucket_refills_over_time(redis_client):
+    """Test tokens come back at the configured rate, up to the capacity"""
+    key = "throttle:test:ip:10.0.0.1"
+    assert [take_token(key, 2, 0.5)[0] for _ in range(3)] == [True, True, False]
+    allowed, wait = take_token(key, 2, 0.5)
+    assert not allowed and 0 < wait <= 2
+    # Pretend the last request was a minute ago.
+    at = float(redis_client.hget(key, "at"))
+    redis_client.hset(key, "at", at - 60)
+    assert [take_token(key, 2, 0.5)[0] for _ in range(3)] == [True, True, False]
+
+
+def test_enquiries_are_throttled(api_client, monkeypatch):
+    """Test the enquiry endpoint has its own scope"""
+    monkeypatch.setattr("apps.enquiries.tasks.deliver_enquiries.delay", lambda: None)
+    payload = {
+        "name": "Jane Doe",
+        "phone_number": "+237670181440",
+        "email": "jane@example.com",
+        "subject": "Viewing",
+        "message": "Is the garden house still available?",
+    }
+    assert api_client.post(ENQUIRY_URL, payload, format="json").status_code == 202
+    assert api_client.post(ENQUIRY_URL, payload, format="json").status_code == 429
+    assert search(api_client).status_code == 200
+
+
+def test_requests_pass_when_redis_is_down(api_client, monkeypatch):
+    """Test throttling fails open instead of taking the API down with Redis"""
+
+    def unavailable(*args):
+        raise redis.ConnectionError("Connection refused")
+
+    monkeypatch.setattr(throttling, "take_token", unavailable)
+    assert [search(api_client).status_code for _ in range(5)] == [200] * 5
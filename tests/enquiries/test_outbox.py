@@ -0,0 +1,216 @@
+import smtplib
+import socketserver
+import threading
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.enquiries.models import Enquiry, EnquiryOutbox
+from apps.enquiries import outbox
+from apps.enquiries.outbox import drain_outbox
+from apps.enquiries.tasks import deliver_enquiries
+
+pytestmark = pytest.mark.django_db
+
+ENQUIRY_URL = reverse("send_enquiry_email")
+
+REFUSED_SENDER = "bounce@example.com"
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for Django's backend, refusing REFUSED_SENDER"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost ready")
+        while True:
+            line = self.rfile.readline().decode().rstrip("\r\n")
+            command = line[:4].upper()
+            if not line or command == "QUIT":
+                self.reply("221 bye")
+                return
+            if command in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif command == "MAIL":
+                if len(self.server.messages) == self.server.drop_after:
+                    # Hang up without a reply, like a dropped connection.
+                    return
+                sender = line.split(":", 1)[1].strip("<> ")
+                if sender == REFUSED_SENDER:
+                    self.reply("451 try again later")
+                else:
+                    self.reply("250 ok")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                data = []
+                for line in iter(self.rfile.readline, b".\r\n"):
+                    data.append(line.decode())
+                self.server.messages.append("".join(data))
+                self.reply("250 queued")
+            else:
+                self.reply("250 ok")
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = []
+    server.drop_after = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = settings.EMAIL_HOST_PASSWORD = ""
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(deliver_enquiries, "delay", lambda: calls.append(True))
+    return calls
+
+
+def enquiry_payload(**overrides):
+    return {
+        "name": "Jane Doe",
+        "phone_number": "+237670181440",
+        "email": "jane@example.com",
+        "subject": "Viewing",
+        "message": "Is the garden house still available?",
+        **overrides,
+    }
+
+
+def outbox_entries(count, **overrides):
+    return [
+        EnquiryOutbox.objects.create(
+            enquiry=Enquiry.objects.create(
+                **enquiry_payload(subject=f"Enquiry {number}", **overrides)
+            )
+        )
+        for number in range(count)
+    ]
+
+
+def test_enquiry_is_accepted_without_sending(
+    api_client, queued, smtp_server, django_capture_on_commit_callbacks
+):
+    """Test the endpoint writes the enquiry and its outbox row and returns 202"""
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(ENQUIRY_URL, enquiry_payload(), format="json")
+    assert response.status_code == 202
+    entry = EnquiryOutbox.objects.get()
+    assert entry.enquiry.email == "jane@example.com"
+    assert entry.status == EnquiryOutbox.StatusChoices.PENDING
+    assert queued == [True]
+    assert smtp_server.connections == 0
+
+
+def test_invalid_enquiry_is_rejected(api_client, queued):
+    """Test a payload missing fields writes nothing"""
+    response = api_client.post(ENQUIRY_URL, {"name": "Jane Doe"}, format="json")
+    assert response.status_code == 400
+    assert "email" in response.data
+    assert not Enquiry.objects.exists()
+    assert not EnquiryOutbox.objects.exists()
+
+
+def test_drain_sends_batches_over_one_connection(smtp_server):
+    """Test every due email is sent in batches through a single connection"""
+    outbox_entries(5)
+    assert drain_outbox(batch_size=2) == (5, 0)
+    assert smtp_server.connections == 1
+    assert len(smtp_server.messages) == 5
+    assert "Subject: Enquiry 0" in smtp_server.messages[0]
+    assert set(EnquiryOutbox.objects.values_list("status", flat=True)) == {"sent"}
+    assert drain_outbox() == (0, 0)
+
+
+def test_refused_email_is_retried_with_backoff(settings, smtp_server):
+    """Test a refused email is rescheduled further out each time, then dropped"""
+    settings.ENQUIRY_OUTBOX_MAX_ATTEMPTS = 3
+    [refused] = outbox_entries(1, email=REFUSED_SENDER)
+    outbox_entries(2)
+    started = timezone.now()
+    assert drain_outbox() == (2, 1)
+    assert smtp_server.connections == 1
+
+    refused.refresh_from_db()
+    assert refused.status == EnquiryOutbox.StatusChoices.PENDING
+    assert refused.attempts == 1
+    assert "451" in refused.last_error
+    first_delay = refused.next_attempt_at - started
+    assert first_delay >= timedelta(seconds=settings.ENQUIRY_OUTBOX_RETRY_DELAY)
+    # Not due yet.
+    assert drain_outbox() == (0, 0)
+
+    EnquiryOutbox.objects.update(next_attempt_at=timezone.now())
+    started = timezone.now()
+    assert drain_outbox() == (0, 1)
+    refused.refresh_from_db()
+    assert refused.next_attempt_at - started >= 2 * first_delay - timedelta(seconds=1)
+
+    EnquiryOutbox.objects.update(next_attempt_at=timezone.now())
+    assert drain_outbox() == (0, 1)
+    refused.refresh_from_db()
+    assert refused.status == EnquiryOutbox.StatusChoices.FAILED
+    assert refused.attempts == 3
+
+
+def test_unreachable_server_leaves_outbox_untouched(settings, smtp_server):
+    """Test nothing is claimed or counted as attempted while SMTP is down"""
+    outbox_entries(2)
+    smtp_server.shutdown()
+    smtp_server.server_close()
+    with pytest.raises(OSError):
+        drain_outbox()
+    assert list(EnquiryOutbox.objects.values_list("status", "attempts")) == [
+        ("pending", 0),
+        ("pending", 0),
+    ]
+
+
+def test_dropped_connection_stops_the_batch(smtp_server):
+    """Test a lost connection is raised for retry without charging unsent rows"""
+    outbox_entries(4)
+    smtp_server.drop_after = 2
+    with pytest.raises(smtplib.SMTPServerDisconnected) as error:
+        drain_outbox()
+    assert isinstance(error.value, deliver_enquiries.autoretry_for)
+    assert len(smtp_server.messages) == 2
+    rows = EnquiryOutbox.objects.order_by("enquiry__subject")
+    assert list(rows.values_list("status", "attempts")) == [
+        ("sent", 1),
+        ("sent", 1),
+        ("pending", 0),
+        ("pending", 0),
+    ]
+
+    smtp_server.drop_after = None
+    assert drain_outbox() == (2, 0)
+
+
+def test_emails_are_sent_from_leased_rows(smtp_server, monkeypatch):
+    """Test rows are leased before sending so other workers skip them"""
+    [entry] = outbox_entries(1)
+    send_message = outbox.enquiry_message
+    leased = []
+
+    def enquiry_message(enquiry, connection):
+        entry.refresh_from_db()
+        leased.append(entry.next_attempt_at > timezone.now())
+        return send_message(enquiry, connection)
+
+    monkeypatch.setattr(outbox, "enquiry_message", enquiry_message)
+    assert drain_outbox() == (1, 0)
+    assert leased == [True]
@@ -1,6 +1,7 @@
 from faker import Factory as FackerFactory
 import factory
 from apps.profiles.models import Profile
+from apps.properties.models import Property
 from django.db.models.signals import post_save
 from real_estate.settings.base import AUTH_USER_MODEL
 from django.contrib.auth import get_user_model
@@ -37,12 +38,12 @@ class UserFactory(factory.django.DjangoModelFactory):
 class ProfileFactory(factory.django.DjangoModelFactory):
     user = factory.SubFactory("tests.factories.UserFactory")
     phone_number = factory.LazyAttribute(lambda x: faker.phone_number())
-    about_me = factory.LazyAttribute(lambda x: faker.sentece(nb_words=5))
+    about_me = factory.LazyAttribute(lambda x: faker.sentence(nb_words=5))
     license = factory.LazyAttribute(lambda x: faker.text(max_nb_chars=6))
     profile_photo = factory.LazyAttribute(
         lambda x: faker.file_extension(category="image")
     )
-    gegnder = factory.LazyAttribute(lambda x: f"other")
+    gender = "Other"
     country = factory.LazyAttribute(lambda x: faker.country_code())
     city = factory.LazyAttribute(lambda x: faker.city())
     is_buyer = False
@@ -54,3 +55,20 @@ class ProfileFactory(factory.django.DjangoModelFactory):
 
     class Meta:
         model = Profile
+
+
+class PropertyFactory(factory.django.DjangoModelFactory):
+    user = factory.SubFactory("tests.factories.UserFactory")
+    title = factory.LazyAttribute(lambda x: faker.sentence(nb_words=3))
+    description = factory.LazyAttribute(lambda x: faker.text(max_nb_chars=100))
+    city = factory.LazyAttribute(lambda x: faker.city())
+    street_address = factory.LazyAttribute(lambda x: faker.street_address())
+    price = factory.LazyAttribute(lambda x: faker.random_int(min=1000, max=900000))
+    bedrooms = 3
+    bathrooms = 2
+    advert_type = "For Sale"
+    property_type = "House"
+    published_status = True
+
+    class Meta:
+        model = Property
@@ -0,0 +1,118 @@
+import pytest
+import redis
+from django.urls import reverse
+
+from apps.common.db_router import PIN_COOKIE
+from apps.profiles import leaderboard, tasks
+from apps.profiles.leaderboard import rank_agents, rebuild_leaderboard
+from apps.profiles.models import Profile
+
+pytestmark = pytest.mark.django_db
+
+TOP_AGENTS_URL = reverse("top-agent-list")
+
+
+@pytest.fixture
+def make_agent(profile_factory, property_factory):
+    def make(rating_total=0, num_reviews=0, listings=0):
+        agent = profile_factory.create(
+            is_agent=True,
+            rating_total=rating_total,
+            num_reviews=num_reviews,
+            rating=rating_total / num_reviews if num_reviews else None,
+        )
+        property_factory.create_batch(listings, user=agent.user, published_status=True)
+        return agent
+
+    return make
+
+
+def results(response):
+    return response.json()["profile"]["results"]
+
+
+def test_few_reviews_are_pulled_towards_the_mean(make_agent):
+    """Test one perfect review ranks below a long record of good ones"""
+    lucky = make_agent(rating_total=5, num_reviews=1)
+    steady = make_agent(rating_total=180, num_reviews=40)
+    make_agent(rating_total=60, num_reviews=30)
+    ranked = rank_agents()
+    assert [agent.pkid for agent in ranked[:2]] == [steady.pkid, lucky.pkid]
+    assert [agent.rank for agent in ranked] == [1, 2, 3]
+
+
+def test_listings_break_equal_ratings(make_agent):
+    """Test more published listings rank an agent higher"""
+    quiet = make_agent(rating_total=40, num_reviews=10)
+    busy = make_agent(rating_total=40, num_reviews=10, listings=3)
+    ranked = rank_agents()
+    assert [agent.pkid for agent in ranked] == [busy.pkid, quiet.pkid]
+    assert ranked[0].listings == 3
+
+
+def test_rebuild_leaves_the_top_agent_flag_alone(make_agent):
+    """Test the admins' top_agent flags survive a rebuild"""
+    curated = make_agent(rating_total=10, num_reviews=5)
+    Profile.objects.filter(pkid=curated.pkid).update(top_agent=True)
+    make_agent(rating_total=25, num_reviews=5)
+    assert rebuild_leaderboard() == 2
+    assert list(
+        Profile.objects.filter(top_agent=True).values_list("pkid", flat=True)
+    ) == [curated.pkid]
+
+
+def test_leaderboard_is_served_from_redis(
+    api_client, make_agent, django_assert_num_queries
+):
+    """Test pages of the leaderboard are read without SQL"""
+    agents = [make_agent(rating_total=5 * n, num_reviews=5 * n) for n in range(1, 4)]
+    rebuild_leaderboard()
+    with django_assert_num_queries(0):
+        first = api_client.get(TOP_AGENTS_URL, {"page_size": 2})
+        second = api_client.get(TOP_AGENTS_URL, {"page_size": 2, "page": 2})
+    body = first.json()["profile"]
+    assert body["count"] == 3
+    assert body["previous"] is None and "page=2" in body["next"]
+    assert [entry["rank"] for entry in results(first)] == [1, 2]
+    assert results(first)[0]["id"] == str(agents[-1].id)
+    assert [entry["rank"] for entry in results(second)] == [3]
+    assert api_client.get(TOP_AGENTS_URL, {"page": 3}).status_code == 404
+
+
+def test_first_reads_rank_in_process_and_queue_one_rebuild(
+    api_client, make_agent, redis_client, monkeypatch, django_assert_num_queries
+):
+    """Test reads before the task ran write nothing and queue it once"""
+    queued = []
+    monkeypatch.setattr(tasks.rank_top_agents, "delay", lambda: queued.append(1))
+    make_agent(rating_total=8, num_reviews=2)
+    for _ in range(2):
+        with django_assert_num_queries(2):
+            response = api_client.get(TOP_AGENTS_URL)
+        assert response.status_code == 200
+        assert len(results(response)) == 1
+        assert PIN_COOKIE not in response.cookies
+    assert queued == [1]
+    assert not redis_client.exists(leaderboard.BUILT_AT_KEY)
+
+
+def test_rebuild_replaces_the_previous_ranking(api_client, make_agent):
+    """Test agents who left the leaderboard are not served any more"""
+    agent = make_agent(rating_total=8, num_reviews=2)
+    rebuild_leaderboard()
+    Profile.objects.filter(pkid=agent.pkid).update(is_agent=False)
+    rebuild_leaderboard()
+    assert results(api_client.get(TOP_AGENTS_URL)) == []
+
+
+def test_leaderboard_without_redis(api_client, make_agent, monkeypatch):
+    """Test the agents are ranked in process when Redis is down"""
+    make_agent(rating_total=8, num_reviews=2)
+
+    def unavailable(start, stop):
+        raise redis.ConnectionError
+
+    monkeypatch.setattr(leaderboard, "read_leaderboard", unavailable)
+    response = api_client.get(TOP_AGENTS_URL)
+    assert response.status_code == 200
+    assert [entry["rank"] for entry in results(response)] == [1]
@@ -0,0 +1,153 @@
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.db import connection, connections
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.common import aio
+from apps.properties.counters import PENDING_VIEWS_KEY
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def orm_threads(settings):
+    # Run ORM calls in the test's thread, inside its transaction.
+    settings.ASYNC_ORM_THREADS = 0
+
+
+@pytest.fixture
+def orm_pool(settings, monkeypatch):
+    """Two ORM threads, whose connections are closed after the test"""
+    settings.ASYNC_ORM_THREADS = 2
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(aio, "_executor", executor)
+    yield executor
+    # One call per thread, or the test database could not be dropped.
+    barrier = threading.Barrier(2)
+
+    def close():
+        barrier.wait()
+        connections.close_all()
+
+    for future in [executor.submit(close) for _ in range(2)]:
+        future.result()
+    executor.shutdown()
+
+
+@pytest.fixture
+def jwt_client(api_client, base_user):
+    token = AccessToken.for_user(base_user)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return api_client
+
+
+def test_list_matches_sync_view(jwt_client, base_user, property_factory):
+    """Test the async list returns the sync list's page, cached the same way"""
+    property_factory.create_batch(3, user=base_user)
+    expected = jwt_client.get(reverse("properties"), {"cursor": ""}).json()
+    response = jwt_client.get(reverse("async-properties"), {"cursor": ""})
+    assert response.status_code == 200
+    assert response.json() == expected
+    # The sync view filled the cache the async one read from.
+    assert response["X-Cache"] == "HIT"
+
+
+def test_list_needs_authentication(api_client):
+    """Test anonymous clients get a 401 with the JWT challenge"""
+    response = api_client.get(reverse("async-properties"))
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"].startswith("Bearer")
+
+
+def test_detail_matches_sync_view(jwt_client, property_factory, redis_client):
+    """Test the async detail serializes the same way and counts the view"""
+    new_property = property_factory.create()
+    response = jwt_client.get(
+        reverse("async-property-details", args=[new_property.slug])
+    )
+    assert response.status_code == 200
+    expected = jwt_client.get(reverse("property-details", args=[new_property.slug]))
+    assert response.json() == expected.json()
+    assert redis_client.hget(PENDING_VIEWS_KEY, new_property.pkid) == b"1"
+
+
+def test_detail_of_missing_property(jwt_client, api_client):
+    """Test unknown slugs are a 404, unless the client is not authenticated"""
+    url = reverse("async-property-details", args=["missing"])
+    response = jwt_client.get(url)
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Property not found."}
+    api_client.credentials()
+    assert api_client.get(url).status_code == 401
+
+
+def test_search_matches_sync_view(api_client, property_factory, search_payload):
+    """Test the async search returns the sync search's rows"""
+    property_factory.create_batch(3)
+    url = reverse("async-property-search")
+    response = api_client.post(url, search_payload(), format="json")
+    assert response.status_code == 200
+    assert response["X-Cache"] == "MISS"
+    expected = api_client.post(
+        reverse("property-search"), search_payload(), format="json"
+    )
+    assert response.json() == expected.json()
+    assert api_client.post(url, search_payload(), format="json")["X-Cache"] == "HIT"
+
+
+def test_search_errors(api_client, settings, search_payload):
+    """Test validation errors, throttling and methods are answered like DRF"""
+    url = reverse("async-property-search")
+    response = api_client.post(url, {"ordering": "distance"}, format="json")
+    assert response.status_code == 400
+    assert "ordering" in response.json()
+    assert api_client.get(url).status_code == 405
+
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"search": "1/min"},
+    }
+    assert api_client.post(url, search_payload(), format="json").status_code == 200
+    response = api_client.post(url, search_payload(), format="json")
+    assert response.status_code == 429
+    assert response["Retry-After"] == "60"
+
+
+def test_served_by_the_async_handler(base_user, property_factory):
+    """Test the views run through ASGI with every middleware in async mode"""
+    new_property = property_factory.create()
+    url = reverse("async-property-details", args=[new_property.slug])
+
+    async def get():
+        token = AccessToken.for_user(base_user)
+        return await AsyncClient().get(url, authorization=f"Bearer {token}")
+
+    response = async_to_sync(get)()
+    assert response.status_code == 200
+    assert response.json()["slug"] == new_property.slug
+
+
+@pytest.mark.django_db(transaction=True)
+def test_orm_calls_run_in_the_thread_pool(orm_pool, jwt_client, property_factory):
+    """Test the views work with ORM calls in the pool's own connections"""
+    new_property = property_factory.create()
+    url = reverse("async-property-details", args=[new_property.slug])
+    assert [jwt_client.get(url).status_code for _ in range(3)] == [200] * 3
+
+
+def backend_pid():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pool_threads_keep_their_connection(orm_pool):
+    """Test orm() calls reuse the thread's connection within CONN_MAX_AGE"""
+    pids = {async_to_sync(aio.orm(backend_pid))() for _ in range(6)}
+    assert len(pids) <= 2
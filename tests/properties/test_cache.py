@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = pytest.mark.django_db
+
+SEARCH_URL = reverse("property-search")
+
+
+def test_repeated_search_is_served_from_cache(
+    api_client, property_factory, search_payload
+):
+    """Test the second identical search does not touch the database"""
+    property_factory.create_batch(2)
+    first = api_client.post(SEARCH_URL, search_payload(), format="json")
+    with CaptureQueriesContext(connection) as context:
+        second = api_client.post(SEARCH_URL, search_payload(), format="json")
+    assert (first["X-Cache"], second["X-Cache"]) == ("MISS", "HIT")
+    assert len(context) == 0
+    assert second.content == first.content
+
+
+def test_search_cache_key_is_normalized(api_client, property_factory, search_payload):
+    """Test differently cased or spaced equivalent searches share an entry"""
+    property_factory.create(title="Lake house")
+    api_client.post(SEARCH_URL, search_payload(catch_phrase="lake"), format="json")
+    response = api_client.post(
+        SEARCH_URL,
+        search_payload(advert_type="for sale", catch_phrase="  LAKE "),
+        format="json",
+    )
+    assert response["X-Cache"] == "HIT"
+
+
+@pytest.mark.parametrize("field", ["advert_type", "property_type", "catch_phrase"])
+def test_missing_filters_do_not_share_the_none_entry(
+    api_client, property_factory, field, search_payload
+):
+    """Test a search for "None" does not serve the unfiltered results"""
+    property_factory.create()
+    payload = search_payload()
+    payload.pop(field)
+    assert len(api_client.post(SEARCH_URL, payload, format="json").data) == 1
+    response = api_client.post(SEARCH_URL, {**payload, field: "None"}, format="json")
+    assert response["X-Cache"] == "MISS"
+    assert response.data == []
+
+
+def test_saving_a_property_invalidates_the_cache(
+    api_client, property_factory, django_capture_on_commit_callbacks, search_payload
+):
+    """Test a property change is visible on the next search"""
+    property_factory.create()
+    api_client.post(SEARCH_URL, search_payload(), format="json")
+    with django_capture_on_commit_callbacks(execute=True):
+        property_factory.create()
+    response = api_client.post(SEARCH_URL, search_payload(), format="json")
+    assert response["X-Cache"] == "MISS"
+    assert len(response.data) == 2
+
+
+def test_deleting_a_property_invalidates_the_cache(
+    api_client, property_factory, django_capture_on_commit_callbacks, search_payload
+):
+    """Test a deleted property disappears from the next search"""
+    new_property = property_factory.create()
+    api_client.post(SEARCH_URL, search_payload(), format="json")
+    with django_capture_on_commit_callbacks(execute=True):
+        new_property.delete()
+    response = api_client.post(SEARCH_URL, search_payload(), format="json")
+    assert response.data == []
+
+
+def test_listing_cache_is_per_user(api_client, property_factory, user_factory):
+    """Test agents never see another agent's cached listing"""
+    first, second = user_factory.create_batch(2)
+    property_factory.create(user=first)
+    url = reverse("agents-properties")
+    api_client.force_authenticate(user=first)
+    assert api_client.get(url).data["count"] == 1
+    api_client.force_authenticate(user=second)
+    response = api_client.get(url)
+    assert response["X-Cache"] == "MISS"
+    assert response.data["count"] == 0
+
+
+def test_cache_stats(api_client, property_factory, super_user, search_payload):
+    """Test the stats endpoint reports hits and misses per namespace"""
+    for _ in range(3):
+        api_client.post(SEARCH_URL, search_payload(), format="json")
+    api_client.force_authenticate(user=super_user)
+    response = api_client.get(reverse("property-cache-stats"))
+    assert response.data["search"] == {"hits": 2, "misses": 1}
+
+
+def test_cache_stats_requires_staff(api_client, base_user):
+    api_client.force_authenticate(user=base_user)
+    response = api_client.get(reverse("property-cache-stats"))
+    assert response.status_code == 403
@@ -0,0 +1,101 @@
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from apps.common.renderers import ORJSONRenderer
+from apps.properties.compiled import CompiledPropertySerializer
+from apps.properties.geo import within_radius
+from apps.properties.models import Property
+from apps.properties.serializers import PropertySerializer
+
+pytestmark = pytest.mark.django_db
+
+LIST_URL = reverse("agents-properties")
+
+DOUALA = (4.0511, 9.7679)
+
+
+@pytest.fixture
+def properties(base_user, property_factory):
+    processed = property_factory.create(
+        user=base_user,
+        country="NG",
+        price=123456,
+        tax="0.15",
+        latitude=DOUALA[0],
+        longitude=DOUALA[1] + 0.01,
+        year_built=1999,
+    )
+    processed.image_variants = {
+        "cover_photo": {
+            "source": processed.cover_photo.name,
+            "thumbnail": {"jpeg": "photos/variants/house/thumbnail.jpg"},
+            "card": {"jpeg": "photos/variants/house/card.jpg"},
+            "full": {
+                "jpeg": "photos/variants/house/full.jpg",
+                "webp": "photos/variants/house/full.webp",
+            },
+        }
+    }
+    processed.save()
+    return [
+        processed,
+        property_factory.create(
+            user=base_user, photo_3="", latitude=DOUALA[0], longitude=DOUALA[1]
+        ),
+        property_factory.create(title="Villa   Bonapriso", price="99.9"),
+    ]
+
+
+def render(serializer):
+    return ORJSONRenderer().render(serializer.data)
+
+
+def assert_same_output(queryset, context=None):
+    context = context or {}
+    expected = PropertySerializer(queryset, many=True, context=context)
+    compiled = CompiledPropertySerializer(
+        CompiledPropertySerializer.project(queryset), many=True, context=context
+    )
+    assert render(compiled) == render(expected)
+    return compiled.data
+
+
+def test_compiled_output_matches_property_serializer(properties):
+    """Test the compiled rows render to the same bytes as PropertySerializer"""
+    data = assert_same_output(Property.objects.order_by("pkid"))
+    assert len(data) == 3
+    assert "distance" not in data[0]
+
+
+def test_compiled_output_matches_with_request(properties):
+    """Test file and variant URLs are absolute when there is a request"""
+    request = RequestFactory().get(LIST_URL)
+    data = assert_same_output(Property.objects.order_by("pkid"), {"request": request})
+    assert data[0]["cover_photo"].startswith("http://testserver/")
+
+
+def test_compiled_output_matches_with_distance(properties):
+    """Test the distance annotation is serialized when a radius search adds it"""
+    queryset = within_radius(Property.objects.all(), *DOUALA, 10).order_by("pkid")
+    data = assert_same_output(queryset)
+    assert [row["distance"] is not None for row in data] == [True, True]
+
+
+def test_project_reads_only_needed_columns():
+    """Test the projection leaves out columns no field reads"""
+    columns = CompiledPropertySerializer.columns(Property.objects.all())
+    assert "search_vector" not in columns
+    assert "distance" not in columns
+    assert {"pkid", "created_at", "user__username", "tax"} <= set(columns)
+
+
+def test_list_views_serve_compiled_rows(agent_client, base_user, properties):
+    """Test the cursor paginated list matches PropertySerializer page by page"""
+    expected = PropertySerializer(
+        Property.objects.filter(user=base_user).order_by("-created_at", "-pkid"),
+        many=True,
+        context={"request": RequestFactory().get(LIST_URL)},
+    ).data
+    first = agent_client.get(f"{LIST_URL}?cursor=").json()
+    assert first["results"] == list(expected)
@@ -0,0 +1,91 @@
+import pytest
+from django.urls import reverse
+
+from apps.properties.facets import PRICE_BUCKETS
+
+
+pytestmark = pytest.mark.django_db
+
+FACETS_URL = reverse("property-search-facets")
+
+
+@pytest.fixture
+def listings(property_factory):
+    property_factory.create(price=50000, bedrooms=1, bathrooms=1)
+    property_factory.create(price=150000, bedrooms=3, bathrooms=2)
+    property_factory.create(price=650000, bedrooms=5, bathrooms=4)
+    property_factory.create(price=250000, bedrooms=2, advert_type="For Rent")
+    property_factory.create(price=350000, property_type="Apartment")
+    property_factory.create(price=450000, published_status=False)
+
+
+def test_facets_count_every_bucket(api_client, listings, search_payload):
+    """Test the counts follow the search form's buckets"""
+    response = api_client.post(FACETS_URL, search_payload(), format="json")
+    assert response.status_code == 200
+    assert response.data["total"] == 3
+    assert list(response.data["price"]) == list(PRICE_BUCKETS)
+    assert response.data["price"]["Any"] == 3
+    assert response.data["price"]["$100,000+"] == 2
+    assert response.data["price"]["$600,000+"] == 1
+    assert response.data["bedrooms"]["3+"] == 2
+    assert response.data["bathrooms"]["4+"] == 1
+
+
+def test_facets_exclude_their_own_filter(api_client, listings, search_payload):
+    """Test a dimension's counts ignore its own selection but not the others"""
+    payload = {**search_payload(), "price": "$200,000+", "bedrooms": "4+"}
+    response = api_client.post(FACETS_URL, payload, format="json")
+    assert response.data["total"] == 1
+    # Other advert types are counted with the price and bedroom filters.
+    assert response.data["advert_type"]["For Sale"] == 1
+    assert response.data["advert_type"]["For Rent"] == 0
+    # Other price buckets keep the bedroom filter only.
+    assert response.data["price"]["Any"] == 1
+    assert response.data["bedrooms"]["0+"] == 1
+    assert response.data["bedrooms"]["2+"] == 1
+    assert response.data["property_type"]["Apartment"] == 0
+
+
+def test_facets_count_across_advert_and_property_types(
+    api_client, listings, search_payload
+):
+    """Test the type counts are not narrowed by the selected type"""
+    response = api_client.post(FACETS_URL, search_payload(), format="json")
+    assert response.data["advert_type"]["For Rent"] == 1
+    assert response.data["property_type"]["Apartment"] == 1
+    assert response.data["property_type"]["House"] == 3
+
+
+def test_facets_apply_the_catch_phrase(api_client, property_factory, search_payload):
+    """Test only rows matching the catch phrase are counted"""
+    property_factory.create(description="Sea view and a garden")
+    property_factory.create(description="Near the market")
+    response = api_client.post(FACETS_URL, search_payload("garden"), format="json")
+    assert response.data["total"] == 1
+
+
+def test_facets_are_cached(api_client, listings, search_payload):
+    """Test the same filters are served from the cache"""
+    first = api_client.post(FACETS_URL, search_payload(), format="json")
+    second = api_client.post(FACETS_URL, search_payload(), format="json")
+    assert first["X-Cache"] == "MISS"
+    assert second["X-Cache"] == "HIT"
+    assert second.data == first.data
+
+
+@pytest.mark.parametrize("url", [FACETS_URL, reverse("property-search")])
+def test_unknown_bucket_is_a_validation_error(api_client, url, search_payload):
+    """Test a bucket that is neither an option nor a number is a 400"""
+    payload = {**search_payload(), "price": "abc", "bedrooms": "9+"}
+    response = api_client.post(url, payload, format="json")
+    assert response.status_code == 400
+    assert "price" in response.json()
+
+
+def test_numeric_bucket_is_the_minimum(api_client, listings, search_payload):
+    """Test a number outside the options is used as the minimum"""
+    payload = {**search_payload(), "price": "600000"}
+    response = api_client.post(FACETS_URL, payload, format="json")
+    assert response.status_code == 200
+    assert response.data["total"] == 1
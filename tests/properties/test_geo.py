@@ -0,0 +1,146 @@
+import pytest
+from django.urls import reverse
+
+from apps.properties.geo import covering_cells, encode_geohash
+from apps.properties.models import Property
+
+
+pytestmark = pytest.mark.django_db
+
+LIST_URL = reverse("agents-properties")
+SEARCH_URL = reverse("property-search")
+
+# Douala, Buea (~50km away) and Yaoundé (~200km away).
+DOUALA = (4.0511, 9.7679)
+BUEA = (4.1560, 9.2632)
+YAOUNDE = (3.8480, 11.5021)
+
+
+@pytest.fixture
+def cities(base_user, property_factory):
+    return {
+        name: property_factory.create(
+            user=base_user, latitude=latitude, longitude=longitude
+        )
+        for name, (latitude, longitude) in [
+            ("douala", DOUALA),
+            ("buea", BUEA),
+            ("yaounde", YAOUNDE),
+        ]
+    }
+
+
+def test_encode_geohash():
+    """Test the geohash matches the reference encoding"""
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_covering_cells_contain_nearby_points():
+    """Test points inside the radius fall in one of the covering cells"""
+    cells = covering_cells(*DOUALA, 60)
+    assert any(encode_geohash(*BUEA).startswith(cell) for cell in cells)
+
+
+def test_save_maintains_geohash(property_factory):
+    """Test the geohash follows the coordinates and is cleared with them"""
+    new_property = property_factory.create(latitude=DOUALA[0], longitude=DOUALA[1])
+    assert new_property.geohash == encode_geohash(*DOUALA)
+
+    new_property = Property.objects.get(pkid=new_property.pkid)
+    new_property.latitude, new_property.longitude = BUEA
+    new_property.save()
+    new_property.refresh_from_db()
+    assert new_property.geohash == encode_geohash(*BUEA)
+
+    new_property.latitude = None
+    new_property.save()
+    new_property.refresh_from_db()
+    assert new_property.geohash == ""
+
+
+def test_radius_filter(agent_client, cities):
+    """Test the radius filter keeps rows within range and sorts by distance"""
+    response = agent_client.get(
+        LIST_URL, {"radius": "4.0511,9.7679,100", "ordering": "-distance"}
+    )
+    results = response.data["results"]
+    assert [row["id"] for row in results] == [
+        str(cities["buea"].id),
+        str(cities["douala"].id),
+    ]
+    assert 50 < results[0]["distance"] < 65
+    assert results[1]["distance"] < 0.01
+
+
+def test_distance_ordering_with_cursor_pages_by_number(agent_client, cities):
+    """Test a cursor request ordered by distance keeps that order across pages"""
+    params = {
+        "radius": "4.0511,9.7679,300",
+        "ordering": "distance",
+        "cursor": "",
+        "page_size": 2,
+    }
+    response = agent_client.get(LIST_URL, params)
+    first = [row["id"] for row in response.data["results"]]
+    assert first == [str(cities["douala"].id), str(cities["buea"].id)]
+    response = agent_client.get(response.data["next"])
+    assert [row["id"] for row in response.data["results"]] == [
+        str(cities["yaounde"].id)
+    ]
+
+
+def test_radius_filter_rejects_bad_values(agent_client, cities):
+    """Test a malformed radius is a validation error"""
+    response = agent_client.get(LIST_URL, {"radius": "4.05,9.77"})
+    assert response.status_code == 400
+    assert "radius" in response.data
+
+
+def test_distance_ordering_ignored_without_radius(agent_client, cities):
+    """Test ordering by distance is dropped when no distance is annotated"""
+    response = agent_client.get(LIST_URL, {"ordering": "distance"})
+    assert response.status_code == 200
+    assert "distance" not in response.data["results"][0]
+
+
+def test_bbox_filter(agent_client, cities):
+    """Test the bounding box filter keeps rows inside the box"""
+    response = agent_client.get(LIST_URL, {"bbox": "3.5,9,4.5,10"})
+    assert {row["id"] for row in response.data["results"]} == {
+        str(cities["douala"].id),
+        str(cities["buea"].id),
+    }
+
+
+def test_bbox_filter_across_antimeridian(agent_client, base_user, property_factory):
+    """Test a box with min longitude above max longitude wraps around"""
+    fiji = property_factory.create(user=base_user, latitude=-17.7, longitude=178.4)
+    samoa = property_factory.create(user=base_user, latitude=-13.8, longitude=-171.8)
+    property_factory.create(user=base_user, latitude=-18.1, longitude=140.0)
+    response = agent_client.get(LIST_URL, {"bbox": "-20,170,-10,-170"})
+    assert {row["id"] for row in response.data["results"]} == {
+        str(fiji.id),
+        str(samoa.id),
+    }
+
+
+def test_search_by_radius_sorted_by_distance(api_client, cities, search_payload):
+    """Test the search endpoint accepts a radius and sorts by distance"""
+    payload = {
+        **search_payload(),
+        "radius": f"{BUEA[0]},{BUEA[1]},300",
+        "ordering": "distance",
+    }
+    response = api_client.post(SEARCH_URL, payload, format="json")
+    assert [row["id"] for row in response.data] == [
+        str(cities["buea"].id),
+        str(cities["douala"].id),
+        str(cities["yaounde"].id),
+    ]
+
+
+def test_search_distance_ordering_needs_radius(api_client, cities, search_payload):
+    """Test sorting search results by distance without a radius is rejected"""
+    payload = {**search_payload(), "ordering": "distance"}
+    response = api_client.post(SEARCH_URL, payload, format="json")
+    assert response.status_code == 400
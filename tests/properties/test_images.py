@@ -0,0 +1,128 @@
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+
+from apps.properties.images import VARIANT_SIZES, available_formats, render_variants
+from apps.properties.models import Property
+from apps.properties.serializers import PropertySerializer
+from apps.properties.tasks import generate_image_variants
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+UPLOAD_URL = reverse("property-image-upload")
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        generate_image_variants, "delay", lambda *args: calls.append(args)
+    )
+    return calls
+
+
+def jpeg_upload(name="house.jpg", size=(2400, 1600)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "teal").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+def test_render_variants_fit_their_bounds():
+    """Test each size is re-encoded within its bounds in every format"""
+    source = default_storage.save("photos/house.jpg", jpeg_upload())
+    variants = render_variants(source)
+    assert variants["source"] == source
+    for size, (width, height) in VARIANT_SIZES.items():
+        assert set(variants[size]) == set(available_formats())
+        with default_storage.open(variants[size]["jpeg"]) as stream:
+            image = Image.open(stream)
+            assert image.format == "JPEG"
+            assert image.width <= width and image.height <= height
+            assert image.width / image.height == pytest.approx(1.5, rel=0.01)
+
+
+def test_render_variants_never_upscale():
+    """Test images smaller than a size keep their dimensions"""
+    source = default_storage.save("photos/small.jpg", jpeg_upload(size=(300, 200)))
+    variants = render_variants(source)
+    with default_storage.open(variants["full"]["jpeg"]) as stream:
+        assert Image.open(stream).size == (300, 200)
+
+
+def test_upload_queues_variants_on_commit(
+    api_client, base_user, property_factory, queued, django_capture_on_commit_callbacks
+):
+    """Test uploaded photos are saved and handed to the images worker"""
+    property = property_factory.create(user=base_user)
+    api_client.force_authenticate(user=base_user)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(
+            UPLOAD_URL,
+            {"property_id": str(property.id), "photo1": jpeg_upload()},
+            format="multipart",
+        )
+    assert response.status_code == 200
+    property.refresh_from_db()
+    assert property.photo_1.name.startswith("photos/sha256/")
+    assert queued == [(property.pkid, "photo_1", property.photo_1.name)]
+
+
+def test_upload_rejects_other_agents_properties(
+    api_client, user_factory, property_factory
+):
+    """Test only the owner can upload photos of a property"""
+    property = property_factory.create()
+    api_client.force_authenticate(user=user_factory.create())
+    response = api_client.post(
+        UPLOAD_URL,
+        {"property_id": str(property.id), "cover_photo": jpeg_upload()},
+        format="multipart",
+    )
+    assert response.status_code == 403
+
+
+def test_serializer_falls_back_to_original_until_processed(property_factory, queued):
+    """Test variant URLs point at the upload until the task has run"""
+    property = property_factory.create(photo_2=jpeg_upload())
+    original = property.photo_2.url
+    urls = PropertySerializer(property).data["image_variants"]["photo_2"]
+    assert urls["card"] == {"jpeg": original, "webp": original}
+
+    generate_image_variants(property.pkid, "photo_2", property.photo_2.name)
+    property.refresh_from_db()
+    urls = PropertySerializer(property).data["image_variants"]["photo_2"]
+    assert urls["card"]["jpeg"].endswith("/card.jpg")
+    assert urls["thumbnail"]["jpeg"].endswith("/thumbnail.jpg")
+    assert urls["card"]["webp"] != original
+
+
+def test_variants_of_replaced_photo_are_discarded(property_factory, queued):
+    """Test a task for a photo that was replaced since does not apply"""
+    property = property_factory.create(cover_photo=jpeg_upload("old.jpg"))
+    stale = property.cover_photo.name
+    property.cover_photo = jpeg_upload("new.jpg")
+    property.save()
+    assert generate_image_variants(property.pkid, "cover_photo", stale) == 0
+    property.refresh_from_db()
+    assert property.image_variants == {}
+
+
+def test_parallel_photo_tasks_merge(property_factory, queued):
+    """Test the variants of two photos are both kept"""
+    property = property_factory.create(photo_1=jpeg_upload(), photo_3=jpeg_upload())
+    generate_image_variants(property.pkid, "photo_1", property.photo_1.name)
+    generate_image_variants(property.pkid, "photo_3", property.photo_3.name)
+    assert set(Property.objects.get(pkid=property.pkid).image_variants) == {
+        "photo_1",
+        "photo_3",
+    }
+
+
+def test_default_images_are_not_processed(property_factory, queued):
+    """Test the sample images new properties start with are left alone"""
+    property_factory.create()
+    assert queued == []
@@ -0,0 +1,225 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.properties.geo import encode_geohash
+from apps.properties.importer import import_properties
+from apps.properties.models import Property, PropertyImportJob
+from apps.properties.tasks import run_property_import
+
+pytestmark = pytest.mark.django_db
+
+CSV_HEADER = (
+    "ref_code,title,description,street_address,price,bedrooms,latitude,longitude\n"
+)
+
+
+def csv_stream(*rows):
+    return io.BytesIO((CSV_HEADER + "".join(f"{row}\n" for row in rows)).encode())
+
+
+def test_import_csv_creates_properties(base_user):
+    """Test new rows get normalised titles, slugs, ref codes and geohashes"""
+    report = import_properties(
+        csv_stream(
+            ",sunny villa,a quiet place,1 Main St,150000,3,4.05,9.76",
+            "REF-OWN,city flat,near the market,2 Main St,90000,1,,",
+        ),
+        "csv",
+        base_user,
+    )
+    assert (report.total, report.created, report.failed) == (2, 2, 0)
+
+    villa = Property.objects.get(title="Sunny Villa")
+    assert villa.slug == "sunny-villa"
+    assert villa.ref_code.startswith("REF-")
+    assert villa.description == "A quiet place"
+    assert villa.geohash == encode_geohash(4.05, 9.76)
+    assert villa.user == base_user
+    assert villa.content_hash
+    villa.refresh_from_db(fields=["search_vector"])
+    assert "villa" in villa.search_vector
+    assert Property.objects.get(ref_code="REF-OWN").bedrooms == 1
+
+
+def test_import_reports_row_errors(base_user):
+    """Test invalid rows are reported by number and the rest imported"""
+    report = import_properties(
+        csv_stream(
+            ",good row,,1 Main St,100,2,,",
+            ",bad price,,1 Main St,lots,2,,",
+            ",bad latitude,,1 Main St,100,2,91,0",
+        ),
+        "csv",
+        base_user,
+    )
+    assert (report.created, report.failed) == (1, 2)
+    assert [error["row"] for error in report.errors] == [2, 3]
+    assert "price" in report.errors[0]["errors"]
+    assert "latitude" in report.errors[1]["errors"]
+
+
+def test_import_numbers_clashing_slugs(base_user, property_factory):
+    """Test reserved slugs avoid existing rows and each other"""
+    property_factory.create(title="Lake House")
+    import_properties(
+        csv_stream(",lake house,,1 Main St,1,1,,", ",lake house,,2 Main St,1,1,,"),
+        "csv",
+        base_user,
+        batch_size=10,
+    )
+    assert set(Property.objects.values_list("slug", flat=True)) == {
+        "lake-house",
+        "lake-house-2",
+        "lake-house-3",
+    }
+
+
+def test_reimport_skips_unchanged_and_updates_changed(base_user):
+    """Test re-imports upsert on ref_code using the content hash"""
+    rows = [",a,,1 Main St,1,1,,", "REF-A,house a,,1 Main St,100,2,,"]
+    import_properties(csv_stream(*rows), "csv", base_user)
+    slug = Property.objects.get(ref_code="REF-A").slug
+
+    report = import_properties(
+        csv_stream("REF-A,house a,,1 Main St,100,2,,"), "csv", base_user
+    )
+    assert (report.unchanged, report.updated, report.created) == (1, 0, 0)
+
+    report = import_properties(
+        csv_stream("REF-A,house a,,1 Main St,120,4,,"), "csv", base_user
+    )
+    assert report.updated == 1
+    updated = Property.objects.get(ref_code="REF-A")
+    assert (updated.price, updated.bedrooms, updated.slug) == (120, 4, slug)
+    assert Property.objects.count() == 2
+
+
+def test_reimport_after_row_by_row_fallback(base_user, property_factory, monkeypatch):
+    """Test rows saved one by one after an IntegrityError keep their identity"""
+    property_factory.create(title="Taken")
+    monkeypatch.setattr(
+        "apps.properties.importer.reserve_slugs",
+        lambda titles: ["taken" for title in titles],
+    )
+    rows = ["REF-A,house a,,1 Main St,100,2,,", ",house b,,2 Main St,50,1,,"]
+    report = import_properties(csv_stream(*rows), "csv", base_user)
+    assert (report.created, report.failed) == (2, 0)
+    assert Property.objects.filter(ref_code="REF-A").exists()
+
+    report = import_properties(csv_stream(*rows), "csv", base_user)
+    assert (report.unchanged, report.created, report.updated) == (2, 0, 0)
+    assert Property.objects.count() == 3
+
+
+def test_reimport_skips_duplicate_rows_without_ref_code(base_user):
+    """Test rows without a ref_code are matched on their content hash"""
+    rows = [",house b,,2 Main St,50,1,,", ",house b,,2 Main St,50,1,,"]
+    report = import_properties(csv_stream(*rows), "csv", base_user)
+    assert (report.created, report.unchanged) == (1, 1)
+    report = import_properties(
+        csv_stream(",house b,,2 Main St,51,1,,"), "csv", base_user
+    )
+    assert report.created == 1
+    assert Property.objects.count() == 2
+
+
+def test_reimport_rewrites_rows_edited_since(base_user):
+    """Test editing an imported row clears its hash so it is imported again"""
+    import_properties(csv_stream("REF-A,house a,,1 Main St,100,2,,"), "csv", base_user)
+    edited = Property.objects.get(ref_code="REF-A")
+    edited.price = 1
+    edited.save()
+    edited.refresh_from_db()
+    assert edited.content_hash == ""
+
+    report = import_properties(
+        csv_stream("REF-A,house a,,1 Main St,100,2,,"), "csv", base_user
+    )
+    assert report.updated == 1
+
+
+def test_import_rejects_other_agents_ref_codes(base_user, property_factory):
+    """Test a ref_code owned by another agent is an error, not an update"""
+    theirs = property_factory.create()
+    Property.objects.filter(pkid=theirs.pkid).update(ref_code="REF-THEIRS")
+    report = import_properties(
+        csv_stream("REF-THEIRS,house,,1 Main St,1,1,,"), "csv", base_user
+    )
+    assert report.failed == 1
+    assert "ref_code" in report.errors[0]["errors"]
+
+
+def test_import_ndjson_with_unparsable_line(base_user):
+    """Test NDJSON lines are imported and broken lines reported"""
+    stream = io.BytesIO(
+        b'{"title": "one", "street_address": "1 Main St"}\n'
+        b"not json\n"
+        b"\n"
+        b'{"title": "two", "street_address": "2 Main St", "price": "10.50"}\n'
+    )
+    report = import_properties(stream, "ndjson", base_user)
+    assert (report.created, report.failed) == (2, 1)
+    assert report.errors[0]["row"] == 2
+
+
+def test_import_command(tmp_path, base_user):
+    """Test the management command imports a file and prints the report"""
+    path = tmp_path / "listings.ndjson"
+    path.write_text(
+        "\n".join(
+            json.dumps({"title": f"home {n}", "street_address": "Main St"})
+            for n in range(5)
+        )
+    )
+    out = io.StringIO()
+    call_command("import_properties", str(path), user=base_user.email, stdout=out)
+    assert Property.objects.count() == 5
+    assert "5 created" in out.getvalue()
+
+
+def test_import_endpoint_runs_in_background(
+    api_client,
+    base_user,
+    settings,
+    tmp_path,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    """Test the upload is accepted, imported by the task and reported"""
+    settings.MEDIA_ROOT = tmp_path
+    queued = []
+    monkeypatch.setattr(run_property_import, "delay", queued.append)
+    api_client.force_authenticate(user=base_user)
+    upload = csv_stream(",sunny villa,,1 Main St,150000,3,,", ",bad,,,x,,,")
+    upload.name = "listings.csv"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(
+            reverse("property-import"), {"file": upload}, format="multipart"
+        )
+    assert response.status_code == 202
+    assert response.data["status"] == "pending"
+    job = PropertyImportJob.objects.get(id=response.data["id"])
+    assert queued == [job.pkid]
+
+    run_property_import(job.pkid)
+    response = api_client.get(response["Location"])
+    assert response.data["status"] == "done"
+    assert response.data["created_rows"] == 1
+    assert response.data["failed_rows"] == 1
+    assert response.data["errors"][0]["row"] == 2
+
+
+def test_import_endpoint_rejects_unknown_format(api_client, base_user):
+    """Test files that are not CSV or NDJSON are refused up front"""
+    api_client.force_authenticate(user=base_user)
+    upload = io.BytesIO(b"<xml/>")
+    upload.name = "listings.xml"
+    response = api_client.post(
+        reverse("property-import"), {"file": upload}, format="multipart"
+    )
+    assert response.status_code == 400
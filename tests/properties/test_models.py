@@ -0,0 +1,78 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.properties.models import Property
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def saved_property(property_factory):
+    new_property = property_factory.create(title="garden house", price=1000)
+    return Property.objects.get(pkid=new_property.pkid)
+
+
+def test_new_property_gets_title_slug_and_ref_code(property_factory):
+    """Test a new row is title-cased and gets a slug and reference code"""
+    new_property = property_factory.create(title="garden house")
+    assert new_property.title == "Garden House"
+    assert new_property.slug == "garden-house"
+    assert re.fullmatch(r"REF-[A-Z0-9]{10}", new_property.ref_code)
+
+
+def test_price_change_is_a_single_narrow_update(saved_property):
+    """Test saving a price change writes only that column and updated_at"""
+    slug, ref_code = saved_property.slug, saved_property.ref_code
+    saved_property.price = 2000
+    with CaptureQueriesContext(connection) as context:
+        saved_property.save()
+    assert len(context) == 1
+    sql = context[0]["sql"]
+    assert sql.startswith("UPDATE")
+    assert '"price"' in sql and '"updated_at"' in sql
+    assert '"slug"' not in sql and '"title"' not in sql
+    saved_property.refresh_from_db()
+    assert saved_property.price == 2000
+    assert (saved_property.slug, saved_property.ref_code) == (slug, ref_code)
+
+
+def test_update_fields_is_honored(saved_property):
+    """Test explicit update_fields skips the title, slug and ref_code work"""
+    saved_property.views = 10
+    saved_property.title = "not written"
+    with CaptureQueriesContext(connection) as context:
+        saved_property.save(update_fields=["views"])
+    assert len(context) == 1
+    saved_property.refresh_from_db()
+    assert saved_property.views == 10
+    assert saved_property.title == "Garden House"
+
+
+def test_unchanged_property_save_is_skipped(saved_property):
+    """Test saving a row with no changes issues no queries"""
+    with CaptureQueriesContext(connection) as context:
+        saved_property.save()
+    assert len(context) == 0
+
+
+def test_title_change_rebuilds_slug_and_ref_code(saved_property, property_factory):
+    """Test a new title regenerates the slug, keeping it unique"""
+    property_factory.create(title="lake house")
+    ref_code = saved_property.ref_code
+    saved_property.title = "lake house"
+    saved_property.save()
+    saved_property.refresh_from_db()
+    assert saved_property.title == "Lake House"
+    assert saved_property.slug == "lake-house-2"
+    assert saved_property.ref_code != ref_code
+
+
+def test_description_is_capitalized_when_changed(saved_property):
+    """Test a changed description is still capitalized"""
+    saved_property.description = "close to the lake"
+    saved_property.save()
+    saved_property.refresh_from_db()
+    assert saved_property.description == "Close to the lake"
@@ -0,0 +1,79 @@
+import pytest
+from django.urls import reverse
+
+pytestmark = pytest.mark.django_db
+
+LIST_URL = reverse("agents-properties")
+
+
+def walk(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.data)
+        url = response.data["next"]
+    return pages
+
+
+def test_keyset_pages_cover_every_row_once(agent_client, base_user, property_factory):
+    """Test following next links returns all rows newest first"""
+    created = property_factory.create_batch(7, user=base_user)
+    pages = walk(agent_client, f"{LIST_URL}?cursor=")
+    ids = [row["id"] for page in pages for row in page["results"]]
+    assert [len(page["results"]) for page in pages] == [3, 3, 1]
+    assert ids == [str(p.id) for p in reversed(created)]
+
+
+def test_keyset_previous_link_returns_previous_page(
+    agent_client, base_user, property_factory
+):
+    """Test the previous link of page two points back at page one"""
+    property_factory.create_batch(6, user=base_user)
+    first = agent_client.get(f"{LIST_URL}?cursor=").data
+    second = agent_client.get(first["next"]).data
+    assert first["previous"] is None
+    back = agent_client.get(second["previous"]).data
+    assert back["results"] == first["results"]
+    assert back["previous"] is None
+
+
+def test_keyset_ascending_ordering(agent_client, base_user, property_factory):
+    """Test ordering=created_at walks the rows oldest first"""
+    created = property_factory.create_batch(4, user=base_user)
+    pages = walk(agent_client, f"{LIST_URL}?cursor=&ordering=created_at")
+    ids = [row["id"] for page in pages for row in page["results"]]
+    assert ids == [str(p.id) for p in created]
+
+
+def test_keyset_applies_filters(agent_client, base_user, property_factory):
+    """Test the filterset still applies in cursor mode"""
+    property_factory.create_batch(2, user=base_user, advert_type="For Rent")
+    property_factory.create_batch(4, user=base_user, advert_type="For Sale")
+    pages = walk(agent_client, f"{LIST_URL}?cursor=&advert_type=for rent")
+    rows = [row for page in pages for row in page["results"]]
+    assert len(rows) == 2
+    assert {row["advert_type"] for row in rows} == {"For Rent"}
+
+
+def test_keyset_count_is_estimated(agent_client, base_user, property_factory):
+    """Test the count comes from the planner instead of COUNT(*)"""
+    property_factory.create_batch(2, user=base_user)
+    response = agent_client.get(f"{LIST_URL}?cursor=")
+    assert isinstance(response.data["count"], int)
+
+
+def test_invalid_cursor_returns_404(agent_client):
+    """Test a garbled cursor is rejected"""
+    response = agent_client.get(f"{LIST_URL}?cursor=not-a-cursor")
+    assert response.status_code == 404
+
+
+def test_page_number_pagination_without_cursor(
+    agent_client, base_user, property_factory
+):
+    """Test requests without a cursor keep the page number format"""
+    property_factory.create_batch(4, user=base_user)
+    response = agent_client.get(f"{LIST_URL}?page=2")
+    assert response.data["count"] == 4
+    assert len(response.data["results"]) == 1
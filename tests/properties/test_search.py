@@ -0,0 +1,121 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.properties.models import Property
+
+pytestmark = pytest.mark.django_db
+
+SEARCH_URL = reverse("property-search")
+
+
+def test_search_vector_is_maintained_on_insert(property_factory):
+    """Test the trigger fills in the search vector for new rows"""
+    new_property = property_factory.create(title="Sunny Villa")
+    new_property.refresh_from_db()
+    assert "sunni" in new_property.search_vector
+
+
+def test_search_matches_stemmed_words(api_client, property_factory, search_payload):
+    """Test the catch phrase matches other forms of the same word"""
+    match = property_factory.create(description="Large gardens and two pools")
+    property_factory.create(description="A flat in the city centre")
+    response = api_client.post(SEARCH_URL, search_payload("garden pool"), format="json")
+    assert [row["id"] for row in response.data] == [str(match.id)]
+
+
+def test_search_ranks_title_matches_first(api_client, property_factory, search_payload):
+    """Test a title match outranks a description match"""
+    in_description = property_factory.create(
+        title="Family home", description="Close to the lake"
+    )
+    in_title = property_factory.create(title="Lake house", description="Quiet road")
+    response = api_client.post(SEARCH_URL, search_payload("lake"), format="json")
+    assert [row["id"] for row in response.data] == [
+        str(in_title.id),
+        str(in_description.id),
+    ]
+
+
+def test_search_searches_city_and_street_address(
+    api_client, property_factory, search_payload
+):
+    """Test the location columns are part of the search vector"""
+    match = property_factory.create(city="Buea", street_address="12 Molyko Road")
+    property_factory.create(city="Limbe", street_address="3 Down Beach")
+    response = api_client.post(SEARCH_URL, search_payload("molyko"), format="json")
+    assert [row["id"] for row in response.data] == [str(match.id)]
+
+
+def test_search_with_empty_catch_phrase_returns_all_published(
+    api_client, property_factory, search_payload
+):
+    """Test an empty catch phrase does not filter the results"""
+    property_factory.create_batch(2)
+    property_factory.create(published_status=False)
+    response = api_client.post(SEARCH_URL, search_payload(), format="json")
+    assert len(response.data) == 2
+
+
+def test_rebuild_search_index(property_factory):
+    """Test the management command recomputes missing search vectors"""
+    property_factory.create_batch(3, title="Cosy cottage")
+    Property.objects.update(search_vector=None)
+    call_command("rebuild_search_index", batch_size=2)
+    assert not Property.objects.filter(search_vector=None).exists()
+    assert Property.objects.filter(search_vector="cottage").count() == 3
+
+
+def test_search_stream_json_matches_regular_response(
+    api_client, property_factory, search_payload
+):
+    """Test the streamed JSON array has the same rows as the regular response"""
+    property_factory.create_batch(3)
+    regular = api_client.post(SEARCH_URL, search_payload(), format="json")
+    streamed = api_client.post(
+        f"{SEARCH_URL}?stream=json", search_payload(), format="json"
+    )
+    assert streamed.streaming
+    body = b"".join(streamed.streaming_content)
+    assert json.loads(body) == json.loads(regular.content)
+
+
+def test_search_stream_ndjson(api_client, property_factory, search_payload):
+    """Test accepting NDJSON streams one property per line"""
+    property_factory.create_batch(3)
+    response = api_client.post(
+        SEARCH_URL,
+        search_payload(),
+        format="json",
+        HTTP_ACCEPT="application/x-ndjson",
+    )
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).splitlines()
+    assert len(lines) == 3
+    assert {"id", "title", "slug"} <= set(json.loads(lines[0]))
+
+
+def test_search_stream_buffers_rows(
+    api_client, property_factory, monkeypatch, search_payload
+):
+    """Test rows are sent in writes of STREAM_BUFFER_SIZE, not one by one"""
+    property_factory.create_batch(3)
+    url = f"{SEARCH_URL}?stream=ndjson"
+    response = api_client.post(url, search_payload(), format="json")
+    assert len(list(response.streaming_content)) == 1
+
+    monkeypatch.setattr("apps.properties.streaming.STREAM_BUFFER_SIZE", 1)
+    response = api_client.post(url, search_payload(), format="json")
+    chunks = list(response.streaming_content)
+    assert len(chunks) == 3
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+
+
+def test_search_stream_empty_result(api_client, search_payload):
+    """Test an empty result still streams a valid JSON array"""
+    response = api_client.post(
+        f"{SEARCH_URL}?stream=json", search_payload("nothing"), format="json"
+    )
+    assert json.loads(b"".join(response.streaming_content)) == []
@@ -0,0 +1,111 @@
+import hashlib
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.test import RequestFactory
+from django.urls import reverse
+from PIL import Image
+
+from apps.properties.images import render_variants
+from apps.properties.tasks import generate_image_variants
+from apps.properties.uploads import HashingUploadHandler, store_photo
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+UPLOAD_URL = reverse("property-image-upload")
+
+
+@pytest.fixture(autouse=True)
+def queued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        generate_image_variants, "delay", lambda *args: calls.append(args)
+    )
+    return calls
+
+
+def png_bytes(color="orange"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 30), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def stored_files(root):
+    return sorted(
+        str(path.relative_to(root)) for path in root.rglob("*") if path.is_file()
+    )
+
+
+def test_handler_hashes_while_streaming_to_disk():
+    """Test the handler writes a temporary file and records its sha256"""
+    content = png_bytes() * 50
+    handler = HashingUploadHandler(RequestFactory().post("/"))
+    handler.new_file("photo", "front.png", "image/png", len(content))
+    for start in range(0, len(content), handler.chunk_size):
+        handler.receive_data_chunk(content[start : start + handler.chunk_size], start)
+    upload = handler.file_complete(len(content))
+    assert isinstance(upload, TemporaryUploadedFile)
+    assert upload.sha256 == hashlib.sha256(content).hexdigest()
+
+
+def test_store_photo_uses_the_content_address(media_root):
+    """Test photos are named after their hash and the detected format"""
+    content = png_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+    name = store_photo(SimpleUploadedFile("photo.JPG", content))
+    assert name == f"photos/sha256/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    assert default_storage.open(name).read() == content
+
+
+def test_identical_uploads_are_stored_once(
+    api_client, base_user, property_factory, media_root
+):
+    """Test the same image uploaded to two properties is one file"""
+    first, second = property_factory.create_batch(2, user=base_user)
+    api_client.force_authenticate(user=base_user)
+    for property in (first, second):
+        response = api_client.post(
+            UPLOAD_URL,
+            {
+                "property_id": str(property.id),
+                "cover_photo": SimpleUploadedFile(f"{property.pkid}.png", png_bytes()),
+            },
+            format="multipart",
+        )
+        assert response.status_code == 200
+        property.refresh_from_db()
+    assert first.cover_photo.name == second.cover_photo.name
+    assert stored_files(media_root) == [first.cover_photo.name]
+
+
+def test_upload_rejects_files_that_are_not_images(
+    api_client, base_user, property_factory, media_root
+):
+    """Test a file Pillow cannot read is refused and not stored"""
+    property = property_factory.create(user=base_user)
+    api_client.force_authenticate(user=base_user)
+    response = api_client.post(
+        UPLOAD_URL,
+        {
+            "property_id": str(property.id),
+            "photo_2": SimpleUploadedFile("notes.jpg", b"not an image"),
+        },
+        format="multipart",
+    )
+    assert response.status_code == 400
+    assert "photo_2" in response.data
+    assert stored_files(media_root) == []
+
+
+def test_shared_photo_variants_are_rendered_once(monkeypatch):
+    """Test a second property with the same photo reuses its variants"""
+    source = store_photo(SimpleUploadedFile("front.png", png_bytes()))
+    variants = render_variants(source)
+    saves = []
+    monkeypatch.setattr(
+        default_storage, "save", lambda *args, **kwargs: saves.append(args)
+    )
+    assert render_variants(source) == variants
+    assert saves == []
@@ -0,0 +1,108 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.properties import cache
+from apps.properties.counters import (
+    FLUSH_LOCK_KEY,
+    FLUSHING_VIEWS_KEY,
+    PENDING_VIEWS_KEY,
+    flush_views,
+    record_view,
+)
+from apps.properties.models import Property
+from apps.properties.tasks import flush_property_views
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def viewer_client(api_client, base_user):
+    api_client.force_authenticate(user=base_user)
+    return api_client
+
+
+def test_detail_view_does_not_write(viewer_client, property_factory, redis_client):
+    """Test reading a property issues no INSERT or UPDATE"""
+    new_property = property_factory.create()
+    url = reverse("property-details", args=[new_property.slug])
+    with CaptureQueriesContext(connection) as context:
+        response = viewer_client.get(url, REMOTE_ADDR="10.0.0.1")
+    assert response.status_code == 200
+    assert all(query["sql"].startswith("SELECT") for query in context)
+    assert redis_client.hget(PENDING_VIEWS_KEY, new_property.pkid) == b"1"
+
+
+def test_repeat_views_from_one_ip_count_once(property_factory, redis_client):
+    """Test the same IP is only counted once per window"""
+    new_property = property_factory.create()
+    assert record_view(new_property.pkid, "10.0.0.1")
+    assert not record_view(new_property.pkid, "10.0.0.1")
+    assert record_view(new_property.pkid, "10.0.0.2")
+    assert redis_client.hget(PENDING_VIEWS_KEY, new_property.pkid) == b"2"
+
+
+def test_forwarded_for_header_is_used(viewer_client, property_factory, redis_client):
+    """Test the first X-Forwarded-For address identifies the viewer"""
+    new_property = property_factory.create()
+    url = reverse("property-details", args=[new_property.slug])
+    viewer_client.get(url, HTTP_X_FORWARDED_FOR="1.1.1.1, 10.0.0.1")
+    viewer_client.get(url, HTTP_X_FORWARDED_FOR="2.2.2.2, 10.0.0.1")
+    assert redis_client.hget(PENDING_VIEWS_KEY, new_property.pkid) == b"2"
+
+
+def test_flush_adds_buffered_views(property_factory, redis_client):
+    """Test flushing applies the counts in a single UPDATE"""
+    first, second = property_factory.create_batch(2, views=5)
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        record_view(first.pkid, ip)
+    record_view(second.pkid, "10.0.0.1")
+
+    with CaptureQueriesContext(connection) as context:
+        assert flush_property_views() == 4
+    assert len(context) == 1
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.views, second.views) == (8, 6)
+    assert not redis_client.exists(PENDING_VIEWS_KEY)
+    assert flush_views() == 0
+
+
+def test_flush_resumes_an_interrupted_batch(property_factory, redis_client):
+    """Test a batch left behind by a failed flush is written first"""
+    new_property = property_factory.create()
+    redis_client.hset(FLUSHING_VIEWS_KEY, new_property.pkid, 3)
+    record_view(new_property.pkid, "10.0.0.1")
+
+    assert flush_views() == 3
+    assert flush_views() == 1
+    new_property.refresh_from_db()
+    assert new_property.views == 4
+
+
+def test_flush_invalidates_cached_responses(property_factory, redis_client):
+    """Test cached lists are not served with the counts before a flush"""
+    new_property = property_factory.create()
+    flush_views()
+    version = redis_client.get(cache.VERSION_KEY)
+    record_view(new_property.pkid, "10.0.0.1")
+    assert flush_views() == 1
+    assert redis_client.get(cache.VERSION_KEY) != version
+
+
+def test_flush_outliving_its_lock_still_returns(
+    property_factory, redis_client, monkeypatch
+):
+    """Test a flush whose lock expired under it does not fail the task"""
+    new_property = property_factory.create()
+    record_view(new_property.pkid, "10.0.0.1")
+
+    def update(self, **kwargs):
+        redis_client.delete(FLUSH_LOCK_KEY)
+        return update_views(self, **kwargs)
+
+    update_views = type(Property.objects.all()).update
+    monkeypatch.setattr(type(Property.objects.all()), "update", update)
+    assert flush_views() == 1
@@ -0,0 +1,88 @@
+"""
+Per-endpoint SQL query budgets for the API test suite.
+
+Every named URL in ``apps/*/urls.py`` declares the most queries one call to it
+may issue. Tests wrap the call in the ``query_budget`` fixture, which records
+the SQL and fails the test when the endpoint goes over its budget, printing
+the statements that were repeated so N+1 regressions are easy to spot.
+Budgets are measured with ``force_authenticate``, so they do not include the
+authentication backend's own queries.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+QUERY_BUDGETS = {
+    # apps/profiles/urls.py
+    "get-profile": 1,
+    "update-profile": 2,
+    "agent-list": 1,
+    "top-agent-list": 0,
+    "profile-list": 2,
+    # apps/properties/urls.py
+    "properties": 2,
+    "agents-properties": 2,
+    "property-create": 3,
+    "property-details": 1,
+    "property-update": 5,
+    "property-delete": 4,
+    "property-image-upload": 2,
+    "property-search": 1,
+    "property-search-facets": 1,
+    "property-import": 1,
+    "property-import-status": 1,
+    "property-cache-stats": 0,
+    # The async views authenticate themselves, the JWT user lookup included.
+    "async-properties": 3,
+    "async-property-details": 2,
+    "async-property-search": 1,
+    # apps/ratings/urls.py
+    "create_agent_review": 5,
+    # apps/enquiries/urls.py
+    # The enquiry and its outbox row, inside a savepoint in tests.
+    "send_enquiry_email": 4,
+}
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(sql):
+    """Replace literal values so the same statement with new params groups up"""
+    return _LITERALS.sub("?", sql)
+
+
+def format_report(name, budget, queries):
+    repeated = Counter(normalize_sql(query["sql"]) for query in queries)
+    lines = [
+        f"{name!r} issued {len(queries)} queries, over its budget of {budget}.",
+    ]
+    offenders = [(sql, count) for sql, count in repeated.most_common() if count > 1]
+    if offenders:
+        lines.append("Repeated statements:")
+        lines.extend(f"  {count}x {sql}" for sql, count in offenders)
+    lines.append("All statements:")
+    lines.extend(
+        f"  {number}. {query['sql']}" for number, query in enumerate(queries, 1)
+    )
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def query_budget(db):
+    """Context manager asserting the block stays within the endpoint's budget"""
+
+    @contextmanager
+    def check(name):
+        budget = QUERY_BUDGETS[name]
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        if len(context.captured_queries) > budget:
+            pytest.fail(
+                format_report(name, budget, context.captured_queries), pytrace=False
+            )
+
+    return check
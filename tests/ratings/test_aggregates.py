@@ -0,0 +1,84 @@
+import io
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.profiles.models import Profile
+from apps.ratings.models import Rating
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def agent(profile_factory):
+    return profile_factory.create(
+        is_agent=True, num_reviews=0, rating_total=0, rating=None
+    )
+
+
+def review(api_client, rater, agent, rating):
+    api_client.force_authenticate(user=rater.user)
+    return api_client.post(
+        reverse("create_agent_review", args=[agent.id]),
+        {"rating": rating, "comment": "Helpful"},
+        format="json",
+    )
+
+
+def test_reviews_update_the_agent_aggregates(api_client, agent, profile_factory):
+    """Test every review is added to the count, total and average"""
+    for rating in (5, 4, 4):
+        assert (
+            review(api_client, profile_factory.create(), agent, rating).status_code
+            == 201
+        )
+    agent.refresh_from_db()
+    assert agent.num_reviews == 3
+    assert agent.rating_total == 13
+    assert agent.rating == Decimal("4.33")
+
+
+def test_a_rater_reviews_an_agent_once(api_client, agent, profile_factory):
+    """Test the second review of the same rater is refused"""
+    rater = profile_factory.create()
+    assert review(api_client, rater, agent, 5).status_code == 201
+    response = review(api_client, rater, agent, 1)
+    assert response.status_code == 400
+    assert response.data["error"] == "You have already reviewed this agent"
+    agent.refresh_from_db()
+    assert (agent.num_reviews, agent.rating_total) == (1, 5)
+
+
+def test_other_raters_can_review_a_reviewed_agent(api_client, agent, profile_factory):
+    """Test an agent reviewed by one user can still be reviewed by others"""
+    Rating.objects.create_review(profile_factory.create().user, agent, 2, "Slow")
+    assert review(api_client, profile_factory.create(), agent, 3).status_code == 201
+
+
+def test_reconcile_fixes_drifted_agents(agent, profile_factory):
+    """Test the command recomputes the aggregates from the reviews"""
+    for rating in (1, 2):
+        Rating.objects.create_review(profile_factory.create().user, agent, rating, "")
+    unreviewed = profile_factory.create(is_agent=True, num_reviews=7, rating=3)
+    Profile.objects.filter(pkid=agent.pkid).update(num_reviews=9, rating=5)
+
+    out = io.StringIO()
+    call_command("reconcile_agent_ratings", stdout=out)
+    assert "2 profiles" in out.getvalue()
+    agent.refresh_from_db()
+    unreviewed.refresh_from_db()
+    assert (agent.num_reviews, agent.rating_total, agent.rating) == (
+        2,
+        3,
+        Decimal("1.50"),
+    )
+    assert (unreviewed.num_reviews, unreviewed.rating_total, unreviewed.rating) == (
+        0,
+        0,
+        None,
+    )
+
+    call_command("reconcile_agent_ratings", stdout=out)
+    assert "0 profiles" in out.getvalue().splitlines()[-1]
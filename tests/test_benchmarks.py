@@ -0,0 +1,42 @@
+import json
+
+from benchmarks import renderers
+from benchmarks.load import compare, percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    """Test percentiles pick the nearest ranked sample"""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_summarize_counts_errors_and_queries():
+    """Test only successful responses count toward throughput"""
+    samples = [(0.010, 200, 2), (0.020, 200, 4), (0.030, 500, None)]
+    stats = summarize(samples, seconds=2)
+    assert stats["requests"] == 3
+    assert stats["errors"] == 1
+    assert stats["throughput"] == 1.0
+    assert stats["p50_ms"] == 20.0
+    assert stats["queries_per_request"] == 3
+
+
+def test_compare_prints_relative_change(tmp_path, capsys):
+    """Test comparing two runs shows each endpoint's change"""
+    for label, p50 in [("base", 10.0), ("head", 15.0)]:
+        (tmp_path / f"{label}.json").write_text(
+            json.dumps({"label": label, "endpoints": {"search": {"p50_ms": p50}}})
+        )
+    compare(tmp_path / "base.json", tmp_path / "head.json")
+    assert "15.0 (+50%)" in capsys.readouterr().out
+
+
+def test_renderer_benchmark_times_every_renderer(capsys):
+    """Test the renderer benchmark runs each renderer on each payload"""
+    renderers.main(["--rows", "5", "--repeat", "1"])
+    output = capsys.readouterr().out
+    assert "stdlib json" in output
+    assert output.count("orjson") == 3
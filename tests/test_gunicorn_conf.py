@@ -0,0 +1,23 @@
+import multiprocessing
+import runpy
+from pathlib import Path
+
+CONFIG = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+def test_workers_are_sized_from_the_cpus(monkeypatch):
+    """Test the defaults preload the app and recycle (2 x CPUs) + 1 workers"""
+    monkeypatch.setattr(multiprocessing, "cpu_count", lambda: 4)
+    config = runpy.run_path(str(CONFIG))
+    assert config["workers"] == 9
+    assert config["preload_app"] is True
+    assert config["max_requests"] > 0 and config["max_requests_jitter"] > 0
+    assert config["graceful_timeout"] > 0
+
+
+def test_settings_come_from_the_environment(monkeypatch):
+    """Test GUNICORN_* variables override the defaults"""
+    monkeypatch.setenv("GUNICORN_WORKERS", "2")
+    monkeypatch.setenv("GUNICORN_MAX_REQUESTS", "50")
+    config = runpy.run_path(str(CONFIG))
+    assert (config["workers"], config["max_requests"]) == (2, 50)
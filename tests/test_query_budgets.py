@@ -0,0 +1,341 @@
+import importlib
+import io
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.urls import URLPattern, reverse
+from PIL import Image
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.profiles.leaderboard import rebuild_leaderboard
+from apps.properties.models import PropertyImportJob
+from apps.ratings.models import Rating
+from tests.query_budget import QUERY_BUDGETS
+
+pytestmark = pytest.mark.django_db
+
+ROW_COUNT = 5
+# Upper bound on the serialized size of one agent in the agent list.
+AGENT_ENTRY_BYTES = 1024
+
+
+def app_url_names():
+    names = set()
+    for urls in Path(settings.BASE_DIR, "apps").glob("*/urls.py"):
+        module = importlib.import_module(f"apps.{urls.parent.name}.urls")
+        names.update(
+            pattern.name
+            for pattern in module.urlpatterns
+            if isinstance(pattern, URLPattern)
+        )
+    return names
+
+
+@pytest.fixture
+def agent(db, profile_factory):
+    return profile_factory.create(is_agent=True)
+
+
+@pytest.fixture
+def agent_client(api_client, agent):
+    api_client.force_authenticate(user=agent.user)
+    return api_client
+
+
+@pytest.fixture
+def agent_jwt_client(api_client, agent, settings):
+    # Async views authenticate on their own, and run the ORM in the test's
+    # thread so the queries are captured.
+    settings.ASYNC_ORM_THREADS = 0
+    token = AccessToken.for_user(agent.user)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return api_client
+
+
+@pytest.fixture
+def review(profile_factory):
+    """Review each profile by ROW_COUNT different raters"""
+
+    def create(profiles):
+        raters = [profile.user for profile in profile_factory.create_batch(ROW_COUNT)]
+        for profile in profiles:
+            for rater in raters:
+                Rating.objects.create_review(rater, profile, 4, "Helpful")
+
+    return create
+
+
+def property_payload(**overrides):
+    payload = {
+        "title": "garden house",
+        "description": "two bedrooms and a garden",
+        "country": "CM",
+        "city": "Buea",
+        "street_address": "12 Molyko Road",
+        "price": "150000.00",
+        "bedrooms": 2,
+        "bathrooms": 1,
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_every_endpoint_has_a_budget():
+    """Test each named URL in apps/*/urls.py declares a query budget"""
+    assert app_url_names() == set(QUERY_BUDGETS)
+
+
+def test_get_profile_budget(query_budget, agent_client, agent, review):
+    review([agent])
+    with query_budget("get-profile"):
+        response = agent_client.get(reverse("get-profile"))
+    assert response.status_code == 200
+
+
+def test_update_profile_budget(query_budget, agent_client, agent):
+    url = reverse("update-profile", args=[agent.user.username])
+    with query_budget("update-profile"):
+        response = agent_client.patch(url, {"city": "Limbe"}, format="json")
+    assert response.status_code == 200
+
+
+def test_agent_list_budget(query_budget, api_client, profile_factory, review):
+    review(profile_factory.create_batch(ROW_COUNT, is_agent=True))
+    with query_budget("agent-list"):
+        response = api_client.get(reverse("agent-list"))
+    assert response.status_code == 200
+    # Reviews are only served with a single profile, a list of every agent
+    # would grow with every review they ever got.
+    assert all("reviews" not in agent for agent in response.json()["profile"])
+    assert len(response.content) < ROW_COUNT * AGENT_ENTRY_BYTES
+
+
+def test_top_agent_list_budget(query_budget, api_client, profile_factory):
+    profile_factory.create_batch(ROW_COUNT, is_agent=True, top_agent=True)
+    rebuild_leaderboard()
+    with query_budget("top-agent-list"):
+        response = api_client.get(reverse("top-agent-list"))
+    assert response.status_code == 200
+
+
+def test_profile_list_budget(query_budget, api_client, profile_factory, review):
+    review(profile_factory.create_batch(ROW_COUNT))
+    with query_budget("profile-list"):
+        response = api_client.get(reverse("profile-list"), {"page_size": ROW_COUNT})
+    assert response.status_code == 200
+
+
+def test_properties_budget(query_budget, agent_client, agent, property_factory):
+    property_factory.create_batch(ROW_COUNT, user=agent.user)
+    with query_budget("properties"):
+        response = agent_client.get(reverse("properties"), {"page_size": ROW_COUNT})
+    assert response.status_code == 200
+
+
+def test_agents_properties_budget(query_budget, agent_client, agent, property_factory):
+    property_factory.create_batch(ROW_COUNT, user=agent.user)
+    with query_budget("agents-properties"):
+        response = agent_client.get(
+            reverse("agents-properties"), {"page_size": ROW_COUNT}
+        )
+    assert response.status_code == 200
+
+
+def test_agents_properties_cursor_budget(
+    query_budget, agent_client, agent, property_factory
+):
+    property_factory.create_batch(ROW_COUNT, user=agent.user)
+    with query_budget("agents-properties"):
+        response = agent_client.get(
+            reverse("agents-properties"), {"cursor": "", "page_size": ROW_COUNT}
+        )
+    assert response.status_code == 200
+
+
+def test_property_create_budget(query_budget, agent_client):
+    with query_budget("property-create"):
+        response = agent_client.post(
+            reverse("property-create"), property_payload(), format="json"
+        )
+    assert response.status_code == 201
+
+
+def test_property_details_budget(
+    query_budget, agent_client, property_factory, redis_client
+):
+    new_property = property_factory.create()
+    with query_budget("property-details"):
+        response = agent_client.get(
+            reverse("property-details", args=[new_property.slug])
+        )
+    assert response.status_code == 200
+
+
+def test_property_update_budget(query_budget, agent_client, agent, property_factory):
+    new_property = property_factory.create(user=agent.user)
+    with query_budget("property-update"):
+        response = agent_client.put(
+            reverse("property-update", args=[new_property.slug]),
+            property_payload(user=agent.user.pkid),
+            format="json",
+        )
+    assert response.status_code == 200
+
+
+def test_property_delete_budget(query_budget, agent_client, agent, property_factory):
+    new_property = property_factory.create(user=agent.user)
+    with query_budget("property-delete"):
+        response = agent_client.delete(
+            reverse("property-delete", args=[new_property.slug])
+        )
+    assert response.status_code == 200
+
+
+def test_property_image_upload_budget(
+    query_budget, agent_client, agent, property_factory, settings, tmp_path
+):
+    settings.MEDIA_ROOT = tmp_path
+    new_property = property_factory.create(user=agent.user)
+    upload = io.BytesIO()
+    Image.new("RGB", (64, 48)).save(upload, "JPEG")
+    upload.name = "front.jpg"
+    upload.seek(0)
+    with query_budget("property-image-upload"):
+        response = agent_client.post(
+            reverse("property-image-upload"),
+            {"property_id": str(new_property.id), "cover_photo": upload},
+            format="multipart",
+        )
+    assert response.status_code == 200
+
+
+def test_property_search_budget(query_budget, api_client, property_factory):
+    property_factory.create_batch(ROW_COUNT)
+    payload = {
+        "advert_type": "For Sale",
+        "property_type": "House",
+        "price": "Any",
+        "bedrooms": "0+",
+        "bathrooms": "0+",
+        "catch_phrase": "",
+    }
+    with query_budget("property-search"):
+        response = api_client.post(reverse("property-search"), payload, format="json")
+    assert response.status_code == 200
+    assert len(response.data) == ROW_COUNT
+
+
+def test_property_search_facets_budget(query_budget, api_client, property_factory):
+    property_factory.create_batch(ROW_COUNT)
+    payload = {
+        "advert_type": "For Sale",
+        "property_type": "House",
+        "price": "Any",
+        "bedrooms": "0+",
+        "bathrooms": "0+",
+        "catch_phrase": "",
+    }
+    with query_budget("property-search-facets"):
+        response = api_client.post(
+            reverse("property-search-facets"), payload, format="json"
+        )
+    assert response.status_code == 200
+    assert response.data["total"] == ROW_COUNT
+
+
+def test_create_agent_review_budget(query_budget, api_client, agent, profile_factory):
+    rater = profile_factory.create()
+    api_client.force_authenticate(user=rater.user)
+    with query_budget("create_agent_review"):
+        response = api_client.post(
+            reverse("create_agent_review", args=[agent.id]),
+            {"rating": 4, "comment": "Very helpful"},
+            format="json",
+        )
+    assert response.status_code == 201
+
+
+def test_send_enquiry_email_budget(query_budget, api_client):
+    payload = {
+        "name": "Jane Doe",
+        "phone_number": "+237670181440",
+        "email": "jane@example.com",
+        "subject": "Viewing",
+        "message": "Is the garden house still available?",
+    }
+    with query_budget("send_enquiry_email"):
+        response = api_client.post(
+            reverse("send_enquiry_email"), payload, format="json"
+        )
+    assert response.status_code == 202
+
+
+def test_property_import_budget(query_budget, agent_client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    upload = io.BytesIO(b"title,street_address\nSunny Villa,1 Main St\n")
+    upload.name = "listings.csv"
+    with query_budget("property-import"):
+        response = agent_client.post(
+            reverse("property-import"), {"file": upload}, format="multipart"
+        )
+    assert response.status_code == 202
+
+
+def test_property_import_status_budget(query_budget, agent_client, agent):
+    job = PropertyImportJob.objects.create(
+        user=agent.user, source="imports/listings.csv", format="csv"
+    )
+    with query_budget("property-import-status"):
+        response = agent_client.get(reverse("property-import-status", args=[job.id]))
+    assert response.status_code == 200
+
+
+def test_property_cache_stats_budget(query_budget, api_client, super_user):
+    api_client.force_authenticate(user=super_user)
+    with query_budget("property-cache-stats"):
+        response = api_client.get(reverse("property-cache-stats"))
+    assert response.status_code == 200
+
+
+def test_async_properties_budget(
+    query_budget, agent_jwt_client, agent, property_factory
+):
+    property_factory.create_batch(ROW_COUNT, user=agent.user)
+    with query_budget("async-properties"):
+        response = agent_jwt_client.get(
+            reverse("async-properties"), {"page_size": ROW_COUNT}
+        )
+    assert response.status_code == 200
+
+
+def test_async_property_details_budget(
+    query_budget, agent_jwt_client, property_factory, redis_client
+):
+    new_property = property_factory.create()
+    with query_budget("async-property-details"):
+        response = agent_jwt_client.get(
+            reverse("async-property-details", args=[new_property.slug])
+        )
+    assert response.status_code == 200
+
+
+def test_async_property_search_budget(
+    query_budget, api_client, property_factory, settings
+):
+    settings.ASYNC_ORM_THREADS = 0
+    property_factory.create_batch(ROW_COUNT)
+    payload = {
+        "advert_type": "For Sale",
+        "property_type": "House",
+        "price": "Any",
+        "bedrooms": "0+",
+        "bathrooms": "0+",
+        "catch_phrase": "",
+    }
+    with query_budget("async-property-search"):
+        response = api_client.post(
+            reverse("async-property-search"), payload, format="json"
+        )
+    assert response.status_code == 200
+    assert len(response.json()) == ROW_COUNT
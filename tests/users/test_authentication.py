@@ -0,0 +1,150 @@
+import pytest
+import redis
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.common import db_router
+from apps.common.db_router import read_state
+from apps.profiles.models import Profile
+from apps.ratings.models import Rating
+from apps.users import authentication
+from apps.users.authentication import CachedJWTAuthentication, user_cache_key
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user(profile):
+    return profile.user
+
+
+def authenticate(user):
+    token = AccessToken.for_user(user)
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+    return CachedJWTAuthentication().authenticate(request)[0]
+
+
+def test_cached_user_needs_no_queries(user, django_assert_num_queries):
+    """Test the user and profile come from Redis once cached"""
+    with django_assert_num_queries(1):
+        authenticate(user)
+    with django_assert_num_queries(0):
+        cached = authenticate(user)
+        assert cached == user
+        assert cached.profile == user.profile
+
+
+def test_deactivation_takes_effect_immediately(
+    user, django_capture_on_commit_callbacks
+):
+    """Test a saved user is reloaded, and refused once inactive"""
+    authenticate(user)
+    user.is_active = False
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    with pytest.raises(AuthenticationFailed):
+        authenticate(user)
+
+
+def test_saved_profile_is_reloaded(user, django_capture_on_commit_callbacks):
+    """Test saving the profile drops the cached user"""
+    authenticate(user)
+    profile = user.profile
+    profile.city = "Limbe"
+    with django_capture_on_commit_callbacks(execute=True):
+        profile.save()
+    assert authenticate(user).profile.city == "Limbe"
+
+
+def test_invalidated_user_is_not_cached_again(
+    user, redis_client, django_capture_on_commit_callbacks
+):
+    """Test a user read before a change cannot be cached after it"""
+    key = user_cache_key(user.id)
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    CachedJWTAuthentication().cache_user(user.id, user)
+    assert redis_client.get(key) == b""
+    assert authenticate(user) == user
+
+
+def test_review_drops_the_agents_cached_user(
+    profile_factory, redis_client, django_capture_on_commit_callbacks
+):
+    """Test the rating aggregates of a cached agent are not served stale"""
+    agent = profile_factory.create(is_agent=True)
+    rater = profile_factory.create()
+    num_reviews = authenticate(agent.user).profile.num_reviews
+    with django_capture_on_commit_callbacks(execute=True):
+        Rating.objects.create_review(rater.user, agent, 4, "Helpful")
+    assert authenticate(agent.user).profile.num_reviews == num_reviews + 1
+
+
+def test_reconcile_drops_the_cached_users_of_drifted_agents(
+    profile_factory, django_capture_on_commit_callbacks
+):
+    """Test reconciled aggregates are not served, or saved back, stale"""
+    agent = profile_factory.create(is_agent=True, num_reviews=3)
+    authenticate(agent.user)
+    with django_capture_on_commit_callbacks(execute=True):
+        assert Rating.objects.reconcile_agents() == 1
+    assert authenticate(agent.user).profile.num_reviews == 0
+
+
+def test_profile_update_keeps_the_rating_aggregates(api_client, profile):
+    """Test a PATCH with a cached user does not write back stale aggregates"""
+    token = AccessToken.for_user(profile.user)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    authenticate(profile.user)
+    Profile.objects.filter(pkid=profile.pkid).update(num_reviews=5)
+    response = api_client.patch(
+        reverse("update-profile", args=[profile.user.username]),
+        {"city": "Limbe"},
+        format="json",
+    )
+    assert response.status_code == 200
+    profile.refresh_from_db()
+    assert (profile.city, profile.num_reviews) == ("Limbe", 5)
+
+
+# Outside a transaction, which keeps reads on the primary.
+@pytest.mark.django_db(transaction=True)
+def test_uncached_users_are_loaded_from_the_primary(user, monkeypatch):
+    """Test a lagging replica cannot authenticate a deactivated user"""
+    monkeypatch.setattr(db_router, "choose_replica", lambda: "replica_0")
+    with read_state(use_replicas=True):
+        assert authenticate(user) == user
+
+
+def test_redis_outage_falls_back_to_the_database(user, monkeypatch):
+    """Test users are loaded from Postgres when Redis cannot be reached"""
+
+    def unavailable():
+        raise redis.ConnectionError("Connection refused")
+
+    monkeypatch.setattr(authentication, "get_redis", unavailable)
+    assert authenticate(user) == user
+
+
+def test_get_profile_reads_the_cached_profile(
+    api_client, user, django_assert_num_queries
+):
+    """Test a cached user's profile is served with only the reviews query"""
+    token = AccessToken.for_user(user)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    url = reverse("get-profile")
+    assert api_client.get(url).status_code == 200
+    with django_assert_num_queries(1):
+        response = api_client.get(url)
+    assert response.status_code == 200
+    assert response.json()["profile"]["username"] == user.username
+
+
+def test_get_profile_without_a_profile_is_not_found(api_client, base_user):
+    """Test a user without a profile gets a 404, not a server error"""
+    token = AccessToken.for_user(base_user)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    response = api_client.get(reverse("get-profile"))
+    assert response.status_code == 404